@@ -0,0 +1,117 @@
+#!/bin/bash
+# Shared helpers for the check modules
+#
+# Results are appended as one JSON object per line (NDJSON) to
+# "$RESULTS_FILE.partial" through a file descriptor that stays open for the
+# whole module, so add_result costs a single write and no fork. The partial
+# file replaces "$RESULTS_FILE" atomically when the module exits. Timing
+# counters for every result go to "<module>.timing.json" the same way.
+#
+# Usage:
+#   source "$(dirname "${BASH_SOURCE[0]}")/common.sh"
+#   init_results "$RESULTS_FILE"
+
+# Escape a string for use inside a JSON string literal (result in REPLY)
+json_escape() {
+    local s="$1"
+    s="${s//\\/\\\\}"
+    s="${s//\"/\\\"}"
+    s="${s//$'\n'/\\n}"
+    s="${s//$'\r'/\\r}"
+    s="${s//$'\t'/\\t}"
+    if [[ "$s" == *[[:cntrl:]]* ]]; then
+        s="${s//[[:cntrl:]]/}"
+    fi
+    REPLY="$s"
+}
+
+# Record the time, CPU and process counters (no forks): TIMING_T is the
+# wall clock in microseconds, TIMING_CPU the clock ticks used by this shell
+# and the children it has reaped, TIMING_PROCS the last PID handed out
+# system-wide (/proc/loadavg), which advances with every process created
+timing_mark() {
+    local -a stat
+    local load1 load5 load15 running
+    TIMING_T="${EPOCHREALTIME/[.,]/}"
+    TIMING_CPU=0
+    TIMING_PROCS=0
+    if read -r -a stat < "/proc/$$/stat" 2>/dev/null; then
+        TIMING_CPU=$(( stat[13] + stat[14] + stat[15] + stat[16] ))
+    fi
+    read -r load1 load5 load15 running TIMING_PROCS < /proc/loadavg 2>/dev/null
+}
+
+# Append a timing record (see scanner/timings.py)
+write_timing() {
+    timing_mark
+    printf '{"%s":"%s","t":%s,"cpu":%s,"procs":%s}\n' \
+        "$1" "$2" "${TIMING_T:-0}" "$TIMING_CPU" "$TIMING_PROCS" >&"$TIMING_FD"
+}
+
+# Start a fresh result set for this module
+init_results() {
+    RESULTS_PARTIAL="$1.partial"
+    TIMING_FILE="${1%.json}.timing.json"
+    exec {RESULTS_FD}>"$RESULTS_PARTIAL"
+    exec {TIMING_FD}>"$TIMING_FILE.partial"
+    write_timing "event" "start"
+    trap finish_results EXIT
+}
+
+# Publish the result set (runs on module exit)
+finish_results() {
+    if [ -n "$RESULTS_FD" ]; then
+        write_timing "event" "end"
+        exec {RESULTS_FD}>&- {TIMING_FD}>&-
+        RESULTS_FD=""
+        mv -f "$TIMING_FILE.partial" "$TIMING_FILE"
+        mv -f "$RESULTS_PARTIAL" "$RESULTS_FILE"
+    fi
+}
+
+# Function to add result to JSON
+add_result() {
+    local check_name result status details
+    json_escape "$1"; check_name="$REPLY"
+    json_escape "$2"; result="$REPLY"
+    json_escape "$3"; status="$REPLY"
+    json_escape "$4"; details="$REPLY"
+
+    printf '{"check_name":"%s","result":"%s","status":"%s","details":"%s"}\n' \
+        "$check_name" "$result" "$status" "$details" >&"$RESULTS_FD"
+    write_timing "check_name" "$check_name"
+}
+
+# Project root, for running the Python helpers in scanner/
+PROJECT_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+
+# Run a Python helper (python3 -m <module> <args>) and keep its records
+# (fields separated by 0x1f, see scanner/emit.py) for add_section_results;
+# records of several helpers accumulate, so their sections must not clash.
+# The helper's error messages go to the module output. Returns 1 if the
+# helper failed and 2 if it printed no records, so callers can report it.
+load_records() {
+    local output status
+    output=$(cd "$PROJECT_ROOT" && python3 -m "$@")
+    status=$?
+    if [ -n "$output" ]; then
+        mapfile -t -O "${#SCANNER_RECORDS[@]}" SCANNER_RECORDS <<< "$output"
+    fi
+    if [ "$status" -ne 0 ]; then
+        echo "python3 -m $1 failed with exit status $status" >&2
+        return 1
+    fi
+    [ -n "$output" ] || return 2
+}
+
+# Emit the loaded records belonging to one section
+add_section_results() {
+    local section="$1"
+    local record key name result status details
+    for record in "${SCANNER_RECORDS[@]}"; do
+        IFS=$'\x1f' read -r key name result status details <<< "$record"
+        if [ "$key" = "$section" ]; then
+            add_result "$name" "$result" "$status" "$details"
+        fi
+    done
+}
@@ -6,23 +6,9 @@ mkdir -p "$OUTPUT_DIR"
 
 RESULTS_FILE="$OUTPUT_DIR/network.json"
 
-# Initialize JSON array
-echo "[]" > "$RESULTS_FILE"
-
-# Function to add result to JSON
-add_result() {
-    local check_name="$1"
-    local result="$2"
-    local status="$3"
-    local details="$4"
-    
-    jq -c --arg name "$check_name" \
-          --arg result "$result" \
-          --arg status "$status" \
-          --arg details "$details" \
-          '. += [{"check_name": $name, "result": $result, "status": $status, "details": $details}]' \
-          "$RESULTS_FILE" > "${RESULTS_FILE}.tmp" && mv "${RESULTS_FILE}.tmp" "$RESULTS_FILE"
-}
+# Shared result emitter (add_result)
+source "$(dirname "${BASH_SOURCE[0]}")/common.sh"
+init_results "$RESULTS_FILE"
 
 # Check UFW firewall status
 if command -v ufw &>/dev/null; then
@@ -68,37 +54,13 @@ if command -v firewall-cmd &>/dev/null; then
     fi
 fi
 
-# Check IP forwarding
-ip_forward=$(sysctl net.ipv4.ip_forward 2>/dev/null | awk '{print $3}')
-if [ "$ip_forward" = "0" ]; then
-    add_result "IP Forwarding" "PASS" "LOW" "IP forwarding is disabled"
-else
-    add_result "IP Forwarding" "FAIL" "MEDIUM" "IP forwarding is enabled"
-fi
-
-# Check ICMP redirects
-icmp_redirect=$(sysctl net.ipv4.conf.all.accept_redirects 2>/dev/null | awk '{print $3}')
-if [ "$icmp_redirect" = "0" ]; then
-    add_result "ICMP Redirects" "PASS" "LOW" "ICMP redirects are disabled"
-else
-    add_result "ICMP Redirects" "FAIL" "MEDIUM" "ICMP redirects are enabled"
-fi
-
-# Check source routing
-source_route=$(sysctl net.ipv4.conf.all.accept_source_route 2>/dev/null | awk '{print $3}')
-if [ "$source_route" = "0" ]; then
-    add_result "Source Routing" "PASS" "LOW" "Source routing is disabled"
-else
-    add_result "Source Routing" "FAIL" "MEDIUM" "Source routing is enabled"
-fi
-
-# Check SYN cookies
-syn_cookies=$(sysctl net.ipv4.tcp_syncookies 2>/dev/null | awk '{print $3}')
-if [ "$syn_cookies" = "1" ]; then
-    add_result "SYN Cookies" "PASS" "LOW" "SYN cookies are enabled"
-else
-    add_result "SYN Cookies" "FAIL" "MEDIUM" "SYN cookies are disabled"
+# IP forwarding, ICMP redirects, source routing and SYN cookies, read from
+# /proc/sys in one batch (scanner/sysctl.py)
+load_records scanner.sysctl network
+if [ $? -eq 1 ]; then
+    add_result "Network Parameter Checks Failed" "WARN" "MEDIUM" "The sysctl parameters could not be evaluated"
 fi
+add_section_results "params"
 
 # Check for open network connections
 established_conn=$(ss -tn 2>/dev/null | grep ESTAB | wc -l)
@@ -1,8 +1,14 @@
 #!/bin/bash
 # Master script to run all hardening checks
+#
+# The modules run concurrently (longest first) through scanner/scheduler.py.
+# HARDENING_JOBS limits how many run at once (0 = all, 1 = one after another)
+# and HARDENING_MODULE_TIMEOUT sets the timeout of every module in seconds
+# (default: 300, and 3600 for permissions).
 
 OUTPUT_DIR="/tmp/hardening-scan"
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PROJECT_ROOT="$(dirname "$SCRIPT_DIR")"
 
 mkdir -p "$OUTPUT_DIR"
 
@@ -10,42 +16,12 @@ echo "Starting comprehensive host hardening scan..."
 echo "Results will be saved to: $OUTPUT_DIR"
 echo ""
 
-# Run all check scripts
-if [ -f "$SCRIPT_DIR/services.sh" ]; then
-    echo "Running services checks..."
-    bash "$SCRIPT_DIR/services.sh"
+scheduler_args=(--output-dir "$OUTPUT_DIR" --jobs "${HARDENING_JOBS:-4}")
+if [ -n "$HARDENING_MODULE_TIMEOUT" ]; then
+    scheduler_args+=(--timeout "$HARDENING_MODULE_TIMEOUT")
 fi
 
-if [ -f "$SCRIPT_DIR/network.sh" ]; then
-    echo "Running network checks..."
-    bash "$SCRIPT_DIR/network.sh"
-fi
-
-if [ -f "$SCRIPT_DIR/ssh.sh" ]; then
-    echo "Running SSH checks..."
-    bash "$SCRIPT_DIR/ssh.sh"
-fi
-
-if [ -f "$SCRIPT_DIR/users.sh" ]; then
-    echo "Running user security checks..."
-    bash "$SCRIPT_DIR/users.sh"
-fi
-
-if [ -f "$SCRIPT_DIR/permissions.sh" ]; then
-    echo "Running permissions checks..."
-    bash "$SCRIPT_DIR/permissions.sh"
-fi
-
-if [ -f "$SCRIPT_DIR/kernel.sh" ]; then
-    echo "Running kernel hardening checks..."
-    bash "$SCRIPT_DIR/kernel.sh"
-fi
-
-if [ -f "$SCRIPT_DIR/security.sh" ]; then
-    echo "Running security framework checks..."
-    bash "$SCRIPT_DIR/security.sh"
-fi
+(cd "$PROJECT_ROOT" && python3 -m scanner.scheduler "${scheduler_args[@]}" "$@")
 
 echo ""
 echo "All scans completed. Check $OUTPUT_DIR for results."
-
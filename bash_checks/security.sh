@@ -6,23 +6,9 @@ mkdir -p "$OUTPUT_DIR"
 
 RESULTS_FILE="$OUTPUT_DIR/security.json"
 
-# Initialize JSON array
-echo "[]" > "$RESULTS_FILE"
-
-# Function to add result to JSON
-add_result() {
-    local check_name="$1"
-    local result="$2"
-    local status="$3"
-    local details="$4"
-    
-    jq -c --arg name "$check_name" \
-          --arg result "$result" \
-          --arg status "$status" \
-          --arg details "$details" \
-          '. += [{"check_name": $name, "result": $result, "status": $status, "details": $details}]' \
-          "$RESULTS_FILE" > "${RESULTS_FILE}.tmp" && mv "${RESULTS_FILE}.tmp" "$RESULTS_FILE"
-}
+# Shared result emitter (add_result)
+source "$(dirname "${BASH_SOURCE[0]}")/common.sh"
+init_results "$RESULTS_FILE"
 
 # Check SELinux status
 if command -v getenforce &>/dev/null; then
@@ -101,13 +87,16 @@ if command -v auditctl &>/dev/null; then
     fi
 fi
 
-# Check for installed security packages
+# Check for installed security packages: lookups in the package inventory
+# (dpkg status or one rpm query, cached until the package database changes),
+# falling back to the PATH for tools installed outside the package manager
+# (not for an offline root in HARDENING_ROOT)
 security_tools="fail2ban rkhunter chkrootkit aide tripwire"
-for tool in $security_tools; do
-    if command -v "$tool" &>/dev/null || dpkg -l | grep -q "^ii.*$tool" || rpm -qa | grep -q "$tool"; then
-        add_result "Security Tool: $tool" "INFO" "LOW" "$tool is installed"
-    fi
-done
+load_records scanner.packages --root "${HARDENING_ROOT%/}" --tools $security_tools
+if [ $? -eq 1 ]; then
+    add_result "Security Tool Lookup Failed" "WARN" "MEDIUM" "The package inventory could not be loaded"
+fi
+add_section_results "tools"
 
 # Check cron jobs (security-related)
 if [ -d "/etc/cron.d" ]; then
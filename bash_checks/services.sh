@@ -6,23 +6,9 @@ mkdir -p "$OUTPUT_DIR"
 
 RESULTS_FILE="$OUTPUT_DIR/services.json"
 
-# Initialize JSON array
-echo "[]" > "$RESULTS_FILE"
-
-# Function to add result to JSON
-add_result() {
-    local check_name="$1"
-    local result="$2"
-    local status="$3"
-    local details="$4"
-    
-    jq -c --arg name "$check_name" \
-          --arg result "$result" \
-          --arg status "$status" \
-          --arg details "$details" \
-          '. += [{"check_name": $name, "result": $result, "status": $status, "details": $details}]' \
-          "$RESULTS_FILE" > "${RESULTS_FILE}.tmp" && mv "${RESULTS_FILE}.tmp" "$RESULTS_FILE"
-}
+# Shared result emitter (add_result)
+source "$(dirname "${BASH_SOURCE[0]}")/common.sh"
+init_results "$RESULTS_FILE"
 
 # Check for unnecessary services
 check_service() {
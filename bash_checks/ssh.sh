@@ -1,30 +1,25 @@
 #!/bin/bash
 # SSH Configuration Checks
+#
+# Results are reused while these inputs are unchanged (scanner/modcache.py);
+# the parser lists the Include targets, which may live outside /etc/ssh
+# cache-inputs: $HARDENING_ROOT/etc/ssh /usr/sbin/sshd $PROJECT_ROOT/scanner/sshd_config.py
+# cache-inputs-from: python3 -m scanner.sshd_config --root "${HARDENING_ROOT%/}" --files
+# cache-commands: systemctl is-active sshd ssh
+# cache-ttl: 3600
 
 OUTPUT_DIR="/tmp/hardening-scan"
 mkdir -p "$OUTPUT_DIR"
 
 RESULTS_FILE="$OUTPUT_DIR/ssh.json"
 
-# Initialize JSON array
-echo "[]" > "$RESULTS_FILE"
+# Shared result emitter (add_result)
+source "$(dirname "${BASH_SOURCE[0]}")/common.sh"
+init_results "$RESULTS_FILE"
 
-# Function to add result to JSON
-add_result() {
-    local check_name="$1"
-    local result="$2"
-    local status="$3"
-    local details="$4"
-    
-    jq -c --arg name "$check_name" \
-          --arg result "$result" \
-          --arg status "$status" \
-          --arg details "$details" \
-          '. += [{"check_name": $name, "result": $result, "status": $status, "details": $details}]' \
-          "$RESULTS_FILE" > "${RESULTS_FILE}.tmp" && mv "${RESULTS_FILE}.tmp" "$RESULTS_FILE"
-}
-
-SSH_CONFIG="/etc/ssh/sshd_config"
+# Offline root to scan instead of the running host (e.g. a mounted image)
+SSH_ROOT="${HARDENING_ROOT%/}"
+SSH_CONFIG="$SSH_ROOT/etc/ssh/sshd_config"
 
 if [ ! -f "$SSH_CONFIG" ]; then
     add_result "SSH Config File" "WARN" "MEDIUM" "SSH config file not found at $SSH_CONFIG"
@@ -33,16 +28,49 @@ if [ ! -f "$SSH_CONFIG" ]; then
 fi
 
 # Check if SSH is running
-if systemctl is-active sshd &>/dev/null || systemctl is-active ssh &>/dev/null; then
-    add_result "SSH Service" "INFO" "LOW" "SSH service is running"
-else
-    add_result "SSH Service" "WARN" "MEDIUM" "SSH service is not running"
+if [ -z "$SSH_ROOT" ]; then
+    if systemctl is-active sshd &>/dev/null || systemctl is-active ssh &>/dev/null; then
+        add_result "SSH Service" "INFO" "LOW" "SSH service is running"
+    else
+        add_result "SSH Service" "WARN" "MEDIUM" "SSH service is not running"
+    fi
+fi
+
+# Snapshot of the effective configuration (keyword -> first value), taken
+# once from sshd -T, or from the native parser when sshd is not installed,
+# cannot load its host keys, or the scan runs against an offline root.
+# Returns 1 if the native parser failed.
+declare -A SSHD_CONFIG
+load_sshd_config() {
+    local -a lines=()
+    local line key value output status
+    if [ -z "$SSH_ROOT" ] && command -v sshd &>/dev/null; then
+        mapfile -t lines < <(sshd -T 2>/dev/null)
+    fi
+    if [ ${#lines[@]} -eq 0 ]; then
+        output=$(cd "$PROJECT_ROOT" && python3 -m scanner.sshd_config --root "$SSH_ROOT")
+        status=$?
+        if [ "$status" -ne 0 ]; then
+            echo "python3 -m scanner.sshd_config failed with exit status $status" >&2
+            return 1
+        fi
+        mapfile -t lines <<< "$output"
+    fi
+    for line in "${lines[@]}"; do
+        read -r key value _ <<< "$line"
+        key="${key,,}"
+        if [ -n "$key" ] && [ -z "${SSHD_CONFIG[$key]+set}" ]; then
+            SSHD_CONFIG[$key]="$value"
+        fi
+    done
+}
+if ! load_sshd_config; then
+    add_result "SSH Configuration Checks Failed" "WARN" "MEDIUM" "The effective SSH configuration could not be determined; SSH settings were not checked"
 fi
 
-# Use sshd -T to get effective configuration
-if command -v sshd &>/dev/null; then
+if [ ${#SSHD_CONFIG[@]} -gt 0 ]; then
     # Check PermitRootLogin
-    root_login=$(sshd -T 2>/dev/null | grep -i permitrootlogin | awk '{print $2}')
+    root_login="${SSHD_CONFIG[permitrootlogin]}"
     if [ "$root_login" = "no" ] || [ "$root_login" = "prohibit-password" ]; then
         add_result "SSH PermitRootLogin" "PASS" "LOW" "Root login is restricted: $root_login"
     else
@@ -50,7 +78,7 @@ if command -v sshd &>/dev/null; then
     fi
     
     # Check PasswordAuthentication
-    password_auth=$(sshd -T 2>/dev/null | grep -i passwordauthentication | awk '{print $2}')
+    password_auth="${SSHD_CONFIG[passwordauthentication]}"
     if [ "$password_auth" = "no" ]; then
         add_result "SSH PasswordAuthentication" "PASS" "LOW" "Password authentication is disabled"
     else
@@ -58,7 +86,7 @@ if command -v sshd &>/dev/null; then
     fi
     
     # Check PubkeyAuthentication
-    pubkey_auth=$(sshd -T 2>/dev/null | grep -i pubkeyauthentication | awk '{print $2}')
+    pubkey_auth="${SSHD_CONFIG[pubkeyauthentication]}"
     if [ "$pubkey_auth" = "yes" ]; then
         add_result "SSH PubkeyAuthentication" "PASS" "LOW" "Public key authentication is enabled"
     else
@@ -66,23 +94,23 @@ if command -v sshd &>/dev/null; then
     fi
     
     # Check X11Forwarding
-    x11_forward=$(sshd -T 2>/dev/null | grep -i x11forwarding | awk '{print $2}')
+    x11_forward="${SSHD_CONFIG[x11forwarding]}"
     if [ "$x11_forward" = "no" ]; then
         add_result "SSH X11Forwarding" "PASS" "LOW" "X11 forwarding is disabled"
     else
         add_result "SSH X11Forwarding" "WARN" "MEDIUM" "X11 forwarding is enabled"
     fi
     
-    # Check Protocol version
-    protocol=$(sshd -T 2>/dev/null | grep -i protocol | awk '{print $2}')
-    if echo "$protocol" | grep -q "2"; then
+    # Check Protocol version (sshd -T of OpenSSH >= 7.4 omits it: only 2 exists)
+    protocol="${SSHD_CONFIG[protocol]:-2}"
+    if [[ "$protocol" == *2* ]]; then
         add_result "SSH Protocol" "PASS" "LOW" "SSH Protocol 2 is enabled"
     else
         add_result "SSH Protocol" "FAIL" "HIGH" "SSH Protocol 1 may be enabled"
     fi
     
     # Check MaxAuthTries
-    max_auth=$(sshd -T 2>/dev/null | grep -i maxauthtries | awk '{print $2}')
+    max_auth="${SSHD_CONFIG[maxauthtries]}"
     if [ -n "$max_auth" ] && [ "$max_auth" -le 3 ]; then
         add_result "SSH MaxAuthTries" "PASS" "LOW" "MaxAuthTries is set to $max_auth"
     else
@@ -90,7 +118,7 @@ if command -v sshd &>/dev/null; then
     fi
     
     # Check PermitEmptyPasswords
-    empty_pass=$(sshd -T 2>/dev/null | grep -i permitemptypasswords | awk '{print $2}')
+    empty_pass="${SSHD_CONFIG[permitemptypasswords]}"
     if [ "$empty_pass" = "no" ]; then
         add_result "SSH PermitEmptyPasswords" "PASS" "LOW" "Empty passwords are not permitted"
     else
@@ -108,9 +136,16 @@ if [ -f "$SSH_CONFIG" ]; then
     fi
 fi
 
+# Report Match blocks, whose overrides sshd -T does not show
+load_records scanner.sshd_config --root "$SSH_ROOT" --matches
+if [ $? -eq 1 ]; then
+    add_result "SSH Match Blocks Failed" "WARN" "MEDIUM" "Match blocks of the SSH configuration could not be analyzed"
+fi
+add_section_results "match"
+
 # Check for default SSH keys
-if [ -d "/etc/ssh" ]; then
-    default_keys=$(find /etc/ssh -name "ssh_host_*_key" -type f 2>/dev/null | wc -l)
+if [ -d "$SSH_ROOT/etc/ssh" ]; then
+    default_keys=$(find "$SSH_ROOT/etc/ssh" -name "ssh_host_*_key" -type f 2>/dev/null | wc -l)
     if [ "$default_keys" -gt 0 ]; then
         add_result "SSH Host Keys" "INFO" "LOW" "Found $default_keys SSH host keys"
     fi
@@ -1,84 +1,49 @@
 #!/bin/bash
 # User and Group Security Checks
+#
+# Not cached (scanner/modcache.py): the login failure checks read the new
+# part of the auth logs on every run and keep their own checkpoint
 
 OUTPUT_DIR="/tmp/hardening-scan"
 mkdir -p "$OUTPUT_DIR"
 
 RESULTS_FILE="$OUTPUT_DIR/users.json"
 
-# Initialize JSON array
-echo "[]" > "$RESULTS_FILE"
+# Shared result emitter (add_result)
+source "$(dirname "${BASH_SOURCE[0]}")/common.sh"
+init_results "$RESULTS_FILE"
 
-# Function to add result to JSON
-add_result() {
-    local check_name="$1"
-    local result="$2"
-    local status="$3"
-    local details="$4"
-    
-    jq -c --arg name "$check_name" \
-          --arg result "$result" \
-          --arg status "$status" \
-          --arg details "$details" \
-          '. += [{"check_name": $name, "result": $result, "status": $status, "details": $details}]' \
-          "$RESULTS_FILE" > "${RESULTS_FILE}.tmp" && mv "${RESULTS_FILE}.tmp" "$RESULTS_FILE"
-}
-
-# Check for users with UID 0 (root)
-uid0_users=$(getent passwd | awk -F: '$3 == 0 {print $1}' | grep -v "^root$")
-if [ -z "$uid0_users" ]; then
-    add_result "UID 0 Users" "PASS" "LOW" "Only root has UID 0"
-else
-    add_result "UID 0 Users" "FAIL" "HIGH" "Users with UID 0 found: $uid0_users"
+# Read passwd, shadow, group and sudoers once (NSS enumeration, or the files
+# below HARDENING_ROOT) and evaluate the account checks against that model
+ACCOUNTS_ROOT="${HARDENING_ROOT%/}"
+if ! load_records scanner.accounts users --root "$ACCOUNTS_ROOT"; then
+    add_result "Account Checks Failed" "WARN" "MEDIUM" \
+        "The account model could not be loaded; UID 0, password, shell and sudo checks are missing"
 fi
 
-# Check for empty password accounts
-empty_pass=$(getent passwd | awk -F: '($2 == "" || $2 == "!") {print $1}')
-if [ -z "$empty_pass" ]; then
-    add_result "Empty Password Accounts" "PASS" "LOW" "No accounts with empty passwords"
-else
-    add_result "Empty Password Accounts" "FAIL" "HIGH" "Accounts with empty passwords: $empty_pass"
-fi
+# Users with UID 0 other than root
+add_section_results "uid0"
 
-# Check for users without passwords (locked accounts should have ! or *)
-getent passwd | while IFS=: read -r user pass uid gid gecos home shell; do
-    if [ -n "$pass" ] && [ "$pass" != "*" ] && [ "$pass" != "!" ] && [ "$uid" -ge 1000 ]; then
-        # Check if password is actually set (this is a basic check)
-        if [ "$pass" != "x" ]; then
-            # This might indicate password in /etc/passwd (very bad)
-            add_result "User Password Storage" "WARN" "HIGH" "User $user may have password in /etc/passwd"
-        fi
-    fi
-done
-
-# Check password expiration
-getent passwd | awk -F: '$3 >= 1000 {print $1}' | while read user; do
-    if chage -l "$user" &>/dev/null; then
-        max_days=$(chage -l "$user" 2>/dev/null | grep "Maximum number of days" | awk -F: '{print $2}' | tr -d ' ')
-        if [ -z "$max_days" ] || [ "$max_days" = "99999" ]; then
-            add_result "Password Expiration: $user" "WARN" "MEDIUM" "User $user has no password expiration"
-        fi
-    fi
-done
+# Empty password accounts
+add_section_results "empty_password"
 
-# Check for default/system accounts with shells
-system_accounts_with_shells=$(getent passwd | awk -F: '$3 < 1000 && $7 != "/usr/sbin/nologin" && $7 != "/bin/false" && $7 != "/sbin/nologin" {print $1}')
-if [ -z "$system_accounts_with_shells" ]; then
-    add_result "System Accounts with Shells" "PASS" "LOW" "System accounts have restricted shells"
-else
-    add_result "System Accounts with Shells" "WARN" "MEDIUM" "System accounts with shells: $system_accounts_with_shells"
-fi
+# Passwords stored in /etc/passwd instead of shadow (UID >= 1000)
+add_section_results "password_storage"
+
+# Password expiration (chage -l semantics; needs a readable shadow)
+add_section_results "password_expiry"
+
+# System accounts (UID < 1000) with login shells
+add_section_results "system_shells"
 
 # Check sudo configuration
 if command -v sudo &>/dev/null; then
-    sudo_users=$(getent group sudo 2>/dev/null | cut -d: -f4)
-    if [ -n "$sudo_users" ]; then
-        add_result "Sudo Users" "INFO" "LOW" "Users with sudo access: $sudo_users"
-    fi
+    # Members of the sudo group and principals of the sudoers rules
+    add_section_results "sudo"
     
     # Check sudoers file permissions
-    if [ -f "/etc/sudoers" ]; then
-        sudoers_perm=$(stat -c "%a" /etc/sudoers 2>/dev/null)
+    if [ -f "$ACCOUNTS_ROOT/etc/sudoers" ]; then
+        sudoers_perm=$(stat -c "%a" "$ACCOUNTS_ROOT/etc/sudoers" 2>/dev/null)
         if [ "$sudoers_perm" = "440" ] || [ "$sudoers_perm" = "400" ]; then
             add_result "Sudoers File Permissions" "PASS" "LOW" "Sudoers file has secure permissions: $sudoers_perm"
         else
@@ -87,19 +52,11 @@ if command -v sudo &>/dev/null; then
     fi
 fi
 
-# Check for users in administrative groups
-admin_groups="sudo wheel adm admin"
-for group in $admin_groups; do
-    if getent group "$group" &>/dev/null; then
-        members=$(getent group "$group" | cut -d: -f4)
-        if [ -n "$members" ]; then
-            add_result "Admin Group: $group" "INFO" "LOW" "Members of $group: $members"
-        fi
-    fi
-done
+# Check for users in administrative groups (sudo, wheel, adm, admin)
+add_section_results "admin_groups"
 
 # Check /etc/passwd permissions
-passwd_perm=$(stat -c "%a" /etc/passwd 2>/dev/null)
+passwd_perm=$(stat -c "%a" "$ACCOUNTS_ROOT/etc/passwd" 2>/dev/null)
 if [ "$passwd_perm" = "644" ]; then
     add_result "/etc/passwd Permissions" "PASS" "LOW" "/etc/passwd has correct permissions: $passwd_perm"
 else
@@ -107,7 +64,7 @@ else
 fi
 
 # Check /etc/shadow permissions
-shadow_perm=$(stat -c "%a" /etc/shadow 2>/dev/null)
+shadow_perm=$(stat -c "%a" "$ACCOUNTS_ROOT/etc/shadow" 2>/dev/null)
 if [ "$shadow_perm" = "640" ] || [ "$shadow_perm" = "0" ]; then
     add_result "/etc/shadow Permissions" "PASS" "LOW" "/etc/shadow has secure permissions: $shadow_perm"
 else
@@ -115,20 +72,21 @@ else
 fi
 
 # Check /etc/group permissions
-group_perm=$(stat -c "%a" /etc/group 2>/dev/null)
+group_perm=$(stat -c "%a" "$ACCOUNTS_ROOT/etc/group" 2>/dev/null)
 if [ "$group_perm" = "644" ]; then
     add_result "/etc/group Permissions" "PASS" "LOW" "/etc/group has correct permissions: $group_perm"
 else
     add_result "/etc/group Permissions" "WARN" "MEDIUM" "/etc/group permissions: $group_perm (should be 644)"
 fi
 
-# Check for recent login failures
-if [ -f "/var/log/auth.log" ] || [ -f "/var/log/secure" ]; then
-    recent_failures=$(grep -i "failed password" /var/log/auth.log /var/log/secure 2>/dev/null | tail -20 | wc -l)
-    if [ "$recent_failures" -gt 0 ]; then
-        add_result "Recent Login Failures" "WARN" "MEDIUM" "Found $recent_failures recent failed login attempts"
-    fi
+# Check for recent login failures: failure rates per source IP and per user
+# over the last 24 hours. Only the part of auth.log/secure appended since the
+# last scan is read (checkpoint in the scan state directory, rotation-aware)
+load_records scanner.authlog --root "$ACCOUNTS_ROOT"
+if [ $? -eq 1 ]; then
+    add_result "Login Failure Analysis Failed" "WARN" "MEDIUM" "The auth logs could not be analyzed"
 fi
+add_section_results "login_failures"
 
 echo "Users scan completed. Results saved to $RESULTS_FILE"
 
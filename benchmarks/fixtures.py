@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Synthetic fixtures for the benchmark suite (used by benchmarks/run.py).
+
+Every generator is seeded, so the same arguments always produce the same
+tree, the same account files and the same results; benchmark numbers are
+comparable between runs and machines of the same class.
+"""
+
+import json
+import os
+import random
+from typing import Dict, List
+
+from scanner.parser import ScanParser
+from scanner.sysctl import CHECK_TABLES
+
+
+RESULTS = ['PASS', 'PASS', 'PASS', 'FAIL', 'WARN', 'INFO']
+STATUSES = ['LOW', 'MEDIUM', 'HIGH']
+
+
+def make_tree(root: str, files: int, seed: int = 1, files_per_dir: int = 50,
+              suid: int = 20, sgid: int = 20, world_writable: int = 20) -> Dict[str, int]:
+    """
+    Create a directory tree with seeded permission findings.
+
+    Args:
+        root: Directory to create the tree in
+        files: Number of regular files
+        seed: Random seed
+        files_per_dir: Files per directory (directories nest three deep)
+        suid, sgid, world_writable: Files given each permission bit
+
+    Returns:
+        Expected counts per fswalk category (for files created here)
+    """
+    rng = random.Random(seed)
+    paths = []
+    dirs = max(1, files // files_per_dir)
+    for d in range(dirs):
+        directory = os.path.join(root, f"d{d % 10}", f"d{(d // 10) % 10}", f"d{d}")
+        os.makedirs(directory, exist_ok=True)
+        for f in range(files_per_dir):
+            if len(paths) >= files:
+                break
+            path = os.path.join(directory, f"f{f}")
+            with open(path, 'w') as fh:
+                fh.write("x")
+            os.chmod(path, 0o644)
+            paths.append(path)
+
+    chosen = rng.sample(paths, min(len(paths), suid + sgid + world_writable))
+    for path in chosen[:suid]:
+        os.chmod(path, 0o4755)
+    for path in chosen[suid:suid + sgid]:
+        os.chmod(path, 0o2755)
+    for path in chosen[suid + sgid:]:
+        os.chmod(path, 0o666)
+    return {'suid': suid, 'sgid': sgid, 'world_writable_files': world_writable}
+
+
+def make_etc_root(root: str, users: int, seed: int = 1):
+    """
+    Create an offline root with account files and an sshd configuration.
+
+    Args:
+        root: Directory standing in for /
+        users: Number of regular accounts
+        seed: Random seed
+    """
+    rng = random.Random(seed)
+    etc = os.path.join(root, "etc")
+    os.makedirs(os.path.join(etc, "ssh", "sshd_config.d"), exist_ok=True)
+    os.makedirs(os.path.join(etc, "sudoers.d"), exist_ok=True)
+
+    passwd = ["root:x:0:0:root:/root:/bin/bash",
+              "daemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin"]
+    shadow = ["root:!:19000:0:99999:7:::", "daemon:*:19000:0:99999:7:::"]
+    members = []
+    for i in range(users):
+        name = f"user{i:05d}"
+        passwd.append(f"{name}:x:{1000 + i}:{1000 + i}:User {i}:/home/{name}:/bin/bash")
+        max_days = rng.choice(["99999", "90", "365", ""])
+        shadow.append(f"{name}:$6$salt$hash:19000:0:{max_days}:7:::")
+        if rng.random() < 0.05:
+            members.append(name)
+    group = ["root:x:0:", f"sudo:x:27:{','.join(members)}", "adm:x:4:"]
+    group += [f"user{i:05d}:x:{1000 + i}:" for i in range(users)]
+
+    for name, lines, mode in (("passwd", passwd, 0o644), ("shadow", shadow, 0o640),
+                              ("group", group, 0o644)):
+        path = os.path.join(etc, name)
+        with open(path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.chmod(path, mode)
+    sudoers = os.path.join(etc, "sudoers")
+    with open(sudoers, 'w') as f:
+        f.write("root ALL=(ALL:ALL) ALL\n%sudo ALL=(ALL:ALL) ALL\n@includedir /etc/sudoers.d\n")
+    os.chmod(sudoers, 0o440)
+
+    with open(os.path.join(etc, "ssh", "sshd_config"), 'w') as f:
+        f.write("Include /etc/ssh/sshd_config.d/*.conf\n"
+                "PermitRootLogin no\nPasswordAuthentication no\nX11Forwarding no\n"
+                "Match Group sftp\n    PasswordAuthentication yes\n"
+                "Match Address 10.0.0.0/8\n    PermitRootLogin prohibit-password\n")
+    for i in range(20):
+        with open(os.path.join(etc, "ssh", "sshd_config.d", f"{i:02d}-site.conf"), 'w') as f:
+            f.write(f"# site fragment {i}\nMaxAuthTries {3 + i % 3}\nClientAliveInterval 300\n")
+
+
+def make_proc_sys(root: str, seed: int = 1) -> str:
+    """
+    Create a /proc/sys stand-in holding every parameter the checks read.
+
+    Returns:
+        Path of the sysctl tree
+    """
+    rng = random.Random(seed)
+    proc_sys = os.path.join(root, "proc", "sys")
+    for checks in CHECK_TABLES.values():
+        for check in checks:
+            for key in check.keys():
+                path = os.path.join(proc_sys, *key.split('.'))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w') as f:
+                    f.write(f"{rng.choice(['0', '1', '2'])}\n")
+    return proc_sys
+
+
+def make_results(scan_dir: str, per_module: int, seed: int = 1) -> int:
+    """
+    Write synthetic NDJSON results for every module.
+
+    Check names reuse the names in rules/rules.yaml and add numbered
+    variants, so rule lookups hit exact, wildcard and default rules.
+
+    Returns:
+        Number of results written
+    """
+    rng = random.Random(seed)
+    os.makedirs(scan_dir, exist_ok=True)
+    names = check_names(per_module, seed)
+    total = 0
+    for json_file in ScanParser.RESULT_FILES:
+        with open(os.path.join(scan_dir, json_file), 'w') as f:
+            for i in range(per_module):
+                record = {
+                    'check_name': names[i],
+                    'result': rng.choice(RESULTS),
+                    'status': rng.choice(STATUSES),
+                    'details': f"Synthetic finding {i} in {json_file} <&>",
+                }
+                f.write(json.dumps(record, separators=(',', ':')) + "\n")
+                total += 1
+    return total
+
+
+def check_names(count: int, seed: int = 1) -> List[str]:
+    """Return realistic check names: rule names, per-user and per-path variants."""
+    rng = random.Random(seed)
+    base = ["SSH PermitRootLogin", "UID 0 Users", "World-Writable Files", "Firewall Status",
+            "Kptr Restrict", "SUID Files", "Sudo Users", "Cron Jobs", "AppArmor Status"]
+    names = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.3:
+            names.append(rng.choice(base))
+        elif kind < 0.6:
+            names.append(f"Password Expiration: user{i:05d}")
+        elif kind < 0.8:
+            names.append(f"Home Directory: /home/user{i:05d}")
+        else:
+            names.append(f"Unruled Check {i}")
+    return names
+
+
+def make_rules(path: str, exact: int, wildcards: int, seed: int = 1):
+    """Write a synthetic rule file (JSON is valid YAML) with many patterns."""
+    rng = random.Random(seed)
+    rules = [{'check_name': f"Synthetic Exact {i}", 'severity': rng.choice(STATUSES),
+              'remediation': f"Fix {i}"} for i in range(exact)]
+    rules += [{'check_name': f"Synthetic Prefix {i}:*", 'severity': rng.choice(STATUSES),
+               'remediation': f"Fix prefix {i}"} for i in range(wildcards)]
+    with open(path, 'w') as f:
+        json.dump({'rules': rules}, f)
+
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for Host Hardening Checker.
+
+Builds seeded synthetic fixtures (a file tree with SUID/SGID/world-writable
+entries, an offline root with account files and an sshd configuration, a
+/proc/sys tree and large result files), times the hot paths of the scanner
+against them and compares the medians with a stored baseline:
+
+    python3 benchmarks/run.py                 # run and compare
+    python3 benchmarks/run.py --save          # store the results as the baseline
+    python3 benchmarks/run.py --scale 0.1     # quick smoke run
+
+A benchmark slower than its baseline by more than the tolerance, and by
+more than a few milliseconds, fails the run (exit code 1). Baselines are only compared at the same scale; save one
+per reference machine.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+# Allow running from the project root without installing anything
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import fixtures
+from scanner.accounts import AccountLoader, home_records, user_records
+from scanner.fswalk import PermissionsWalker
+from scanner.parser import ScanParser
+from scanner.report import ReportGenerator
+from scanner.rules import RuleIndex
+from scanner.sshd_config import SshdConfigParser
+from scanner.sysctl import CHECK_TABLES, evaluate
+
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Allowed slowdown against the baseline before a benchmark fails
+DEFAULT_TOLERANCE = 0.5
+
+# Slowdown (ms) always allowed, so sub-millisecond benchmarks do not fail on noise
+DEFAULT_FLOOR_MS = 5.0
+
+# Fixture sizes at scale 1.0
+SIZES = {
+    'tree_files': 20000,
+    'users': 5000,
+    'results_per_module': 5000,
+    'rule_exact': 2000,
+    'rule_wildcards': 200,
+    'lookups': 50000,
+}
+
+
+class Benchmark:
+    """One timed operation with its setup and result check."""
+
+    def __init__(self, name: str, run: Callable[[], object],
+                 verify: Callable[[object], Optional[str]] = None, repeat: int = 5):
+        self.name = name
+        self.run = run
+        self.verify = verify
+        self.repeat = repeat
+
+    def measure(self) -> Dict:
+        """Run the benchmark and return its median time (ms) or why it failed."""
+        times = []
+        outcome = None
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            outcome = self.run()
+            times.append((time.perf_counter() - start) * 1000)
+        error = self.verify(outcome) if self.verify else None
+        return {
+            'median_ms': round(statistics.median(times), 3),
+            'min_ms': round(min(times), 3),
+            'error': error,
+        }
+
+
+def build_fixtures(work: str, sizes: Dict[str, int]) -> Dict:
+    """Create every fixture below work and return their paths."""
+    started = time.perf_counter()
+    paths = {
+        'tree': os.path.join(work, "tree"),
+        'root': os.path.join(work, "root"),
+        'scan': os.path.join(work, "scan"),
+        'rules': os.path.join(work, "rules.yaml"),
+    }
+    paths['expected'] = fixtures.make_tree(paths['tree'], sizes['tree_files'])
+    fixtures.make_etc_root(paths['root'], sizes['users'])
+    paths['proc_sys'] = fixtures.make_proc_sys(paths['root'])
+    paths['results'] = fixtures.make_results(paths['scan'], sizes['results_per_module'])
+    fixtures.make_rules(paths['rules'], sizes['rule_exact'], sizes['rule_wildcards'])
+    print(f"Fixtures built in {time.perf_counter() - started:.1f}s in {work}", file=sys.stderr)
+    return paths
+
+
+def _gui_benchmark(parsed: List[Dict]) -> Optional[Benchmark]:
+    """Model population and filtering; None when PyQt5 is not installed."""
+    try:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt5.QtWidgets import QApplication
+        from scanner.result_model import ResultFilterProxyModel, ResultTableModel
+    except ImportError:
+        return None
+    app = QApplication.instance() or QApplication([])
+    model = ResultTableModel()
+    proxy = ResultFilterProxyModel()
+    proxy.setSourceModel(model)
+
+    def populate():
+        model.set_results(parsed)
+        proxy.set_filters('HIGH', None, 'user')
+        rows = proxy.rowCount()
+        proxy.set_filters(None, None, '')
+        return rows
+
+    populate.app = app
+    return Benchmark('gui_model_populate', populate,
+                     lambda rows: None if rows > 0 else "filter matched no rows")
+
+
+def benchmarks(paths: Dict, sizes: Dict[str, int]) -> List[Benchmark]:
+    """Return the benchmarks over the built fixtures."""
+    default_rules = os.path.join(os.path.dirname(BENCH_DIR), "rules", "rules.yaml")
+    parser = ScanParser([default_rules, paths['rules']])
+    parser.set_scan_dir(paths['scan'])
+
+    def walk():
+        return PermissionsWalker(paths['tree']).walk()
+
+    def verify_walk(stats):
+        for category, expected in paths['expected'].items():
+            if stats.counts[category] != expected:
+                return f"{category}: found {stats.counts[category]}, seeded {expected}"
+        return None
+
+    def parse():
+        # A fresh parser state, as after a new scan
+        parser.set_scan_dir(paths['scan'])
+        return parser.parse_results()
+
+    names = fixtures.check_names(sizes['lookups'])
+    names += [f"Synthetic Prefix {i % sizes['rule_wildcards']}: item {i}" for i in range(1000)]
+
+    def lookup():
+        index = RuleIndex(parser.rules)
+        return sum(1 for name in names if index.lookup(name) is not None)
+
+    parsed = parse()
+    summary = ScanParser.summarize(parsed)
+    generator = ReportGenerator(tempfile.mkdtemp(prefix="hardening-bench-report-"))
+
+    def report():
+        return generator.generate_html(parsed, summary)
+
+    def sysctl():
+        return [evaluate(checks, paths['proc_sys']) for checks in CHECK_TABLES.values()]
+
+    def sshd():
+        return SshdConfigParser(paths['root']).parse()
+
+    def accounts():
+        db = AccountLoader(paths['root']).load()
+        return db, user_records(db) + home_records(db, paths['root'])
+
+    def verify_accounts(outcome):
+        db, records = outcome
+        if len(db.users) != sizes['users'] + 2:
+            return f"loaded {len(db.users)} users"
+        return None if records else "no account records"
+
+    suite = [
+        Benchmark('permissions_walk', walk, verify_walk, repeat=3),
+        Benchmark('parse_results', parse,
+                  lambda r: None if len(r) == paths['results'] else f"parsed {len(r)} results"),
+        Benchmark('rule_matching', lookup,
+                  lambda hits: None if hits == len(names) else f"{len(names) - hits} names without a rule"),
+        Benchmark('generate_html', report,
+                  lambda html: None if html.count("<tr class=") == len(parsed) else "rows missing"),
+        Benchmark('sysctl_checks', sysctl, repeat=20),
+        Benchmark('sshd_config_parse', sshd,
+                  lambda config: None if config.match_blocks else "Match blocks not parsed", repeat=20),
+        Benchmark('account_checks', accounts, verify_accounts),
+    ]
+    gui = _gui_benchmark(parsed)
+    if gui is not None:
+        suite.append(gui)
+    return suite
+
+
+def compare(results: Dict[str, Dict], baseline: Optional[Dict], tolerance: float,
+            floor_ms: float = DEFAULT_FLOOR_MS) -> List[str]:
+    """Return the regressions against the baseline."""
+    if not baseline:
+        return []
+    regressions = []
+    for name, result in results.items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            continue
+        limit = max(reference['median_ms'] * (1 + tolerance), reference['median_ms'] + floor_ms)
+        if result['median_ms'] > limit:
+            regressions.append(f"{name}: {result['median_ms']:.1f} ms > {limit:.1f} ms "
+                               f"(baseline {reference['median_ms']:.1f} ms)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--scale', type=float, default=1.0,
+                            help="Multiply the fixture sizes (default: 1.0)")
+    arg_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline file")
+    arg_parser.add_argument('--save', action='store_true', help="Store the results as the baseline")
+    arg_parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help="Allowed slowdown (0.5 = 50%% slower than the baseline)")
+    arg_parser.add_argument('--floor', type=float, default=DEFAULT_FLOOR_MS, metavar='MS',
+                            help="Slowdown in ms always allowed (default: %(default)g)")
+    arg_parser.add_argument('--only', action='append', default=None, metavar='NAME',
+                            help="Run only these benchmarks")
+    arg_parser.add_argument('--keep', action='store_true', help="Keep the fixture directory")
+    args = arg_parser.parse_args(argv)
+
+    sizes = {key: max(1, int(value * args.scale)) for key, value in SIZES.items()}
+    work = tempfile.mkdtemp(prefix="hardening-bench-")
+    # Keep the rules cache of the benchmark out of the user's state directory
+    os.environ['HARDENING_STATE_DIR'] = os.path.join(work, "state")
+    os.environ.pop('HARDENING_RULES', None)
+    try:
+        paths = build_fixtures(work, sizes)
+        results = {}
+        errors = []
+        for benchmark in benchmarks(paths, sizes):
+            if args.only and benchmark.name not in args.only:
+                continue
+            result = benchmark.measure()
+            results[benchmark.name] = result
+            status = f"  FAILED: {result['error']}" if result['error'] else ""
+            print(f"{benchmark.name:<22} {result['median_ms']:10.1f} ms  (min {result['min_ms']:.1f}){status}")
+            if result['error']:
+                errors.append(f"{benchmark.name}: {result['error']}")
+    finally:
+        if args.keep:
+            print(f"Fixtures kept in {work}", file=sys.stderr)
+        else:
+            shutil.rmtree(work, ignore_errors=True)
+
+    if args.save:
+        document = {
+            'scale': args.scale,
+            'sizes': sizes,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'results': results,
+        }
+        with open(args.baseline, 'w') as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 1 if errors else 0
+
+    baseline = None
+    try:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print("No baseline yet; store one with --save")
+    if baseline is not None and baseline.get('scale') != args.scale:
+        print(f"Baseline was recorded at scale {baseline.get('scale')}; not comparing")
+        baseline = None
+
+    regressions = compare(results, baseline, args.tolerance, args.floor)
+    for message in errors:
+        print(f"ERROR {message}")
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if errors or regressions:
+        return 1
+    if baseline is not None:
+        print(f"No regressions (tolerance {args.tolerance:.0%}, at least {args.floor:g} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
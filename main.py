@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Main entry point for Host Hardening Checker.
-Run this script to launch the GUI application.
+Run this script to launch the GUI application, or with --headless to scan
+without a display (see scanner/cli.py for the options).
 """
 
 import sys
@@ -11,9 +12,13 @@ import os
 script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, script_dir)
 
-# Import and run GUI
-from scanner.gui import main
-
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--headless":
+        # Headless scan: never import Qt
+        from scanner.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[2:]))
+    
+    # Import and run GUI
+    from scanner.gui import main
     main()
 
@@ -0,0 +1,9 @@
+"""
+Run the headless scanner: python3 -m scanner [options].
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
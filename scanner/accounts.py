@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Single-pass account database for users.sh and permissions.sh.
+
+users.sh enumerated the accounts with ``getent passwd`` for every check and
+ran ``chage -l`` (plus grep/awk/tr) once per regular user; permissions.sh
+enumerated them again to ``stat`` each home directory. On hosts served by
+LDAP/SSSD every enumeration is a round trip to the directory, so a few
+thousand accounts took minutes.
+
+This module reads passwd, shadow, group and sudoers once into an indexed
+account model and evaluates all account checks against it, producing the
+same check names and details as the shell checks. Accounts come from NSS
+enumeration on the live host (the same accounts ``getent`` lists) or from
+the files below an offline root.
+"""
+
+import argparse
+import glob
+import grp
+import os
+import pwd
+import re
+import stat
+import subprocess
+import sys
+from typing import List, Optional
+
+from .emit import Record, write_records
+
+
+# First UID of regular (non-system) accounts
+UID_MIN = 1000
+
+# Shells that do not allow logins
+NOLOGIN_SHELLS = ('/usr/sbin/nologin', '/bin/false', '/sbin/nologin')
+
+ADMIN_GROUPS = ('sudo', 'wheel', 'adm', 'admin')
+
+# Home directory modes considered secure
+HOME_MODES = ('700', '750')
+
+# Maximum password age shown by chage for "never expires"
+NEVER_EXPIRES = 99999
+
+# Seconds a getent call may take
+GETENT_TIMEOUT = 60
+
+# Comment lines of sudoers ("#1000 ALL=..." is a rule for UID 1000)
+COMMENT = re.compile(r'#(?!\d)')
+
+
+class User:
+    """A passwd entry with its shadow password ageing, if readable."""
+
+    __slots__ = ('name', 'password', 'uid', 'gid', 'gecos', 'home', 'shell', 'shadow')
+
+    def __init__(self, name: str, password: str, uid: int, gid: int, gecos: str,
+                 home: str, shell: str):
+        self.name = name
+        self.password = password
+        self.uid = uid
+        self.gid = gid
+        self.gecos = gecos
+        self.home = home
+        self.shell = shell
+        # shadow fields 2-9 (password, last change, min, max, warn, inactive,
+        # expire, reserved), None without a shadow entry
+        self.shadow = None
+
+    def max_days(self) -> Optional[int]:
+        """
+        Maximum password age as ``chage -l`` shows it.
+
+        Returns:
+            Days (-1 when the field is empty), or None without a shadow entry
+        """
+        if self.shadow is None:
+            return None
+        try:
+            return int(self.shadow[3])
+        except (IndexError, ValueError):
+            return -1
+
+
+class Group:
+    """A group entry."""
+
+    __slots__ = ('name', 'gid', 'members')
+
+    def __init__(self, name: str, gid: int, members: List[str]):
+        self.name = name
+        self.gid = gid
+        self.members = members
+
+
+class SudoRule:
+    """A user specification line of sudoers (who may run what)."""
+
+    __slots__ = ('principals', 'spec', 'path', 'line')
+
+    def __init__(self, principals: List[str], spec: str, path: str, line: int):
+        self.principals = principals
+        self.spec = spec
+        self.path = path
+        self.line = line
+
+
+def _int(value: str, default: int = -1) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+class AccountDB:
+    """Users, groups and sudoers rules with indexes by name and ID."""
+
+    def __init__(self):
+        self.users = []
+        self.groups = []
+        self.sudo_rules = []
+        self.by_name = {}
+        self.by_uid = {}
+        self.group_by_name = {}
+        self.group_by_gid = {}
+        # User name -> names of the groups listing it as a member
+        self.member_of = {}
+        # False when shadow could not be read (chage -l fails as non-root)
+        self.shadow_readable = False
+        self.sudoers_readable = False
+        self.errors = []
+
+    def add_user(self, user: User):
+        self.users.append(user)
+        # The first entry wins, as for getpwnam
+        self.by_name.setdefault(user.name, user)
+        self.by_uid.setdefault(user.uid, []).append(user)
+
+    def add_group(self, group: Group):
+        self.groups.append(group)
+        self.group_by_name.setdefault(group.name, group)
+        self.group_by_gid.setdefault(group.gid, group)
+        for member in group.members:
+            self.member_of.setdefault(member, []).append(group.name)
+
+    def set_shadow(self, name: str, fields: List[str]):
+        user = self.by_name.get(name)
+        if user is not None and user.shadow is None:
+            user.shadow = fields
+
+    def groups_of(self, name: str) -> List[str]:
+        """Return the names of the primary and supplementary groups of a user."""
+        names = []
+        user = self.by_name.get(name)
+        if user is not None and user.gid in self.group_by_gid:
+            names.append(self.group_by_gid[user.gid].name)
+        for group_name in self.member_of.get(name, []):
+            if group_name not in names:
+                names.append(group_name)
+        return names
+
+
+class AccountLoader:
+    """Builds an AccountDB from NSS or from the files of an offline root."""
+
+    def __init__(self, root: str = '', source: str = None):
+        """
+        Initialize the loader.
+
+        Args:
+            root: Offline root to read the account files from ('' = live host)
+            source: 'nss' or 'files' (default: 'nss' for the live host,
+                'files' for an offline root)
+        """
+        self.root = root.rstrip('/')
+        self.source = source or ('files' if self.root else 'nss')
+
+    def _path(self, path: str) -> str:
+        return self.root + path
+
+    def load(self) -> AccountDB:
+        """Read every account source once and return the indexed model."""
+        db = AccountDB()
+        if self.source == 'nss':
+            self._load_nss(db)
+        else:
+            self._load_files(db)
+        self._load_sudoers(db, self._path("/etc/sudoers"), 0)
+        return db
+
+    def _read_lines(self, path: str, db: AccountDB) -> Optional[List[str]]:
+        try:
+            with open(path, 'r', errors='replace') as f:
+                return f.read().splitlines()
+        except OSError as e:
+            db.errors.append(f"Cannot read {path}: {e.strerror}")
+            return None
+
+    def _load_files(self, db: AccountDB):
+        for line in self._read_lines(self._path("/etc/passwd"), db) or []:
+            fields = line.split(':')
+            if len(fields) < 7 or line.startswith(('#', '+', '-')):
+                continue
+            db.add_user(User(fields[0], fields[1], _int(fields[2]), _int(fields[3]),
+                             fields[4], fields[5], fields[6]))
+        for line in self._read_lines(self._path("/etc/group"), db) or []:
+            fields = line.split(':')
+            if len(fields) < 4 or line.startswith(('#', '+', '-')):
+                continue
+            db.add_group(Group(fields[0], _int(fields[2]),
+                               [m for m in fields[3].split(',') if m]))
+        shadow = self._read_lines(self._path("/etc/shadow"), db)
+        if shadow is not None:
+            self._apply_shadow(db, shadow)
+
+    def _load_nss(self, db: AccountDB):
+        # One enumeration each, in-process (getpwent/getgrent through NSS)
+        for entry in pwd.getpwall():
+            db.add_user(User(entry.pw_name, entry.pw_passwd, entry.pw_uid, entry.pw_gid,
+                             entry.pw_gecos, entry.pw_dir, entry.pw_shell))
+        for entry in grp.getgrall():
+            db.add_group(Group(entry.gr_name, entry.gr_gid, list(entry.gr_mem)))
+        shadow = self._getent('shadow')
+        if shadow is None:
+            shadow = self._read_lines("/etc/shadow", db)
+        if shadow is not None:
+            self._apply_shadow(db, shadow)
+
+    @staticmethod
+    def _getent(database: str) -> Optional[List[str]]:
+        """Enumerate an NSS database with one getent call (None if that fails)."""
+        try:
+            completed = subprocess.run(["getent", database], stdout=subprocess.PIPE,
+                                       stderr=subprocess.DEVNULL, timeout=GETENT_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if completed.returncode != 0 or not completed.stdout:
+            return None
+        return completed.stdout.decode('utf-8', 'replace').splitlines()
+
+    @staticmethod
+    def _apply_shadow(db: AccountDB, lines: List[str]):
+        db.shadow_readable = True
+        for line in lines:
+            fields = line.split(':')
+            if len(fields) >= 2:
+                db.set_shadow(fields[0], fields[1:])
+
+    def _load_sudoers(self, db: AccountDB, path: str, depth: int):
+        if depth > 8:
+            return
+        # No /etc/sudoers at all is a host without sudo, not a read error
+        if depth == 0 and not os.path.lexists(path):
+            return
+        lines = self._read_lines(path, db)
+        if lines is None:
+            return
+        db.sudoers_readable = True
+        number = 0
+        pending = ''
+        for number, raw in enumerate(lines, 1):
+            # Backslash continues a line
+            if raw.endswith('\\'):
+                pending += raw[:-1] + ' '
+                continue
+            line = (pending + raw).strip()
+            pending = ''
+            words = line.split()
+            if not words:
+                continue
+            directive = words[0]
+            if directive in ('@includedir', '#includedir') and len(words) > 1:
+                for included in sorted(glob.glob(os.path.join(self._path(words[1]), '*'))):
+                    name = os.path.basename(included)
+                    # sudo skips names with a dot or ending in ~
+                    if '.' not in name and not name.endswith('~') and os.path.isfile(included):
+                        self._load_sudoers(db, included, depth + 1)
+                continue
+            if directive in ('@include', '#include') and len(words) > 1:
+                self._load_sudoers(db, self._path(words[1]), depth + 1)
+                continue
+            if COMMENT.match(line) or directive.startswith('Defaults') or directive.endswith('_Alias'):
+                continue
+            if '=' not in line:
+                continue
+            # "who[, who] host=(runas) commands": principals end at the
+            # first whitespace not following a comma
+            who, spec = (line.split(None, 1) + [''])[:2]
+            while who.endswith(',') and spec:
+                more, spec = (spec.split(None, 1) + [''])[:2]
+                who += more
+            db.sudo_rules.append(SudoRule([p for p in who.split(',') if p],
+                                          spec.strip(), path[len(self.root):], number))
+
+
+def user_records(db: AccountDB) -> List[Record]:
+    """
+    Evaluate the user checks of users.sh against the account model.
+
+    Sections (in users.sh order): uid0, empty_password, password_storage,
+    password_expiry, system_shells, sudo, admin_groups.
+
+    Returns:
+        (section, check_name, result, status, details) records
+    """
+    records = []
+
+    uid0 = [u.name for u in db.users if u.uid == 0 and u.name != 'root']
+    if uid0:
+        records.append(('uid0', "UID 0 Users", "FAIL", "HIGH",
+                        f"Users with UID 0 found: {' '.join(uid0)}"))
+    else:
+        records.append(('uid0', "UID 0 Users", "PASS", "LOW", "Only root has UID 0"))
+
+    empty = [u.name for u in db.users if u.password in ('', '!')]
+    if empty:
+        records.append(('empty_password', "Empty Password Accounts", "FAIL", "HIGH",
+                        f"Accounts with empty passwords: {' '.join(empty)}"))
+    else:
+        records.append(('empty_password', "Empty Password Accounts", "PASS", "LOW",
+                        "No accounts with empty passwords"))
+
+    for user in db.users:
+        # A hash in passwd itself instead of the "x" pointing to shadow
+        if user.uid >= UID_MIN and user.password not in ('', '*', '!', 'x'):
+            records.append(('password_storage', "User Password Storage", "WARN", "HIGH",
+                            f"User {user.name} may have password in /etc/passwd"))
+
+    if db.shadow_readable:
+        for user in db.users:
+            if user.uid < UID_MIN:
+                continue
+            max_days = user.max_days()
+            # chage -l shows -1 (empty field) or 99999 for "never"
+            if max_days is not None and (max_days < 0 or max_days >= NEVER_EXPIRES):
+                if max_days < 0:
+                    reason = "maximum password age is not set (-1)"
+                else:
+                    reason = f"maximum password age is {max_days} days"
+                records.append(('password_expiry', f"Password Expiration: {user.name}",
+                                "WARN", "MEDIUM",
+                                f"User {user.name} has no password expiration: {reason}"))
+
+    shells = [u.name for u in db.users if u.uid < UID_MIN and u.shell not in NOLOGIN_SHELLS]
+    if shells:
+        records.append(('system_shells', "System Accounts with Shells", "WARN", "MEDIUM",
+                        f"System accounts with shells: {' '.join(shells)}"))
+    else:
+        records.append(('system_shells', "System Accounts with Shells", "PASS", "LOW",
+                        "System accounts have restricted shells"))
+
+    sudo_group = db.group_by_name.get('sudo')
+    if sudo_group is not None and sudo_group.members:
+        records.append(('sudo', "Sudo Users", "INFO", "LOW",
+                        f"Users with sudo access: {','.join(sudo_group.members)}"))
+    grants = []
+    for rule in db.sudo_rules:
+        for principal in rule.principals:
+            if principal != 'root' and principal not in grants:
+                grants.append(principal)
+    if grants:
+        records.append(('sudo', "Sudoers Grants", "INFO", "LOW",
+                        f"Users and groups granted rules in sudoers: {' '.join(grants)}"))
+
+    for name in ADMIN_GROUPS:
+        group = db.group_by_name.get(name)
+        if group is not None and group.members:
+            records.append(('admin_groups', f"Admin Group: {name}", "INFO", "LOW",
+                            f"Members of {name}: {','.join(group.members)}"))
+    return records
+
+
+def home_records(db: AccountDB, root: str = '') -> List[Record]:
+    """
+    Evaluate the home directory checks of permissions.sh.
+
+    Args:
+        db: Account model
+        root: Offline root the home directories live under
+
+    Returns:
+        ('home', check_name, result, status, details) records
+    """
+    records = []
+    seen = set()
+    for user in db.users:
+        home = user.home
+        if user.uid < UID_MIN or home in seen or not home or home == '/':
+            continue
+        seen.add(home)
+        try:
+            st = os.stat(root.rstrip('/') + home)
+        except OSError:
+            continue
+        if not stat.S_ISDIR(st.st_mode):
+            continue
+        mode = format(st.st_mode & 0o7777, 'o')
+        if mode in HOME_MODES:
+            records.append(('home', f"Home Directory: {home}", "PASS", "LOW",
+                            f"Home directory has secure permissions: {mode}"))
+        else:
+            records.append(('home', f"Home Directory: {home}", "WARN", "MEDIUM",
+                            f"Home directory permissions: {mode} (should be 700 or 750)"))
+    return records
+
+
+CHECKS = {
+    'users': lambda db, root: user_records(db),
+    'homes': home_records,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point used by users.sh and permissions.sh."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('checks', choices=sorted(CHECKS), nargs='+',
+                            help="Check groups to evaluate")
+    arg_parser.add_argument('--root', default='', help="Offline root to read the accounts from")
+    arg_parser.add_argument('--source', choices=('nss', 'files'), default=None,
+                            help="Account source (default: nss, files with --root)")
+    args = arg_parser.parse_args(argv)
+
+    db = AccountLoader(args.root, args.source).load()
+    for error in db.errors:
+        print(error, file=sys.stderr)
+    for name in args.checks:
+        write_records(CHECKS[name](db, args.root))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Incremental authentication log analyzer for users.sh.
+
+users.sh grepped all of /var/log/auth.log and /var/log/secure for failed
+passwords on every run and kept the last 20 matches, so on a busy bastion a
+scan read gigabytes to report a count capped at 20.
+
+This analyzer keeps a checkpoint (inode, byte offset and a hash of the first
+bytes of each log) in the scan state directory, one per scanned root, and only
+reads what was appended since the last run, in large blocks. Log rotation is
+followed: when the log was renamed (auth.log -> auth.log.1) or copied and
+truncated, the rest of the old file is read from the rotated copy, found by
+inode or by its head hash; rotated and ``.gz`` files already read are
+remembered by head hash and skipped. On the first run rotated logs younger
+than the retention of the counts (a week) are read too.
+
+Failures are counted in time buckets per source IP and per user, so the
+report gives real failure rates over a time window (default: 24 hours).
+"""
+
+import argparse
+import datetime
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, IO, List, Optional
+
+from .emit import Record, write_records
+from .state import open_private, private_dir, state_dir
+
+
+DEFAULT_LOGS = ("/var/log/auth.log", "/var/log/secure")
+
+STATE_VERSION = 1
+
+# Read size for the logs
+BLOCK_SIZE = 1 << 20
+
+# Bytes hashed to recognise a log after rotation or compression
+HEAD_BYTES = 4096
+
+# Counts are kept per bucket of this many seconds
+BUCKET_SECONDS = 600
+
+# Window of the report (hours) and how long counts are kept (seconds)
+DEFAULT_WINDOW_HOURS = 24.0
+RETENTION = 7 * 86400
+
+# Failures in the window from one IP (or for one user) that get their own result
+DEFAULT_THRESHOLD = 10
+
+# Sources and users reported individually, worst first
+TOP_ENTRIES = 20
+
+# Bound on the IPs and users kept in the checkpoint
+MAX_KEYS = 50000
+
+# User names remembered per source IP
+USERS_PER_IP = 5
+
+# Head hashes of rotated files already read
+SEEN_LIMIT = 200
+
+# Starts with a literal so the regex engine can skip ahead between failures;
+# the timestamp is taken from the start of the matching line
+FAILURE = re.compile(
+    rb'Failed (?:password|keyboard-interactive/pam) for (?:invalid user )?(?P<user>[^\n]*?)'
+    rb' from (?P<ip>\S+) port ')
+
+REPEATED = re.compile(rb'message repeated (\d+) times: \[ $')
+
+MONTHS = {name: number for number, name in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+
+
+def _timestamp(text: str, now: float) -> Optional[float]:
+    """
+    Convert a syslog timestamp to epoch seconds.
+
+    Traditional timestamps have no year: the current year is assumed, or
+    the previous one for dates in the future (logs from last December).
+    """
+    if text[0].isdigit():
+        # RFC 3339 (rsyslog high-precision format)
+        try:
+            value = datetime.datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if value.tzinfo is None:
+            return time.mktime(value.timetuple())
+        return value.timestamp()
+    month = MONTHS.get(text[:3])
+    if month is None:
+        return None
+    year = time.localtime(now).tm_year
+    try:
+        day = int(text[4:6])
+        hour, minute, second = (int(part) for part in text[7:15].split(':'))
+        stamp = time.mktime((year, month, day, hour, minute, second, 0, 0, -1))
+        if stamp > now + 86400:
+            stamp = time.mktime((year - 1, month, day, hour, minute, second, 0, 0, -1))
+    except (ValueError, OverflowError):
+        return None
+    return stamp
+
+
+def _head_hash(data: bytes) -> Dict:
+    return {'len': len(data), 'sha': hashlib.sha1(data).hexdigest()}
+
+
+def _open(path: str) -> IO[bytes]:
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def _read_head(path: str, length: int = HEAD_BYTES) -> Optional[bytes]:
+    try:
+        with _open(path) as f:
+            return f.read(length)
+    except (OSError, EOFError):
+        return None
+
+
+class FailureCounts:
+    """Failure counts per source IP and per user, in time buckets."""
+
+    def __init__(self, data: Dict = None):
+        data = data or {}
+        self.ip = data.get('ip', {})
+        self.user = data.get('user', {})
+        self.ip_users = data.get('ip_users', {})
+
+    def add(self, stamp: float, ip: str, user: str, count: int = 1):
+        bucket = str(int(stamp // BUCKET_SECONDS * BUCKET_SECONDS))
+        for table, key in ((self.ip, ip), (self.user, user)):
+            buckets = table.setdefault(key, {})
+            buckets[bucket] = buckets.get(bucket, 0) + count
+        users = self.ip_users.setdefault(ip, [])
+        if user not in users and len(users) < USERS_PER_IP:
+            users.append(user)
+
+    def prune(self, oldest: float):
+        """Drop buckets older than oldest and bound the number of keys."""
+        for table in (self.ip, self.user):
+            for key in list(table):
+                buckets = {b: n for b, n in table[key].items() if int(b) >= oldest}
+                if buckets:
+                    table[key] = buckets
+                else:
+                    del table[key]
+            if len(table) > MAX_KEYS:
+                ranked = sorted(table, key=lambda k: sum(table[k].values()), reverse=True)
+                for key in ranked[MAX_KEYS:]:
+                    del table[key]
+        for ip in list(self.ip_users):
+            if ip not in self.ip:
+                del self.ip_users[ip]
+
+    @staticmethod
+    def window_totals(table: Dict[str, Dict[str, int]], since: float) -> Dict[str, int]:
+        """Return the failures per key from since on."""
+        totals = {}
+        for key, buckets in table.items():
+            total = sum(n for b, n in buckets.items() if int(b) + BUCKET_SECONDS > since)
+            if total:
+                totals[key] = total
+        return totals
+
+    def to_dict(self) -> Dict:
+        return {'ip': self.ip, 'user': self.user, 'ip_users': self.ip_users}
+
+
+class AuthLogAnalyzer:
+    """Reads the new part of the auth logs and keeps failure counts."""
+
+    def __init__(self, logs: List[str] = None, state_file: str = None, root: str = '',
+                 now: float = None):
+        """
+        Initialize the analyzer.
+
+        Args:
+            logs: Logs to follow, as seen on the host (default: auth.log and secure)
+            state_file: Checkpoint file (default: authlog-<hash of the root>.json
+                in the state directory; '' = no checkpoint, read everything)
+            root: Offline root the logs live under
+            now: Current time (for tests and fixtures)
+        """
+        self.root = root.rstrip('/')
+        self.logs = [self.root + path for path in (logs or DEFAULT_LOGS)]
+        # Counts of different roots (or of the live host) must not mix
+        self.root_key = os.path.abspath(self.root or '/')
+        if state_file is None:
+            key = hashlib.sha1(self.root_key.encode('utf-8', 'surrogateescape')).hexdigest()
+            state_file = os.path.join(state_dir(), f"authlog-{key}.json")
+        self.state_file = state_file
+        self.now = now if now is not None else time.time()
+        self.bytes_read = 0
+        self.state = self._load_state()
+        self.counts = FailureCounts(self.state.get('counts'))
+        # Timestamp text -> bucket, and counts not yet folded into self.counts
+        self._buckets = {}
+        self._pending = {}
+
+    def _load_state(self) -> Dict:
+        if not self.state_file:
+            return {}
+        try:
+            with open_private(self.state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+            return {}
+        if state.get('root') != self.root_key:
+            return {}
+        return state
+
+    def save(self):
+        """Write the checkpoint atomically."""
+        if not self.state_file:
+            return
+        self.counts.prune(self.now - RETENTION)
+        self.state['version'] = STATE_VERSION
+        self.state['root'] = self.root_key
+        self.state['counts'] = self.counts.to_dict()
+        self.state['seen'] = self.state.get('seen', [])[-SEEN_LIMIT:]
+        if not private_dir(os.path.dirname(os.path.abspath(self.state_file))):
+            return
+        try:
+            with open(self.state_file + ".tmp", 'w') as f:
+                json.dump(self.state, f, separators=(',', ':'))
+            os.replace(self.state_file + ".tmp", self.state_file)
+        except OSError as e:
+            print(f"Warning: could not save the auth log checkpoint: {e}", file=sys.stderr)
+
+    def _bucket(self, line: bytes) -> Optional[int]:
+        """Time bucket of a log line, None if unknown or past the retention."""
+        if line[:1].isdigit():
+            text = line.split(b' ', 1)[0]
+        else:
+            text = line[:15]
+        if text in self._buckets:
+            return self._buckets[text]
+        if len(self._buckets) > 100000:
+            self._buckets.clear()
+        stamp = _timestamp(text.decode('ascii', 'replace'), self.now)
+        bucket = None
+        if stamp is not None and stamp >= self.now - RETENTION:
+            bucket = int(stamp // BUCKET_SECONDS * BUCKET_SECONDS)
+        self._buckets[text] = bucket
+        return bucket
+
+    def _count(self, data: bytes):
+        # Raw (bucket, ip, user) counts; decoded once in _flush
+        pending = self._pending
+        for match in FAILURE.finditer(data):
+            position = match.start()
+            line_start = data.rfind(b'\n', 0, position) + 1
+            bucket = self._bucket(data[line_start:line_start + 40])
+            if bucket is None:
+                continue
+            count = 1
+            if data[position - 2:position] == b'[ ':
+                repeated = REPEATED.search(data, line_start, position)
+                if repeated is not None:
+                    count = int(repeated.group(1))
+            key = (bucket, match.group('ip'), match.group('user'))
+            pending[key] = pending.get(key, 0) + count
+
+    def _flush(self):
+        for (bucket, ip, user), count in self._pending.items():
+            self.counts.add(bucket, ip.decode('utf-8', 'replace'),
+                            user.decode('utf-8', 'replace') or '(none)', count)
+        self._pending = {}
+
+    def _read(self, path: str, offset: int = 0, final: bool = True) -> int:
+        """
+        Count the failures in a log from offset on, in large blocks.
+
+        Args:
+            path: Log file (plain or .gz)
+            offset: Bytes (uncompressed) already read
+            final: The file is complete; otherwise a trailing partial line
+                is left for the next run
+
+        Returns:
+            Offset up to which the file has been read
+        """
+        try:
+            f = _open(path)
+        except OSError as e:
+            print(f"Cannot read {path}: {e.strerror}", file=sys.stderr)
+            return offset
+        with f:
+            try:
+                f.seek(offset)
+                tail = b''
+                while True:
+                    block = f.read(BLOCK_SIZE)
+                    if not block:
+                        break
+                    self.bytes_read += len(block)
+                    data = tail + block
+                    end = data.rfind(b'\n') + 1
+                    self._count(data[:end])
+                    tail = data[end:]
+                    offset += end
+            except (OSError, EOFError) as e:
+                print(f"Cannot read {path}: {e}", file=sys.stderr)
+                return offset
+        if final and tail:
+            self._count(tail + b'\n')
+            offset += len(tail)
+        return offset
+
+    def _mark_seen(self, head: Optional[bytes]):
+        if head:
+            digest = _head_hash(head)['sha']
+            seen = self.state.setdefault('seen', [])
+            if digest not in seen:
+                seen.append(digest)
+
+    def _rotated(self, log: str) -> List[str]:
+        """Rotated copies of a log, oldest first (auth.log.2.gz, auth.log.1)."""
+        paths = [p for p in glob.glob(glob.escape(log) + '[.-]*') if os.path.isfile(p)]
+
+        def age(path):
+            try:
+                return -os.stat(path).st_mtime
+            except OSError:
+                return 0
+        return sorted(paths, key=age)
+
+    def _follow(self, log: str):
+        files = self.state.setdefault('files', {})
+        previous = files.get(log)
+        try:
+            st = os.stat(log)
+        except OSError:
+            st = None
+        head = _read_head(log) if st is not None else None
+
+        def same_head(path: str, expected: Dict) -> bool:
+            data = _read_head(path, expected['len'])
+            return data is not None and _head_hash(data) == expected
+
+        offset = 0
+        if previous is not None and st is not None and st.st_ino == previous['inode'] \
+                and st.st_size >= previous['offset'] and same_head(log, previous['head']):
+            # Not rotated: only the appended part is new
+            offset = previous['offset']
+        elif previous is not None and previous['head']['len']:
+            # Rotated (renamed or copied and truncated): finish the old file
+            for path in self._rotated(log):
+                try:
+                    rotated = os.stat(path)
+                except OSError:
+                    continue
+                if rotated.st_ino == previous['inode'] or same_head(path, previous['head']):
+                    self._read(path, previous['offset'])
+                    self._mark_seen(_read_head(path))
+                    break
+
+        seen = set(self.state.get('seen', []))
+        for path in self._rotated(log):
+            # Rotated files not read yet: on the first run those younger
+            # than the retention, later any file rotated in between
+            data = _read_head(path)
+            if not data or _head_hash(data)['sha'] in seen:
+                continue
+            try:
+                recent = os.stat(path).st_mtime >= self.now - RETENTION
+            except OSError:
+                continue
+            if previous is not None or recent:
+                self._read(path)
+            self._mark_seen(data)
+
+        if st is None:
+            files.pop(log, None)
+            return
+        offset = self._read(log, offset, final=False)
+        files[log] = {'inode': st.st_ino, 'offset': offset, 'head': _head_hash(head or b'')}
+
+    def update(self) -> bool:
+        """
+        Read the new part of every log.
+
+        Returns:
+            True if at least one log exists
+        """
+        found = False
+        for log in self.logs:
+            if os.path.isfile(log):
+                found = True
+            self._follow(log)
+            self._flush()
+        return found
+
+    def records(self, window_hours: float = DEFAULT_WINDOW_HOURS,
+                threshold: int = DEFAULT_THRESHOLD) -> List[Record]:
+        """
+        Report the failures in the window.
+
+        Returns:
+            ('login_failures', check_name, result, status, details) records
+        """
+        since = self.now - window_hours * 3600
+        by_ip = self.counts.window_totals(self.counts.ip, since)
+        by_user = self.counts.window_totals(self.counts.user, since)
+        total = sum(by_ip.values())
+        if not total:
+            return []
+        window = f"{window_hours:g}h"
+        records = [('login_failures', "Recent Login Failures", "WARN", "MEDIUM",
+                    f"{total} failed login attempts in the last {window} "
+                    f"({total / window_hours:.1f}/hour) from {len(by_ip)} sources "
+                    f"for {len(by_user)} users")]
+
+        for ip, count in sorted(by_ip.items(), key=lambda i: (-i[1], i[0]))[:TOP_ENTRIES]:
+            if count < threshold:
+                break
+            users = ', '.join(self.counts.ip_users.get(ip, []))
+            records.append(('login_failures', f"Login Failures from: {ip}", "WARN",
+                            "HIGH" if count >= threshold * 10 else "MEDIUM",
+                            f"{count} failed logins in the last {window} "
+                            f"({count / window_hours:.1f}/hour), users tried: {users}"))
+        for user, count in sorted(by_user.items(), key=lambda i: (-i[1], i[0]))[:TOP_ENTRIES]:
+            if count < threshold:
+                break
+            records.append(('login_failures', f"Login Failures for: {user}", "WARN",
+                            "HIGH" if count >= threshold * 10 else "MEDIUM",
+                            f"{count} failed logins in the last {window} "
+                            f"({count / window_hours:.1f}/hour)"))
+        return records
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point used by users.sh."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--root', default='', help="Offline root to read the logs from")
+    arg_parser.add_argument('--log', action='append', default=None, metavar='PATH',
+                            help="Log to follow (repeatable; default: auth.log and secure)")
+    arg_parser.add_argument('--window', type=float, default=DEFAULT_WINDOW_HOURS,
+                            help="Report window in hours (default: 24)")
+    arg_parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                            help="Failures in the window that get a result per IP or user")
+    arg_parser.add_argument('--state', default=None,
+                            help="Checkpoint file ('' = read the logs in full, keep nothing)")
+    args = arg_parser.parse_args(argv)
+
+    analyzer = AuthLogAnalyzer(args.log, args.state, args.root)
+    if not analyzer.update():
+        return 0
+    analyzer.save()
+    print(f"Read {analyzer.bytes_read} bytes of auth logs", file=sys.stderr)
+    write_records(analyzer.records(args.window, args.threshold))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
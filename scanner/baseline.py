@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Baseline and delta reporting.
+
+A baseline is a compact snapshot of an accepted scan: one entry per check,
+keyed on a hash of the check name, holding its result and severity.
+Comparing a scan against the baseline is a single pass of dict lookups and
+reports only what changed:
+
+- new failures: checks failing (FAIL/WARN) now that were not failing;
+- resolved: checks failing in the baseline that no longer fail;
+- changed: checks whose result changed otherwise, or that still fail with
+  another severity.
+
+Details are not compared: many of them carry counts that change on every
+scan ("Recent Login Failures"). A check name that appears several times in
+one scan is keyed on its name and occurrence (``name#n``), the same scheme
+for a name reported once, so a second occurrence does not re-key the first.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sys
+import time
+from typing import Dict, Iterable, List, Optional
+
+from .parser import FAILING
+
+
+BASELINE_VERSION = 2
+
+# Kinds of change, in report order
+CHANGES = ['new', 'resolved', 'changed']
+
+CHANGE_LABELS = {
+    'new': "New Failures",
+    'resolved': "Resolved Failures",
+    'changed': "Changed",
+}
+
+
+def default_baseline_path() -> str:
+    """Return the baseline file, honouring HARDENING_BASELINE."""
+    path = os.environ.get('HARDENING_BASELINE')
+    if path:
+        return path
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "reports", "baseline.json")
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+
+
+def result_keys(results: List[Dict]) -> List[str]:
+    """
+    Return the comparison key of each result.
+
+    Args:
+        results: Parsed results
+
+    Returns:
+        One key per result, in the same order
+    """
+    occurrences = {}
+    keys = []
+    for result in results:
+        name = str(result['check_name'])
+        number = occurrences.get(name, 0)
+        occurrences[name] = number + 1
+        keys.append(_digest(f"{name}#{number}"))
+    return keys
+
+
+def make_baseline(results: Iterable[Dict], host: str = None) -> Dict:
+    """
+    Build a baseline from parsed results.
+
+    Args:
+        results: Parsed results (ScanParser.parse_results())
+        host: Host name (default: this host)
+
+    Returns:
+        Baseline dict, ready to be saved as JSON
+    """
+    results = list(results)
+    entries = {}
+    for key, result in zip(result_keys(results), results):
+        entries[key] = [
+            str(result['check_name']),
+            str(result['result']),
+            str(result['severity']),
+        ]
+    return {
+        'version': BASELINE_VERSION,
+        'host': host or socket.gethostname(),
+        'created_at': time.time(),
+        'entries': entries,
+    }
+
+
+def save_baseline(results: Iterable[Dict], path: str = None, host: str = None) -> str:
+    """
+    Save parsed results as the accepted baseline.
+
+    Returns:
+        Path of the baseline file
+    """
+    path = path or default_baseline_path()
+    baseline = make_baseline(results, host)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(baseline, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_baseline(path: str = None) -> Optional[Dict]:
+    """Load a baseline, or return None if there is none."""
+    path = path or default_baseline_path()
+    try:
+        with open(path, 'r') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read baseline {path}: {e}")
+        return None
+    if not isinstance(baseline, dict) or baseline.get('version') != BASELINE_VERSION:
+        print(f"Warning: ignoring baseline {path} with unsupported format")
+        return None
+    return baseline
+
+
+def diff_results(baseline: Dict, results: Iterable[Dict]) -> List[Dict]:
+    """
+    Compare parsed results against a baseline.
+
+    Args:
+        baseline: Baseline from make_baseline()/load_baseline()
+        results: Current parsed results
+
+    Returns:
+        Changed results, each a parsed result with 'change' (new, resolved
+        or changed) and 'previous' (baseline result, or None), ordered by
+        kind of change
+    """
+    results = list(results)
+    entries = baseline.get('entries', {})
+    seen = set()
+    changes = {kind: [] for kind in CHANGES}
+
+    for key, result in zip(result_keys(results), results):
+        seen.add(key)
+        entry = entries.get(key)
+        failing = result['result'] in FAILING
+        if entry is None:
+            if failing:
+                changes['new'].append(dict(result, change='new', previous=None))
+            continue
+
+        _name, previous, severity = entry
+        was_failing = previous in FAILING
+        if failing and not was_failing:
+            kind = 'new'
+        elif was_failing and not failing:
+            kind = 'resolved'
+        elif previous != result['result']:
+            kind = 'changed'
+        elif failing and severity != str(result['severity']):
+            kind = 'changed'
+        else:
+            continue
+        changes[kind].append(dict(result, change=kind, previous=previous))
+
+    # Failing checks that disappeared from the scan
+    for key, (name, previous, severity) in entries.items():
+        if key not in seen and previous in FAILING:
+            changes['resolved'].append({
+                'check_name': name,
+                'result': "ABSENT",
+                'severity': severity,
+                'remediation': "",
+                'details': "Check no longer reported",
+                'change': 'resolved',
+                'previous': previous,
+            })
+
+    return [entry for kind in CHANGES for entry in changes[kind]]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: save a baseline or print the delta."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('command', choices=['save', 'diff'])
+    arg_parser.add_argument('--baseline', default=None,
+                            help="Baseline file (default: reports/baseline.json)")
+    arg_parser.add_argument('--json', action='store_true', help="Print the delta as JSON")
+    arg_parser.add_argument('--html', action='store_true',
+                            help="Also save the delta as an HTML report in reports/")
+    args = arg_parser.parse_args(argv)
+
+    from .parser import ScanParser
+    results = ScanParser().parse_results()
+    if not results:
+        print("No scan results found")
+        return 1
+
+    if args.command == 'save':
+        print(f"Baseline saved to {save_baseline(results, args.baseline)}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print("No baseline found; save one with: python3 -m scanner.baseline save")
+        return 1
+    delta = diff_results(baseline, results)
+    if args.json:
+        print(json.dumps(delta, indent=2))
+    else:
+        for entry in delta:
+            previous = entry['previous'] or "-"
+            print(f"{entry['change']:<9} {entry['severity']:<7} {previous:>6} -> "
+                  f"{entry['result']:<6} {entry['check_name']}")
+        print(f"{len(delta)} changes since the baseline")
+    if args.html:
+        from .report import ReportGenerator
+        path = ReportGenerator().save_diff_report(delta, baseline)
+        if not args.json:
+            print(f"Report saved to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Headless command line interface for Host Hardening Checker.
+
+Runs the scan, parses the results and writes JSON and/or HTML without a
+display, for cron jobs and configuration management runs. Nothing here
+imports Qt, and the scheduler, parser and report code is only imported
+once it is needed, so ``--help`` and argument errors return immediately.
+
+The exit code reflects the highest severity among failing checks:
+
+    0  no failing checks
+    3  LOW      4  MEDIUM      5  HIGH
+    1  the scan could not be run or produced no results
+    2  invalid arguments
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Tuple
+
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+
+# Exit code per highest failing severity
+SEVERITY_EXIT_CODES = {
+    'LOW': 3,
+    'MEDIUM': 4,
+    'HIGH': 5,
+}
+
+def exit_code(results: List[Dict], failing: Optional[Tuple[str, ...]] = None) -> int:
+    """
+    Return the exit code for parsed results.
+
+    Args:
+        results: Parsed results (or a delta from baseline.diff_results())
+        failing: Results that count as failing (default: FAIL and WARN)
+
+    Returns:
+        Exit code of the highest failing severity, or 0
+    """
+    if failing is None:
+        from .parser import FAILING as failing
+    code = EXIT_OK
+    for result in results:
+        if result['result'] in failing:
+            code = max(code, SEVERITY_EXIT_CODES.get(result['severity'], SEVERITY_EXIT_CODES['LOW']))
+    return code
+
+
+def run_scan(args: argparse.Namespace) -> bool:
+    """Run the check modules; progress goes to stderr unless --quiet."""
+    from .scheduler import ModuleScheduler, env_jobs, env_timeout
+
+    def write_event(event: Dict):
+        kind = event['event']
+        if kind == 'module_started':
+            print(event['label'] or f"Running {event['module']} checks...", file=sys.stderr)
+        elif kind == 'module_finished':
+            status = "timed out" if event['timed_out'] else f"exit {event['returncode']}"
+            if event.get('cached'):
+                status = "cached"
+            if event.get('error'):
+                status = f"failed: {event['error']}"
+            print(f"  {event['module']:<12} {event['duration']:7.2f}s  {status}", file=sys.stderr)
+
+    scheduler = ModuleScheduler(
+        output_dir=args.output_dir,
+        jobs=args.jobs if args.jobs is not None else env_jobs(),
+        default_timeout=args.timeout if args.timeout is not None else env_timeout(),
+        modules=args.modules or None,
+        events=None if args.quiet else write_event,
+        echo=False,
+        use_cache=not args.no_cache
+    )
+    try:
+        runs = scheduler.run()
+    except OSError as e:
+        print(f"Error: could not run the scan: {e}", file=sys.stderr)
+        return False
+    failed = [run for run in runs if run.error]
+    for run in failed:
+        print(f"Error: {run.name} checks could not be run: {run.error}", file=sys.stderr)
+    return not failed
+
+
+def print_summary(summary: Dict, results: List[Dict], title: str):
+    """Print the summary counters and the failing checks to stdout."""
+    from .parser import FAILING
+    print(f"{title}: {summary['total']} checks, {summary['failed']} failed, "
+          f"{summary['warnings']} warnings "
+          f"(high {summary['high']}, medium {summary['medium']}, low {summary['low']})")
+    for result in results:
+        if result['result'] in FAILING:
+            print(f"  {result['severity']:<6} {result['result']:<4} {result['check_name']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    arg_parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        epilog="Exit codes: 0 clean, 3/4/5 highest failing severity LOW/MEDIUM/HIGH, 1 error"
+    )
+    arg_parser.add_argument('--no-scan', action='store_true',
+                            help="Use the results of the last scan instead of running one")
+    arg_parser.add_argument('--output-dir', default="/tmp/hardening-scan",
+                            help="Directory the modules write their results to")
+    arg_parser.add_argument('--jobs', type=int, default=None,
+                            help="Modules running at the same time (default: HARDENING_JOBS or 4)")
+    arg_parser.add_argument('--timeout', type=float, default=None,
+                            help="Timeout in seconds for every module, permissions included "
+                                 "(default: HARDENING_MODULE_TIMEOUT, else 300s and 3600s "
+                                 "for permissions)")
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help="Run every module, even if its inputs are unchanged")
+    arg_parser.add_argument('--rules', action='append', default=None, metavar='FILE',
+                            help="Rule file (repeatable, later files take precedence)")
+    arg_parser.add_argument('--json', metavar='FILE',
+                            help="Write the parsed results as JSON to FILE ('-' = stdout)")
+    arg_parser.add_argument('--html', nargs='?', const='', default=None, metavar='DIR',
+                            help="Save an HTML report (default directory: reports/)")
+    arg_parser.add_argument('--changes', action='store_true',
+                            help="Only report changes since the baseline (see scanner.baseline)")
+    arg_parser.add_argument('--record', action='store_true',
+                            help="Save the scan in the scan history")
+    arg_parser.add_argument('--ignore-warnings', action='store_true',
+                            help="Do not count WARN results when choosing the exit code")
+    arg_parser.add_argument('--quiet', '-q', action='store_true',
+                            help="Only print errors")
+    arg_parser.add_argument('modules', nargs='*', help="Modules to run (default: all)")
+    args = arg_parser.parse_args(argv)
+
+    if not args.no_scan and not run_scan(args):
+        return EXIT_ERROR
+
+    from .parser import FAILING, ScanParser
+    parser = ScanParser(args.rules)
+    parser.set_scan_dir(args.output_dir)
+    results = parser.parse_results()
+    if not results:
+        print(f"Error: no scan results in {args.output_dir}", file=sys.stderr)
+        return EXIT_ERROR
+    summary = parser.get_summary()
+
+    if args.record:
+        import sqlite3
+        from .history import HistoryStore
+        try:
+            with HistoryStore() as store:
+                store.record(results, summary, scanned_at=parser.scan_time())
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: could not record scan history: {e}", file=sys.stderr)
+
+    baseline = None
+    if args.changes:
+        from .baseline import diff_results, load_baseline
+        baseline = load_baseline()
+        if baseline is None:
+            print("Error: no baseline found; save one with: python3 -m scanner.baseline save",
+                  file=sys.stderr)
+            return EXIT_ERROR
+        results = diff_results(baseline, results)
+        summary = ScanParser.summarize(results)
+
+    if args.json:
+        document = {'summary': summary, 'results': results}
+        if args.json == '-':
+            json.dump(document, sys.stdout, indent=2)
+            sys.stdout.write("\n")
+        else:
+            with open(args.json, 'w') as f:
+                json.dump(document, f, indent=2)
+
+    if args.html is not None:
+        from .report import ReportGenerator
+        generator = ReportGenerator(args.html or None)
+        if baseline is not None:
+            path = generator.save_diff_report(results, baseline)
+        else:
+            from .timings import slowest_checks
+            path = generator.save_report(results, summary, slowest_checks(args.output_dir))
+        if not args.quiet:
+            print(f"Report saved to {path}", file=sys.stderr)
+
+    if not args.quiet and args.json != '-':
+        print_summary(summary, results, "Changes since baseline" if args.changes else "Scan")
+
+    failing = ('FAIL',) if args.ignore_warnings else FAILING
+    return exit_code(results, failing)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Record output shared by the Python helpers of the bash check modules.
+
+Helpers print one record per line, with the fields separated by the ASCII
+unit separator (0x1f) so that empty fields survive ``read``:
+``section<US>check_name<US>result<US>status<US>details``. The bash module
+loads them with ``load_records`` and emits each section at the point of its
+original check order with ``add_section_results`` (bash_checks/common.sh).
+"""
+
+import sys
+from typing import Iterable, TextIO, Tuple
+
+
+Record = Tuple[str, str, str, str, str]
+
+FIELD_SEPARATOR = '\x1f'
+
+
+def _clean(field: str) -> str:
+    """Make a field safe for the line-based output."""
+    return str(field).replace(FIELD_SEPARATOR, ' ').replace('\n', ' ')
+
+
+def write_records(records: Iterable[Record], out: TextIO = None):
+    """
+    Print records for a bash check module.
+
+    Args:
+        records: (section, check_name, result, status, details) tuples
+        out: Stream to write to (default: stdout)
+    """
+    if out is None:
+        out = sys.stdout
+    for record in records:
+        out.write(FIELD_SEPARATOR.join(_clean(field) for field in record) + '\n')
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Fleet aggregation of scan results from many hosts.
+
+Takes the /tmp/hardening-scan directories collected from many hosts (as
+directories or tar/zip archives) and merges them into per-check fleet
+statistics: on how many hosts each check fails, warns or passes, and which
+hosts are affected.
+
+Hosts are parsed in parallel by a process pool. Each worker streams one
+host's results and sends back a single compact row per check; the parent
+folds it into the statistics and drops it. Memory therefore grows with the
+number of distinct checks, not with the number of hosts: only a bounded
+sample of affected hosts per check, the worst hosts overall and the first
+unreadable hosts are kept. Checks reported once per item (a file, a user,
+a source IP) are counted under their parent check, e.g. "World-Writable
+File: /srv/x" as "World-Writable File", and the number of distinct checks
+is capped.
+"""
+
+import argparse
+import heapq
+import json
+import multiprocessing
+import os
+import sys
+import tarfile
+import tempfile
+import zipfile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Affected host names kept per check
+HOST_SAMPLE = 10
+
+# Hosts with the most failing checks kept for the report
+WORST_HOSTS = 25
+
+# Distinct checks counted; rows of further checks are only tallied
+MAX_CHECKS = 5000
+
+# Unreadable hosts listed with their error
+MAX_ERRORS = 100
+
+# Checks reported once per file, user, port, etc. ("<check>: <item>")
+PER_ITEM_CHECKS = frozenset((
+    'SUID File',
+    'World-Writable File',
+    'Open Port',
+    'Cron Directory',
+    'Password Expiration',
+    'Home Directory',
+    'Login Failures from',
+    'Login Failures for',
+    'SSH Match Block',
+))
+
+ARCHIVE_SUFFIXES = ('.tar.gz', '.tar.bz2', '.tar.xz', '.tgz', '.tar', '.zip')
+
+# Worst result of a check on one host (lower is worse)
+RESULT_RANK = {'FAIL': 0, 'WARN': 1, 'INFO': 2, 'PASS': 3}
+SEVERITY_RANK = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+
+# Parser of the worker process (see _init_worker)
+_worker_parser = None
+
+
+def host_name(source: str) -> str:
+    """Return the host name of a scan directory or archive (its file name)."""
+    name = os.path.basename(os.path.normpath(source))
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def is_archive(path: str) -> bool:
+    return os.path.isfile(path) and path.endswith(ARCHIVE_SUFFIXES)
+
+
+def expand_sources(paths: Iterable[str]) -> Iterator[str]:
+    """
+    Yield the scan sources (one per host) named by paths.
+
+    A directory holding result files is one host; any other directory is
+    expanded to the scan directories and archives it contains.
+    """
+    from .parser import ScanParser
+
+    for path in paths:
+        if is_archive(path):
+            yield path
+        elif os.path.isdir(path):
+            if any(os.path.isfile(os.path.join(path, name)) for name in ScanParser.RESULT_FILES):
+                yield path
+                continue
+            for entry in sorted(os.scandir(path), key=lambda e: e.name):
+                if entry.is_dir() or is_archive(entry.path):
+                    yield entry.path
+        else:
+            print(f"Warning: skipping {path}: not a scan directory or archive")
+
+
+def _extract_results(archive: str, target: str):
+    """Extract the result files of an archive, flattened, into target."""
+    from .parser import ScanParser
+
+    wanted = set(ScanParser.RESULT_FILES)
+    if archive.endswith('.zip'):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                name = os.path.basename(info.filename)
+                if name in wanted and not info.is_dir():
+                    with zf.open(info) as src, open(os.path.join(target, name), 'wb') as dst:
+                        dst.write(src.read())
+        return
+    with tarfile.open(archive) as tf:
+        for member in tf:
+            name = os.path.basename(member.name)
+            if name in wanted and member.isfile():
+                src = tf.extractfile(member)
+                with open(os.path.join(target, name), 'wb') as dst:
+                    dst.write(src.read())
+
+
+def fleet_check_name(check_name: str) -> str:
+    """Return the name a check is counted under (its parent for per-item checks)."""
+    parent, sep, _item = check_name.partition(': ')
+    return parent if sep and parent in PER_ITEM_CHECKS else check_name
+
+
+def _init_worker(rules_files: Optional[List[str]]):
+    """Load the rules once per worker process."""
+    global _worker_parser
+    from .parser import ScanParser
+    _worker_parser = ScanParser(rules_files, cache=False)
+
+
+def _host_checks(scan_dir: str) -> Dict[str, Tuple]:
+    """Return the worst (result, severity, remediation) of each check of one host."""
+    checks = {}
+    _worker_parser.set_scan_dir(scan_dir)
+    for result in _worker_parser.iter_results():
+        name = fleet_check_name(str(result['check_name']))
+        row = (str(result['result']), str(result['severity']), str(result['remediation']))
+        current = checks.get(name)
+        if current is None or RESULT_RANK.get(row[0], 2) < RESULT_RANK.get(current[0], 2):
+            checks[name] = row
+    return checks
+
+
+def parse_host(source: str) -> Tuple[str, Optional[str], Dict[str, Tuple]]:
+    """
+    Parse the scan of one host (runs in a worker process).
+
+    Returns:
+        (host, error message or None, {check name: (result, severity, remediation)})
+    """
+    host = host_name(source)
+    try:
+        if is_archive(source):
+            with tempfile.TemporaryDirectory(prefix="hardening-fleet-") as tmp:
+                _extract_results(source, tmp)
+                checks = _host_checks(tmp)
+        else:
+            checks = _host_checks(source)
+    except Exception as e:
+        return host, " ".join(str(e).split()), {}
+    if not checks:
+        return host, "no scan results", {}
+    return host, None, checks
+
+
+class FleetStats:
+    """Per-check statistics over the hosts of a fleet."""
+
+    def __init__(self, host_sample: int = HOST_SAMPLE, worst_hosts: int = WORST_HOSTS,
+                 max_checks: int = MAX_CHECKS, max_errors: int = MAX_ERRORS):
+        self.host_sample = host_sample
+        self.worst_hosts = worst_hosts
+        self.max_checks = max_checks
+        self.max_errors = max_errors
+        self.hosts = 0
+        # First max_errors unreadable hosts, and how many there were in all
+        self.errors = []
+        self.unreadable = 0
+        self.checks = {}
+        # Host check rows not counted because max_checks was reached
+        self.checks_omitted = 0
+        # (failed, high, host) min-heap of the hosts with most failing checks
+        self._worst = []
+
+    def add_host(self, host: str, checks: Dict[str, Tuple]):
+        """Fold the checks of one host into the statistics."""
+        self.hosts += 1
+        failed = high = 0
+        for name, (result, severity, remediation) in checks.items():
+            failing = result in ('FAIL', 'WARN')
+            if failing:
+                failed += 1
+                if severity == 'HIGH':
+                    high += 1
+            stats = self.checks.get(name)
+            if stats is None:
+                if len(self.checks) >= self.max_checks:
+                    self.checks_omitted += 1
+                    continue
+                stats = self.checks[name] = {
+                    'check_name': name,
+                    'hosts': 0,
+                    'results': {},
+                    'severity': severity,
+                    'remediation': remediation,
+                    'affected': [],
+                }
+            stats['hosts'] += 1
+            stats['results'][result] = stats['results'].get(result, 0) + 1
+            if failing:
+                if self.failing(stats) == 1:
+                    # Describe the check as it fails, not as it passes
+                    stats['severity'] = severity
+                    stats['remediation'] = remediation
+                elif SEVERITY_RANK.get(severity, 2) < SEVERITY_RANK.get(stats['severity'], 2):
+                    stats['severity'] = severity
+                if len(stats['affected']) < self.host_sample:
+                    stats['affected'].append(host)
+
+        entry = (failed, high, host)
+        if len(self._worst) < self.worst_hosts:
+            heapq.heappush(self._worst, entry)
+        elif entry > self._worst[0]:
+            heapq.heapreplace(self._worst, entry)
+
+    def add_error(self, host: str, error: str):
+        """Record a host whose scan could not be read."""
+        self.unreadable += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((host, error))
+
+    @staticmethod
+    def failing(stats: Dict) -> int:
+        """Number of hosts on which a check fails or warns."""
+        return stats['results'].get('FAIL', 0) + stats['results'].get('WARN', 0)
+
+    def ranked_checks(self) -> List[Dict]:
+        """Return the check statistics, most failing hosts (then severity) first."""
+        return sorted(self.checks.values(), key=lambda s: (
+            -self.failing(s), SEVERITY_RANK.get(s['severity'], 2), s['check_name']))
+
+    def worst_hosts_list(self) -> List[Dict]:
+        """Return the hosts with the most failing checks, worst first."""
+        return [{'host': host, 'failing': failed, 'high': high}
+                for failed, high, host in sorted(self._worst, reverse=True)]
+
+    def to_dict(self) -> Dict:
+        return {
+            'hosts': self.hosts,
+            'unreadable': self.unreadable,
+            'errors': [{'host': host, 'error': error} for host, error in self.errors],
+            'checks_omitted': self.checks_omitted,
+            'worst_hosts': self.worst_hosts_list(),
+            'checks': self.ranked_checks(),
+        }
+
+
+def aggregate(sources: Iterable[str], rules_files: Optional[List[str]] = None,
+              jobs: int = None) -> FleetStats:
+    """
+    Parse many hosts' scans in parallel and merge them.
+
+    Args:
+        sources: Scan directories or archives, one per host
+        rules_files: Rule files applied to every host (default: rules/rules.yaml)
+        jobs: Worker processes (default: one per CPU)
+
+    Returns:
+        Fleet statistics
+    """
+    jobs = jobs or os.cpu_count() or 1
+    stats = FleetStats()
+
+    def fold(parsed: Tuple[str, Optional[str], Dict[str, Tuple]]):
+        host, error, checks = parsed
+        if error:
+            stats.add_error(host, error)
+        else:
+            stats.add_host(host, checks)
+
+    if jobs == 1:
+        _init_worker(rules_files)
+        for source in sources:
+            fold(parse_host(source))
+        return stats
+
+    with multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(rules_files,)) as pool:
+        # Results are folded as they arrive and dropped right away
+        for parsed in pool.imap_unordered(parse_host, sources, chunksize=4):
+            fold(parsed)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: aggregate scans and report on the fleet."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('sources', nargs='+',
+                            help="Scan directories or archives, or directories holding them")
+    arg_parser.add_argument('--jobs', type=int, default=None,
+                            help="Worker processes (default: one per CPU)")
+    arg_parser.add_argument('--rules', action='append', default=None, metavar='FILE',
+                            help="Rule file (repeatable, later files take precedence)")
+    arg_parser.add_argument('--json', metavar='FILE',
+                            help="Write the fleet statistics as JSON to FILE ('-' = stdout)")
+    arg_parser.add_argument('--html', nargs='?', const='', default=None, metavar='DIR',
+                            help="Save an HTML fleet report (default directory: reports/)")
+    arg_parser.add_argument('--top', type=int, default=20,
+                            help="Checks to list on the terminal")
+    args = arg_parser.parse_args(argv)
+
+    stats = aggregate(expand_sources(args.sources), args.rules, args.jobs)
+    if not stats.hosts:
+        print("No scan results found", file=sys.stderr)
+        return 1
+
+    if args.json == '-':
+        json.dump(stats.to_dict(), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    elif args.json:
+        with open(args.json, 'w') as f:
+            json.dump(stats.to_dict(), f, indent=2)
+
+    if args.html is not None:
+        from .report import ReportGenerator
+        path = ReportGenerator(args.html or None).save_fleet_report(stats)
+        print(f"Report saved to {path}", file=sys.stderr)
+
+    if args.json != '-':
+        print(f"{stats.hosts} hosts, {stats.unreadable} unreadable, {len(stats.checks)} checks")
+        if stats.checks_omitted:
+            print(f"  {stats.checks_omitted} results of checks beyond the first "
+                  f"{stats.max_checks} were not counted")
+        for check in stats.ranked_checks()[:args.top]:
+            failing = stats.failing(check)
+            if not failing:
+                break
+            print(f"  {failing:>5}/{check['hosts']:<5} {check['severity']:<6} {check['check_name']}")
+        for host, error in stats.errors:
+            print(f"  unreadable: {host}: {error}")
+        if stats.unreadable > len(stats.errors):
+            print(f"  ... and {stats.unreadable - len(stats.errors)} more unreadable hosts")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Single-pass filesystem walker for the permissions checks.
+
+permissions.sh used to run a separate ``find / -xdev`` for every category
+(world-writable files and directories, SUID, SGID, SUID+SGID, root-owned
+writable files), twice each for samples and counts. This walker stats every
+inode once and sorts it into all categories in the same pass.
+
+In parallel mode the tree is split by mount point and top-level directory
+into shards that are walked by a process pool; the shards are merged back in
+walk order so the results are identical to the serial walk.
+"""
+
+import argparse
+import os
+import stat
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from .emit import write_records
+
+
+# Prefixes excluded from the world-writable checks (the ``! -path`` filters)
+WORLD_WRITABLE_FILE_EXCLUDES = ('/tmp/', '/var/tmp/', '/dev/', '/proc/', '/sys/')
+WORLD_WRITABLE_DIR_EXCLUDES = WORLD_WRITABLE_FILE_EXCLUDES + ('/run/',)
+
+# Starting points of the root-owned writable files check
+SYSTEM_DIRS = ('/etc', '/usr/bin', '/usr/sbin', '/bin', '/sbin')
+
+CATEGORIES = (
+    'world_writable_files',
+    'world_writable_dirs',
+    'suid',
+    'sgid',
+    'suid_sgid',
+    'root_writable',
+)
+
+SAMPLE_LIMIT = 20
+
+
+class WalkStats:
+    """Counts and sample paths per permission category."""
+
+    def __init__(self, sample_limit: int = SAMPLE_LIMIT):
+        self.sample_limit = sample_limit
+        self.counts = {category: 0 for category in CATEGORIES}
+        self.samples = {category: [] for category in CATEGORIES}
+        self.inodes = 0
+
+    def add(self, category: str, path: str):
+        """Record a path in a category, keeping the first samples."""
+        self.counts[category] += 1
+        samples = self.samples[category]
+        if len(samples) < self.sample_limit:
+            samples.append(path)
+
+    def merge(self, other: 'WalkStats'):
+        """Append the results of a later walk segment."""
+        self.inodes += other.inodes
+        for category in CATEGORIES:
+            self.counts[category] += other.counts[category]
+            room = self.sample_limit - len(self.samples[category])
+            if room > 0:
+                self.samples[category].extend(other.samples[category][:room])
+
+
+class PermissionsWalker:
+    """Walks the root filesystem once and classifies every inode."""
+
+    def __init__(self, root: str = '/', sample_limit: int = SAMPLE_LIMIT):
+        """
+        Initialize the walker.
+
+        Args:
+            root: Filesystem root to walk (``find /`` starting point)
+            sample_limit: Number of sample paths kept per category
+        """
+        self.root = root
+        self.sample_limit = sample_limit
+        base = root.rstrip('/')
+        self.file_excludes = tuple(base + prefix for prefix in WORLD_WRITABLE_FILE_EXCLUDES)
+        self.dir_excludes = tuple(base + prefix for prefix in WORLD_WRITABLE_DIR_EXCLUDES)
+        self.system_dirs = tuple(base + path for path in SYSTEM_DIRS)
+
+    def _system_prefixes(self, root_dev: int) -> Tuple[Tuple[str, ...], List[str]]:
+        """
+        Split the system directories into those covered by the root walk and
+        those that live on another filesystem and need their own walk.
+        """
+        covered = []
+        separate = []
+        for path in self.system_dirs:
+            try:
+                st = os.lstat(path)
+            except OSError:
+                continue
+            # find does not follow a symlinked starting point
+            if not stat.S_ISDIR(st.st_mode):
+                continue
+            if st.st_dev == root_dev:
+                covered.append(path.rstrip('/') + '/')
+            else:
+                separate.append(path)
+        return tuple(covered), separate
+
+    def _classify(self, path: str, st: os.stat_result, stats: WalkStats,
+                  system_prefixes: Tuple[str, ...], system_only: bool = False):
+        """Sort a single inode into every category it belongs to."""
+        mode = st.st_mode
+        if stat.S_ISREG(mode):
+            other_writable = mode & stat.S_IWOTH
+            if system_only:
+                if other_writable and st.st_uid == 0:
+                    stats.add('root_writable', path)
+                return
+            if other_writable:
+                if not path.startswith(self.file_excludes):
+                    stats.add('world_writable_files', path)
+                if st.st_uid == 0 and path.startswith(system_prefixes):
+                    stats.add('root_writable', path)
+            if mode & stat.S_ISUID:
+                stats.add('suid', path)
+            if mode & stat.S_ISGID:
+                stats.add('sgid', path)
+            if mode & stat.S_ISUID and mode & stat.S_ISGID:
+                stats.add('suid_sgid', path)
+        elif stat.S_ISDIR(mode) and not system_only:
+            if mode & stat.S_IWOTH and not path.startswith(self.dir_excludes):
+                stats.add('world_writable_dirs', path)
+
+    def _walk_children(self, top: str, device: int, stats: WalkStats,
+                       system_prefixes: Tuple[str, ...], system_only: bool = False):
+        """
+        Depth-first walk below an already classified directory, in the same
+        order as find.
+
+        Directories on another device are classified but not descended into
+        (``-xdev``).
+        """
+        try:
+            stack = [os.scandir(top)]
+        except OSError:
+            return
+
+        while stack:
+            entry = next(stack[-1], None)
+            if entry is None:
+                stack.pop().close()
+                continue
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            stats.inodes += 1
+            self._classify(entry.path, st, stats, system_prefixes, system_only)
+            if stat.S_ISDIR(st.st_mode) and st.st_dev == device:
+                try:
+                    stack.append(os.scandir(entry.path))
+                except OSError:
+                    continue
+
+    def _head(self, segments: List) -> WalkStats:
+        """Return the segment collecting inodes classified while planning."""
+        if not segments or not isinstance(segments[-1], WalkStats):
+            segments.append(WalkStats(self.sample_limit))
+        return segments[-1]
+
+    def _plan_tree(self, top: str, depth: int, segments: List,
+                   system_prefixes: Tuple[str, ...], system_only: bool = False):
+        """
+        Split one filesystem tree into shards.
+
+        The top of the tree and the first ``depth`` levels of directories are
+        classified while planning; everything below them becomes a shard.
+        Segments are appended in walk order so merging them reproduces the
+        serial result exactly.
+        """
+        try:
+            top_st = os.lstat(top)
+        except OSError:
+            return
+        head = self._head(segments)
+        head.inodes += 1
+        self._classify(top, top_st, head, system_prefixes, system_only)
+        if stat.S_ISDIR(top_st.st_mode):
+            self._plan_children(top, top_st.st_dev, depth, segments,
+                                system_prefixes, system_only)
+
+    def _plan_children(self, top: str, device: int, depth: int, segments: List,
+                       system_prefixes: Tuple[str, ...], system_only: bool):
+        """Classify the entries of one directory and shard its subdirectories."""
+        if depth <= 0:
+            segments.append((top, device, system_prefixes, system_only))
+            return
+        try:
+            with os.scandir(top) as it:
+                entries = list(it)
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            head = self._head(segments)
+            head.inodes += 1
+            self._classify(entry.path, st, head, system_prefixes, system_only)
+            if stat.S_ISDIR(st.st_mode) and st.st_dev == device:
+                self._plan_children(entry.path, device, depth - 1, segments,
+                                    system_prefixes, system_only)
+
+    def plan(self, depth: int = 0) -> List:
+        """
+        Split the walk into ordered segments.
+
+        Args:
+            depth: Directory levels below each tree root to split into shards.
+                The root walk and the system directories living on other
+                mount points are separate trees.
+
+        Returns:
+            List whose items are either WalkStats already computed while
+            planning or ``(path, device, system_prefixes, system_only)``
+            shards still to be walked
+        """
+        try:
+            root_dev = os.lstat(self.root).st_dev
+        except OSError:
+            return []
+
+        system_prefixes, separate = self._system_prefixes(root_dev)
+        segments = []
+        self._plan_tree(self.root, depth, segments, system_prefixes)
+        for path in separate:
+            self._plan_tree(path, depth, segments, (), system_only=True)
+        return segments
+
+    def walk_shard(self, shard: Tuple) -> WalkStats:
+        """Walk a single shard produced by ``plan``."""
+        top, device, system_prefixes, system_only = shard
+        stats = WalkStats(self.sample_limit)
+        self._walk_children(top, device, stats, system_prefixes, system_only)
+        return stats
+
+    def walk(self, workers: int = 1, shard_depth: int = 1) -> WalkStats:
+        """
+        Walk the filesystem once.
+
+        Args:
+            workers: Number of worker processes. With one worker the tree is
+                walked serially in a single shard.
+            shard_depth: Directory levels split into shards in parallel mode
+
+        Returns:
+            WalkStats with counts, samples and the number of inodes visited
+        """
+        if workers <= 1:
+            segments = self.plan(depth=0)
+            results = [segment if isinstance(segment, WalkStats) else self.walk_shard(segment)
+                       for segment in segments]
+        else:
+            segments = self.plan(depth=shard_depth)
+            shards = [segment for segment in segments if not isinstance(segment, WalkStats)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                walked = iter(list(executor.map(self.walk_shard, shards)))
+            results = [segment if isinstance(segment, WalkStats) else next(walked)
+                       for segment in segments]
+
+        stats = WalkStats(self.sample_limit)
+        for result in results:
+            stats.merge(result)
+        return stats
+
+
+def build_records(stats: WalkStats, elapsed: float) -> List[Tuple[str, str, str, str, str]]:
+    """
+    Turn walk statistics into permissions.json records.
+
+    Returns:
+        List of (section, check_name, result, status, details) tuples. The
+        section lets permissions.sh keep its original check order.
+    """
+    records = []
+    counts = stats.counts
+
+    count = counts['world_writable_files']
+    if count == 0:
+        records.append(('world_writable', "World-Writable Files", "PASS", "LOW",
+                        "No world-writable files found outside /tmp and /var/tmp"))
+    else:
+        records.append(('world_writable', "World-Writable Files", "FAIL", "HIGH",
+                        f"Found {count} world-writable files outside standard temp directories"))
+        for path in stats.samples['world_writable_files']:
+            records.append(('world_writable', f"World-Writable File: {path}", "FAIL", "HIGH",
+                            "File is world-writable"))
+
+    count = counts['world_writable_dirs']
+    if count == 0:
+        records.append(('world_writable', "World-Writable Directories", "PASS", "LOW",
+                        "No world-writable directories found outside standard locations"))
+    else:
+        records.append(('world_writable', "World-Writable Directories", "WARN", "MEDIUM",
+                        f"Found {count} world-writable directories"))
+
+    records.append(('suid', "SUID Files Count", "INFO", "LOW",
+                    f"Found {counts['suid']} SUID files"))
+    records.append(('sgid', "SGID Files Count", "INFO", "LOW",
+                    f"Found {counts['sgid']} SGID files"))
+
+    if counts['suid_sgid'] > 0:
+        records.append(('sgid', "SUID+SGID Files", "WARN", "MEDIUM",
+                        f"Found {counts['suid_sgid']} files with both SUID and SGID"))
+
+    if counts['root_writable'] == 0:
+        records.append(('root_writable', "Root-Owned Writable Files", "PASS", "LOW",
+                        "No root-owned files are world-writable in system directories"))
+    else:
+        records.append(('root_writable', "Root-Owned Writable Files", "FAIL", "HIGH",
+                        "Found root-owned world-writable files in system directories"))
+
+    records.append(('root_writable', "Filesystem Inodes Scanned", "INFO", "LOW",
+                    f"Visited {stats.inodes} inodes in a single pass ({elapsed:.2f}s)"))
+    return records
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point used by permissions.sh."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--root', default='/', help="Filesystem root to walk")
+    arg_parser.add_argument('--samples', type=int, default=SAMPLE_LIMIT,
+                            help="Sample paths kept per category")
+    arg_parser.add_argument('--workers', type=int, default=1,
+                            help="Parallel worker processes (0 = one per CPU)")
+    arg_parser.add_argument('--shard-depth', type=int, default=1,
+                            help="Directory levels split into parallel shards")
+    args = arg_parser.parse_args(argv)
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    start = time.monotonic()
+    stats = PermissionsWalker(args.root, args.samples).walk(workers, args.shard_depth)
+    elapsed = time.monotonic() - start
+
+    write_records(build_records(stats, elapsed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,66 +5,78 @@ PyQt GUI module for Host Hardening Checker.
 
 import sys
 import os
-import subprocess
+import time
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
-    QMessageBox, QLabel, QProgressBar, QFileDialog
+    QPushButton, QTableView, QHeaderView, QAbstractItemView,
+    QMessageBox, QLabel, QProgressBar, QFileDialog, QComboBox, QLineEdit,
+    QCheckBox, QDialog, QTableWidget, QTableWidgetItem, QDialogButtonBox
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QColor, QFont
+from PyQt5.QtCore import Qt, QThread, QTimer, QFileSystemWatcher, pyqtSignal
+from PyQt5.QtGui import QFont
 
+from .baseline import diff_results, load_baseline, save_baseline
+from .history import HistoryStore
 from .parser import ScanParser
 from .report import ReportGenerator
+from .result_model import ResultTableModel, ResultFilterProxyModel
+from .scheduler import ModuleScheduler, ScanProgress, env_jobs, env_timeout
+from .timings import slowest_checks
 
 
 class ScanThread(QThread):
-    """Thread for running bash scan scripts."""
+    """Thread for running the bash scan scripts through the module scheduler."""
     
     finished = pyqtSignal(bool, str)
     progress = pyqtSignal(str)
+    scan_event = pyqtSignal(object)
     
-    def __init__(self, script_dir):
+    def __init__(self, script_dir, output_dir="/tmp/hardening-scan"):
         super().__init__()
         self.script_dir = script_dir
+        self.output_dir = output_dir
+    
+    def _on_event(self, event):
+        """Forward scheduler events (called from its worker threads)."""
+        self.scan_event.emit(event)
+        if event['event'] == 'module_started':
+            self.progress.emit(event['label'] or f"Running {event['module']} checks...")
+        elif event['event'] == 'module_output':
+            self.progress.emit(event['line'].strip())
     
     def run(self):
-        """Run the scan script."""
+        """Run the scan."""
         try:
-            script_path = os.path.join(self.script_dir, "bash_checks", "run_all.sh")
-            if not os.path.exists(script_path):
-                self.finished.emit(False, f"Scan script not found: {script_path}")
+            bash_checks = os.path.join(self.script_dir, "bash_checks")
+            if not os.path.isdir(bash_checks):
+                self.finished.emit(False, f"Scan scripts not found: {bash_checks}")
                 return
             
             self.progress.emit("Starting scan...")
             
-            process = subprocess.Popen(
-                ["bash", script_path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
+            # Same settings as bash_checks/run_all.sh
+            scheduler = ModuleScheduler(
+                script_dir=bash_checks,
+                output_dir=self.output_dir,
+                jobs=env_jobs(),
+                default_timeout=env_timeout(),
+                events=self._on_event,
+                echo=False
             )
+            runs = scheduler.run()
             
-            # Read output in real-time
-            output_lines = []
-            for line in iter(process.stdout.readline, ''):
-                if line:
-                    line = line.strip()
-                    output_lines.append(line)
-                    self.progress.emit(line)
-            
-            process.wait()
-            
-            if process.returncode == 0:
-                self.finished.emit(True, "Scan completed successfully")
+            failed = [run for run in runs if run.error]
+            timed_out = [run.name for run in runs if run.timed_out]
+            if failed:
+                errors = sorted({run.error for run in failed})
+                self.finished.emit(False, f"Modules could not be run "
+                                          f"({', '.join(run.name for run in failed)}): "
+                                          f"{'; '.join(errors)}")
+            elif timed_out:
+                self.finished.emit(True, f"Scan completed; timed out: {', '.join(timed_out)}")
             else:
-                error_msg = "\n".join(output_lines[-10:])  # Last 10 lines
-                self.finished.emit(False, f"Scan failed with return code {process.returncode}\n{error_msg}")
+                self.finished.emit(True, "Scan completed successfully")
         
-        except FileNotFoundError:
-            self.finished.emit(False, "bash command not found. Please ensure bash is installed.")
         except Exception as e:
             self.finished.emit(False, f"Error running scan: {str(e)}")
 
@@ -84,6 +96,23 @@ class HardeningCheckerGUI(QMainWindow):
         self.report_generator = ReportGenerator()
         self.scan_thread = None
         
+        # Results of the running scan, per result file, as they are written
+        self.live_results = {}
+        self.live_summary = ScanParser.summarize([])
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_live_poll)
+        self.watcher.fileChanged.connect(self.schedule_live_poll)
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(200)
+        self.live_timer.timeout.connect(self.poll_live_results)
+        
+        # Determinate progress from scheduler events and past timings
+        self.scan_progress = ScanProgress()
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(1000)
+        self.progress_timer.timeout.connect(self.update_progress)
+        
         # Setup UI
         self.init_ui()
         
@@ -158,6 +187,39 @@ class HardeningCheckerGUI(QMainWindow):
         self.export_btn.clicked.connect(self.export_report)
         button_layout.addWidget(self.export_btn)
         
+        self.baseline_btn = QPushButton("Save Baseline")
+        self.baseline_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #8e44ad;
+                color: white;
+                padding: 10px;
+                border-radius: 5px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #71368a;
+            }
+        """)
+        self.baseline_btn.setToolTip("Accept the current results as the baseline")
+        self.baseline_btn.clicked.connect(self.save_baseline)
+        button_layout.addWidget(self.baseline_btn)
+        
+        self.timings_btn = QPushButton("Slowest Checks")
+        self.timings_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #7f8c8d;
+                color: white;
+                padding: 10px;
+                border-radius: 5px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #616a6b;
+            }
+        """)
+        self.timings_btn.clicked.connect(self.show_slowest_checks)
+        button_layout.addWidget(self.timings_btn)
+        
         button_layout.addStretch()
         layout.addLayout(button_layout)
         
@@ -166,27 +228,68 @@ class HardeningCheckerGUI(QMainWindow):
         self.progress_bar.setVisible(False)
         layout.addWidget(self.progress_bar)
         
+        # Per-module status while scanning
+        self.module_status_label = QLabel("")
+        self.module_status_label.setAlignment(Qt.AlignCenter)
+        self.module_status_label.setWordWrap(True)
+        self.module_status_label.setVisible(False)
+        layout.addWidget(self.module_status_label)
+        
         # Status label
         self.status_label = QLabel("Ready")
         self.status_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.status_label)
         
-        # Results table
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["Check Name", "Result", "Severity", "Remediation"])
+        # Filters
+        filter_layout = QHBoxLayout()
+        
+        filter_layout.addWidget(QLabel("Severity:"))
+        self.severity_filter = QComboBox()
+        self.severity_filter.addItems(["All", "HIGH", "MEDIUM", "LOW"])
+        self.severity_filter.currentTextChanged.connect(self.apply_filters)
+        filter_layout.addWidget(self.severity_filter)
+        
+        filter_layout.addWidget(QLabel("Result:"))
+        self.result_filter = QComboBox()
+        self.result_filter.addItems(["All", "FAIL", "WARN", "PASS", "INFO"])
+        self.result_filter.currentTextChanged.connect(self.apply_filters)
+        filter_layout.addWidget(self.result_filter)
+        
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search checks, details and remediation...")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.textChanged.connect(self.apply_filters)
+        filter_layout.addWidget(self.search_box)
+        
+        self.changes_only = QCheckBox("Changes since baseline")
+        self.changes_only.toggled.connect(self.refresh_results)
+        filter_layout.addWidget(self.changes_only)
+        
+        layout.addLayout(filter_layout)
+        
+        # Results table (rows are served on demand by the model)
+        self.result_model = ResultTableModel(self)
+        self.proxy_model = ResultFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.result_model)
+        
+        self.table = QTableView()
+        self.table.setModel(self.proxy_model)
         
         # Set column widths
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.Stretch)
-        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(3, QHeaderView.Stretch)
+        self.set_column_widths()
+        
+        # Fixed row heights keep scrolling independent of the row count
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        
+        # Keep scan order until a column header is clicked
+        header.setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
         
         # Style the table
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         
         layout.addWidget(self.table)
         
@@ -196,6 +299,16 @@ class HardeningCheckerGUI(QMainWindow):
         self.summary_label.setStyleSheet("font-weight: bold; padding: 10px;")
         layout.addWidget(self.summary_label)
     
+    def set_column_widths(self):
+        """Size the table columns (again after the Change column is toggled)."""
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(3, QHeaderView.Stretch)
+        if self.result_model.columnCount() > ResultTableModel.CHANGE_COLUMN:
+            header.setSectionResizeMode(ResultTableModel.CHANGE_COLUMN, QHeaderView.ResizeToContents)
+    
     def run_scan(self):
         """Run the bash scan scripts."""
         if self.scan_thread and self.scan_thread.isRunning():
@@ -205,28 +318,72 @@ class HardeningCheckerGUI(QMainWindow):
         # Disable button during scan
         self.run_scan_btn.setEnabled(False)
         self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)  # Indeterminate
+        self.progress_bar.setRange(0, 0)  # Indeterminate until the scan starts
+        self.progress_bar.setFormat("%p%")
+        self.module_status_label.setVisible(True)
+        self.module_status_label.setText("")
         self.status_label.setText("Running scan...")
+        self.scan_progress = ScanProgress()
+        
+        # Show results as the modules write them
+        self.start_live_results()
         
         # Start scan thread
-        self.scan_thread = ScanThread(self.script_dir)
+        self.scan_thread = ScanThread(self.script_dir, self.parser.scan_dir)
         self.scan_thread.finished.connect(self.on_scan_finished)
         self.scan_thread.progress.connect(self.on_scan_progress)
+        self.scan_thread.scan_event.connect(self.on_scan_event)
         self.scan_thread.start()
+        self.progress_timer.start()
     
     def on_scan_progress(self, message):
         """Update progress message."""
         self.status_label.setText(message)
+        self.schedule_live_poll()
+    
+    def on_scan_event(self, event):
+        """Track module progress from a scheduler event."""
+        self.scan_progress.update(event)
+        if event['event'] == 'scan_started':
+            self.progress_bar.setRange(0, 1000)
+        self.update_progress()
+    
+    def update_progress(self):
+        """Show the completed share, ETA and per-module status."""
+        progress = self.scan_progress
+        if not progress.order:
+            return
+        now = time.time()
+        eta = int(round(progress.eta(now)))
+        self.progress_bar.setValue(int(progress.fraction(now) * 1000))
+        self.progress_bar.setFormat(f"%p%  -  ETA {eta // 60}:{eta % 60:02d}")
+        
+        statuses = []
+        for name in progress.order:
+            state = progress.state(name)
+            if state == "pending":
+                statuses.append(f"{name}: pending")
+            elif state == "running":
+                statuses.append(f"{name}: running {progress.elapsed(name, now):.0f}s"
+                                f" of ~{progress.estimates.get(name, 1.0):.0f}s")
+            else:
+                statuses.append(f"{name}: {state} in {progress.elapsed(name, now):.1f}s")
+        self.module_status_label.setText(" | ".join(statuses))
     
     def on_scan_finished(self, success, message):
         """Handle scan completion."""
         self.run_scan_btn.setEnabled(True)
+        self.progress_timer.stop()
         self.progress_bar.setVisible(False)
+        self.module_status_label.setVisible(False)
+        self.stop_live_results()
         
         if success:
-            self.status_label.setText("Scan completed successfully")
-            self.refresh_results()
-            QMessageBox.information(self, "Scan Complete", "Scan completed successfully!")
+            self.record_history()
+            if self.changes_only.isChecked():
+                self.refresh_results()
+            self.status_label.setText(message)
+            QMessageBox.information(self, "Scan Complete", f"{message}!")
         else:
             self.status_label.setText(f"Scan failed: {message}")
             QMessageBox.critical(self, "Scan Failed", message)
@@ -237,64 +394,188 @@ class HardeningCheckerGUI(QMainWindow):
             results = self.parser.parse_results()
             summary = self.parser.get_summary()
             
-            # Update table
-            self.table.setRowCount(len(results))
+            if self.changes_only.isChecked():
+                baseline = load_baseline()
+                if baseline is None:
+                    self.changes_only.setChecked(False)
+                    QMessageBox.warning(self, "No Baseline",
+                                        "No baseline saved yet. Click \"Save Baseline\" first.")
+                    return
+                results = diff_results(baseline, results)
+                summary = ScanParser.summarize(results)
             
-            for row, result in enumerate(results):
-                # Check Name
-                check_item = QTableWidgetItem(result['check_name'])
-                if result.get('details'):
-                    check_item.setToolTip(result['details'])
-                self.table.setItem(row, 0, check_item)
-                
-                # Result
-                result_item = QTableWidgetItem(result['result'])
-                result_item.setTextAlignment(Qt.AlignCenter)
-                if result['result'] == 'PASS':
-                    result_item.setForeground(QColor(40, 167, 69))
-                elif result['result'] == 'FAIL':
-                    result_item.setForeground(QColor(220, 53, 69))
-                elif result['result'] == 'WARN':
-                    result_item.setForeground(QColor(255, 193, 7))
-                self.table.setItem(row, 1, result_item)
-                
-                # Severity
-                severity_item = QTableWidgetItem(result['severity'])
-                severity_item.setTextAlignment(Qt.AlignCenter)
-                if result['severity'] == 'HIGH':
-                    severity_item.setForeground(QColor(220, 53, 69))
-                    severity_item.setBackground(QColor(255, 230, 230))
-                elif result['severity'] == 'MEDIUM':
-                    severity_item.setForeground(QColor(255, 193, 7))
-                    severity_item.setBackground(QColor(255, 248, 220))
-                else:
-                    severity_item.setForeground(QColor(40, 167, 69))
-                    severity_item.setBackground(QColor(230, 255, 230))
-                self.table.setItem(row, 2, severity_item)
-                
-                # Remediation
-                remediation_item = QTableWidgetItem(result['remediation'])
-                remediation_item.setToolTip(result['remediation'])
-                self.table.setItem(row, 3, remediation_item)
+            # Update table
+            self.result_model.set_show_changes(self.changes_only.isChecked())
+            self.result_model.set_results(results)
+            self.set_column_widths()
             
             # Update summary
-            summary_text = (
-                f"Total: {summary['total']} | "
-                f"High: {summary['high']} | "
-                f"Medium: {summary['medium']} | "
-                f"Low: {summary['low']} | "
-                f"Passed: {summary['passed']} | "
-                f"Failed: {summary['failed']} | "
-                f"Warnings: {summary['warnings']}"
-            )
-            self.summary_label.setText(summary_text)
+            self.show_summary(summary)
             
-            self.status_label.setText(f"Loaded {len(results)} results")
+            self.status_label.setText(self._loaded_text())
         
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error loading results: {str(e)}")
             self.status_label.setText("Error loading results")
     
+    def save_baseline(self):
+        """Accept the current results as the baseline for delta views."""
+        try:
+            results = self.parser.parse_results()
+            if not results:
+                QMessageBox.warning(self, "No Data", "No scan results available. Please run a scan first.")
+                return
+            path = save_baseline(results)
+            self.status_label.setText(f"Baseline saved to {path}")
+            if self.changes_only.isChecked():
+                self.refresh_results()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error saving baseline: {str(e)}")
+    
+    def record_history(self):
+        """Save the finished scan in the local scan history."""
+        try:
+            with HistoryStore() as store:
+                store.record(self.parser.parse_results(), self.parser.get_summary(),
+                             scanned_at=self.parser.scan_time())
+        except Exception as e:
+            print(f"Warning: could not record scan history: {e}")
+    
+    def show_summary(self, summary):
+        """Show the summary counters below the table."""
+        summary_text = (
+            f"Total: {summary['total']} | "
+            f"High: {summary['high']} | "
+            f"Medium: {summary['medium']} | "
+            f"Low: {summary['low']} | "
+            f"Passed: {summary['passed']} | "
+            f"Failed: {summary['failed']} | "
+            f"Warnings: {summary['warnings']}"
+        )
+        self.summary_label.setText(summary_text)
+    
+    def start_live_results(self):
+        """Clear the table and follow the result files of a new scan."""
+        scan_dir = self.parser.scan_dir
+        os.makedirs(scan_dir, exist_ok=True)
+        self.parser.start_live()
+        self.live_results = {}
+        self.live_summary = ScanParser.summarize([])
+        self.result_model.set_show_changes(False)
+        self.result_model.set_results([])
+        self.set_column_widths()
+        self.show_summary(self.live_summary)
+        if scan_dir not in self.watcher.directories():
+            self.watcher.addPath(scan_dir)
+    
+    def stop_live_results(self):
+        """Read the last records of the scan and stop watching."""
+        self.live_timer.stop()
+        self.poll_live_results()
+        for path in self.watcher.files() + self.watcher.directories():
+            self.watcher.removePath(path)
+    
+    def schedule_live_poll(self, *_args):
+        """Coalesce file change notifications into one poll."""
+        if self.scan_thread and self.scan_thread.isRunning() and not self.live_timer.isActive():
+            self.live_timer.start()
+    
+    def poll_live_results(self):
+        """Add the records written since the last poll to the table."""
+        try:
+            updates = self.parser.poll_live()
+        except Exception as e:
+            self.status_label.setText(f"Error reading live results: {str(e)}")
+            return
+        
+        appended = []
+        rebuild = False
+        for json_file, (replaced, new_results) in updates.items():
+            if replaced:
+                self.live_results[json_file] = list(new_results)
+                rebuild = True
+            else:
+                self.live_results.setdefault(json_file, []).extend(new_results)
+                appended.extend(new_results)
+        
+        if rebuild:
+            results = [result for json_file in self.parser.RESULT_FILES
+                       for result in self.live_results.get(json_file, [])]
+            self.result_model.set_results(results)
+            self.live_summary = ScanParser.summarize(results)
+        elif appended:
+            self.result_model.append_results(appended)
+            for key, value in ScanParser.summarize(appended).items():
+                self.live_summary[key] += value
+        if updates:
+            self.show_summary(self.live_summary)
+        
+        # Appends to a result file only notify watchers of that file
+        watched = set(self.watcher.files())
+        for json_file in self.parser.RESULT_FILES:
+            path = os.path.join(self.parser.scan_dir, json_file)
+            for candidate in (path + ".partial", path):
+                if candidate not in watched and os.path.exists(candidate):
+                    self.watcher.addPath(candidate)
+    
+    def apply_filters(self):
+        """Filter the results table by severity, result and search text."""
+        severity = self.severity_filter.currentText()
+        result = self.result_filter.currentText()
+        self.proxy_model.set_filters(
+            None if severity == "All" else severity,
+            None if result == "All" else result,
+            self.search_box.text()
+        )
+        self.status_label.setText(self._loaded_text())
+    
+    def _loaded_text(self) -> str:
+        """Status text for the number of loaded and shown results."""
+        total = self.result_model.rowCount()
+        shown = self.proxy_model.rowCount()
+        if shown == total:
+            return f"Loaded {total} results"
+        return f"Showing {shown} of {total} results"
+    
+    def show_slowest_checks(self):
+        """Show the checks that took longest in the last scan."""
+        slowest = slowest_checks(self.parser.scan_dir)
+        if not slowest:
+            QMessageBox.information(self, "No Timings", "No check timings available. Please run a scan first.")
+            return
+        
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Slowest Checks")
+        dialog.resize(800, 500)
+        layout = QVBoxLayout()
+        dialog.setLayout(layout)
+        
+        columns = ["Check Name", "Module", "Wall Time (ms)", "CPU Time (ms)", "Processes"]
+        table = QTableWidget(len(slowest), len(columns))
+        table.setHorizontalHeaderLabels(columns)
+        for row, check in enumerate(slowest):
+            values = [check['check_name'], check['module'], f"{check['wall_ms']:.0f}",
+                      f"{check['cpu_ms']:.0f}", str(check['processes'])]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column >= 2:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(row, column, item)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        layout.addWidget(table)
+        
+        note = QLabel("Process counts are system-wide while a check ran; "
+                      "they are exact when modules run one at a time (HARDENING_JOBS=1).")
+        note.setWordWrap(True)
+        layout.addWidget(note)
+        
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(dialog.reject)
+        layout.addWidget(buttons)
+        dialog.exec_()
+    
     def export_report(self):
         """Export results to HTML report."""
         try:
@@ -306,7 +587,13 @@ class HardeningCheckerGUI(QMainWindow):
                 return
             
             # Generate and save report
-            report_path = self.report_generator.save_report(results, summary)
+            baseline = load_baseline() if self.changes_only.isChecked() else None
+            if baseline is not None:
+                report_path = self.report_generator.save_diff_report(
+                    diff_results(baseline, results), baseline)
+            else:
+                report_path = self.report_generator.save_report(
+                    results, summary, slowest_checks(self.parser.scan_dir))
             
             QMessageBox.information(
                 self,
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Local scan history for drift tracking.
+
+Every scan overwrites /tmp/hardening-scan. The history store keeps each
+parsed scan in SQLite (host, time, check name, result, severity) so that
+questions like "when did this check start failing" or "fail counts per
+week" can be answered over thousands of scans:
+
+- check names are stored once and referenced by id, keeping rows small;
+- results are indexed by (check, result, scan) for per-check queries;
+- scans carry their summary counters, so trends never touch the results.
+
+Old scans are thinned out by a retention policy after every recorded scan:
+every scan is kept for ``full_days``, then one scan per host and week up to
+``weekly_days``. The database lives in the private state directory.
+"""
+
+import argparse
+import os
+import socket
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .parser import FAILING
+from .state import is_private, private_dir, state_dir
+
+
+SCHEMA_VERSION = 1
+
+# Retention defaults (days)
+DEFAULT_FULL_DAYS = 30
+DEFAULT_WEEKLY_DAYS = 365
+
+# strftime() formats for trend periods
+PERIODS = {
+    'day': '%Y-%m-%d',
+    'week': '%Y-W%W',
+    'month': '%Y-%m',
+}
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    CREATE TABLE IF NOT EXISTS scans (
+        id INTEGER PRIMARY KEY,
+        host TEXT NOT NULL,
+        scanned_at INTEGER NOT NULL,
+        total INTEGER, high INTEGER, medium INTEGER, low INTEGER,
+        passed INTEGER, failed INTEGER, warnings INTEGER,
+        UNIQUE (host, scanned_at)
+    );
+    CREATE TABLE IF NOT EXISTS checks (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS results (
+        scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+        check_id INTEGER NOT NULL REFERENCES checks(id),
+        result TEXT NOT NULL,
+        severity TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_scans_time ON scans (scanned_at);
+    CREATE INDEX IF NOT EXISTS idx_results_check ON results (check_id, result, scan_id);
+    CREATE INDEX IF NOT EXISTS idx_results_scan ON results (scan_id);
+"""
+
+
+def default_history_path() -> str:
+    """Return the history database, honouring HARDENING_HISTORY_DB."""
+    path = os.environ.get('HARDENING_HISTORY_DB')
+    if path:
+        return path
+    return os.path.join(state_dir(), "history.db")
+
+
+class HistoryStore:
+    """SQLite store of parsed scans."""
+
+    def __init__(self, path: str = None, full_days: int = DEFAULT_FULL_DAYS,
+                 weekly_days: int = DEFAULT_WEEKLY_DAYS):
+        """
+        Open (and create if needed) the history database.
+
+        Args:
+            path: SQLite file (default: history.db in the state directory)
+            full_days: Retention applied after each recorded scan (see compact())
+            weekly_days: Retention applied after each recorded scan
+
+        Raises:
+            PermissionError: The database or its directory could be written
+                by another user
+        """
+        self.path = path or default_history_path()
+        self.full_days = full_days
+        self.weekly_days = weekly_days
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not private_dir(directory):
+            raise PermissionError(f"Cannot use the scan history directory {directory}")
+        try:
+            st = os.lstat(self.path)
+        except FileNotFoundError:
+            st = None
+        if st is not None and not is_private(st):
+            raise PermissionError(f"Scan history {self.path} is not owned by this user "
+                                  f"or is writable by others")
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(
+                "INSERT OR IGNORE INTO meta VALUES ('version', ?)", (str(SCHEMA_VERSION),)
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _check_ids(self, names: Iterable[str]) -> Dict[str, int]:
+        """Return the ids of check names, adding unknown names."""
+        names = set(names)
+        ids = {}
+        for name in names:
+            row = self.connection.execute("SELECT id FROM checks WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                ids[name] = self.connection.execute(
+                    "INSERT INTO checks (name) VALUES (?)", (name,)
+                ).lastrowid
+            else:
+                ids[name] = row[0]
+        return ids
+
+    def record(self, results: Iterable[Dict], summary: Dict = None, host: str = None,
+               scanned_at: float = None) -> Optional[int]:
+        """
+        Save one parsed scan.
+
+        A scan of the same host at the same time is only saved once, so
+        recording the same results again is harmless. The retention policy
+        is applied afterwards.
+
+        Args:
+            results: Parsed results (ScanParser.parse_results())
+            summary: Summary counters (default: computed from results)
+            host: Host name (default: this host)
+            scanned_at: Scan time as a Unix timestamp (default: now)
+
+        Returns:
+            Id of the new scan, or None if it was already recorded
+        """
+        from .parser import ScanParser
+
+        results = list(results)
+        if summary is None:
+            summary = ScanParser.summarize(results)
+        host = host or socket.gethostname()
+        scanned_at = int(scanned_at if scanned_at is not None else time.time())
+
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO scans (host, scanned_at, total, high, medium, low, "
+                "passed, failed, warnings) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (host, scanned_at, summary.get('total', 0), summary.get('high', 0),
+                 summary.get('medium', 0), summary.get('low', 0), summary.get('passed', 0),
+                 summary.get('failed', 0), summary.get('warnings', 0))
+            )
+            if cursor.rowcount == 0:
+                return None
+            scan_id = cursor.lastrowid
+            ids = self._check_ids(str(r['check_name']) for r in results)
+            self.connection.executemany(
+                "INSERT INTO results (scan_id, check_id, result, severity) VALUES (?, ?, ?, ?)",
+                ((scan_id, ids[str(r['check_name'])], str(r['result']), str(r['severity']))
+                 for r in results)
+            )
+        # Freed pages are reused by later scans; only an explicit compact vacuums
+        self.compact(self.full_days, self.weekly_days, vacuum=False)
+        return scan_id
+
+    def hosts(self) -> List[str]:
+        """Return the hosts with recorded scans."""
+        return [row[0] for row in self.connection.execute(
+            "SELECT DISTINCT host FROM scans ORDER BY host")]
+
+    def scans(self, host: str = None, limit: int = 20) -> List[Dict]:
+        """Return the latest scans with their summary counters."""
+        query = ("SELECT id, host, scanned_at, total, high, medium, low, passed, failed, warnings "
+                 "FROM scans")
+        params = []
+        if host:
+            query += " WHERE host = ?"
+            params.append(host)
+        query += " ORDER BY scanned_at DESC LIMIT ?"
+        params.append(limit)
+        columns = ['id', 'host', 'scanned_at', 'total', 'high', 'medium', 'low',
+                   'passed', 'failed', 'warnings']
+        return [dict(zip(columns, row)) for row in self.connection.execute(query, params)]
+
+    def failing_since(self, check_name: str, host: str = None,
+                      failing: Tuple[str, ...] = FAILING) -> Optional[int]:
+        """
+        Return when a check started failing.
+
+        This is the first failing scan after the last scan in which the
+        check was recorded with a passing result.
+
+        Args:
+            check_name: Name of the check
+            host: Host to look at (default: this host)
+            failing: Results that count as failing
+
+        Returns:
+            Unix timestamp, or None if the check is not failing
+        """
+        host = host or socket.gethostname()
+        row = self.connection.execute("SELECT id FROM checks WHERE name = ?", (check_name,)).fetchone()
+        if row is None:
+            return None
+        check_id = row[0]
+        marks = ','.join('?' * len(failing))
+
+        last_ok = self.connection.execute(
+            f"SELECT MAX(s.scanned_at) FROM results r JOIN scans s ON s.id = r.scan_id "
+            f"WHERE r.check_id = ? AND r.result NOT IN ({marks}) AND s.host = ?",
+            (check_id, *failing, host)
+        ).fetchone()[0]
+        row = self.connection.execute(
+            f"SELECT MIN(s.scanned_at) FROM results r JOIN scans s ON s.id = r.scan_id "
+            f"WHERE r.check_id = ? AND r.result IN ({marks}) AND s.host = ? AND s.scanned_at > ?",
+            (check_id, *failing, host, last_ok if last_ok is not None else -1)
+        ).fetchone()
+        return row[0]
+
+    def check_history(self, check_name: str, host: str = None, limit: int = 50) -> List[Tuple]:
+        """Return (scanned_at, result, severity) of a check, latest first."""
+        host = host or socket.gethostname()
+        return self.connection.execute(
+            "SELECT s.scanned_at, r.result, r.severity FROM results r "
+            "JOIN checks c ON c.id = r.check_id JOIN scans s ON s.id = r.scan_id "
+            "WHERE c.name = ? AND s.host = ? ORDER BY s.scanned_at DESC LIMIT ?",
+            (check_name, host, limit)
+        ).fetchall()
+
+    def trend(self, period: str = 'week', host: str = None, since: float = None) -> List[Dict]:
+        """
+        Return failure counts per period.
+
+        Uses the summary counters of each scan, so it never reads results.
+
+        Args:
+            period: 'day', 'week' or 'month'
+            host: Restrict to one host (default: all hosts)
+            since: Only scans after this Unix timestamp
+
+        Returns:
+            One dict per period: period, scans, failed, warnings, high, medium
+        """
+        query = (f"SELECT strftime('{PERIODS[period]}', scanned_at, 'unixepoch') AS period, "
+                 "COUNT(*), SUM(failed), SUM(warnings), SUM(high), SUM(medium) "
+                 "FROM scans WHERE scanned_at >= ?")
+        params = [int(since or 0)]
+        if host:
+            query += " AND host = ?"
+            params.append(host)
+        query += " GROUP BY period ORDER BY period"
+        columns = ['period', 'scans', 'failed', 'warnings', 'high', 'medium']
+        return [dict(zip(columns, row)) for row in self.connection.execute(query, params)]
+
+    def compact(self, full_days: int = DEFAULT_FULL_DAYS,
+                weekly_days: int = DEFAULT_WEEKLY_DAYS, now: float = None,
+                vacuum: bool = True) -> int:
+        """
+        Apply the retention policy.
+
+        Keeps every scan of the last ``full_days``, then the latest scan
+        per host and week up to ``weekly_days``, and deletes the rest along
+        with check names no longer referenced.
+
+        Args:
+            vacuum: Shrink the file after deleting scans
+
+        Returns:
+            Number of scans deleted
+        """
+        now = now if now is not None else time.time()
+        full_cutoff = int(now - full_days * 86400)
+        weekly_cutoff = int(now - weekly_days * 86400)
+
+        with self.connection:
+            deleted = self.connection.execute(
+                "DELETE FROM scans WHERE scanned_at < ?", (weekly_cutoff,)
+            ).rowcount
+            deleted += self.connection.execute(
+                # SQLite takes the bare id column from the row with MAX()
+                "DELETE FROM scans WHERE scanned_at < ? AND id NOT IN ("
+                "  SELECT id FROM (SELECT MAX(scanned_at), id FROM scans WHERE scanned_at < ?"
+                "    GROUP BY host, strftime('%Y-%W', scanned_at, 'unixepoch')))",
+                (full_cutoff, full_cutoff)
+            ).rowcount
+            if deleted:
+                self.connection.execute(
+                    "DELETE FROM checks WHERE id NOT IN (SELECT DISTINCT check_id FROM results)"
+                )
+        if deleted and vacuum:
+            self.connection.execute("VACUUM")
+        return deleted
+
+
+def _format_time(timestamp: Optional[float]) -> str:
+    if timestamp is None:
+        return "-"
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line access to the scan history."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--db', default=None,
+                            help="History database (default: history.db in the state directory)")
+    arg_parser.add_argument('--host', default=None, help="Host to query")
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('record', help="Save the results in /tmp/hardening-scan")
+    commands.add_parser('scans', help="List the latest scans")
+    since = commands.add_parser('failing-since', help="When a check started failing")
+    since.add_argument('check_name')
+    trend = commands.add_parser('trend', help="Failure counts per period")
+    trend.add_argument('--period', choices=sorted(PERIODS), default='week')
+    compact = commands.add_parser('compact', help="Apply the retention policy")
+    compact.add_argument('--full-days', type=int, default=DEFAULT_FULL_DAYS)
+    compact.add_argument('--weekly-days', type=int, default=DEFAULT_WEEKLY_DAYS)
+    args = arg_parser.parse_args(argv)
+
+    with HistoryStore(args.db) as store:
+        if args.command == 'record':
+            from .parser import ScanParser
+            parser = ScanParser()
+            results = parser.parse_results()
+            if not results:
+                print("No scan results to record")
+                return 1
+            scan_id = store.record(results, parser.get_summary(), host=args.host,
+                                   scanned_at=parser.scan_time())
+            print("Scan already recorded" if scan_id is None else f"Recorded scan {scan_id}")
+        elif args.command == 'scans':
+            for scan in store.scans(args.host):
+                print(f"{_format_time(scan['scanned_at'])}  {scan['host']:<20} "
+                      f"total {scan['total']:>5}  failed {scan['failed']:>4}  "
+                      f"warnings {scan['warnings']:>4}  high {scan['high']:>4}")
+        elif args.command == 'failing-since':
+            print(_format_time(store.failing_since(args.check_name, args.host)))
+        elif args.command == 'trend':
+            for row in store.trend(args.period, args.host):
+                print(f"{row['period']}  scans {row['scans']:>4}  failed {row['failed']:>6}  "
+                      f"warnings {row['warnings']:>6}")
+        elif args.command == 'compact':
+            deleted = store.compact(args.full_days, args.weekly_days)
+            print(f"Deleted {deleted} scans")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
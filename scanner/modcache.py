@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Result cache for check modules with declared inputs.
+
+Most modules only look at a handful of files. A module can declare them in
+its header comments, and the scheduler then reuses the module's previous
+results while those inputs are unchanged instead of running it again:
+
+    # cache-inputs: /etc/ssh /usr/sbin/sshd
+    # cache-inputs-from: python3 -m scanner.sshd_config --files
+    # cache-commands: systemctl is-active ssh
+    # cache-ttl: 3600
+
+``cache-inputs`` are files or directories, fingerprinted by their stat
+(inode, size, mtime, ctime, mode); directories include their entries, so
+added, removed or chmod-ed files count as changes. ``$HARDENING_ROOT`` and
+``$PROJECT_ROOT`` may be used in paths. ``cache-inputs-from`` commands are
+run from the project root and print further inputs, one path per line, for
+inputs only known at run time (files pulled in by an Include).
+``cache-commands`` are run and their output hashed, for state that lives
+outside files. ``cache-ttl`` bounds how
+long a result is reused (seconds). The module script and common.sh are
+always part of the fingerprint.
+
+Reused records are written with ``"cached": true``. Results of a run in
+which a helper failed (a ``... Failed`` warning such as "Filesystem Walk
+Failed") are not cached, so a transient failure is not replayed for the
+whole TTL. Modules without declarations are always run. Set HARDENING_CACHE=0 to disable the cache.
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import time
+from string import Template
+from typing import Optional
+
+from .state import open_private, private_dir, state_dir
+
+
+CACHE_VERSION = 1
+
+# Used when a module declares inputs but no TTL
+DEFAULT_TTL = 3600.0
+
+# Entries fingerprinted per declared directory
+DIRECTORY_LIMIT = 10000
+
+# Seconds a cache-commands or cache-inputs-from command may take
+COMMAND_TIMEOUT = 10
+
+DECLARATION = re.compile(r'^#\s*cache-(inputs|inputs-from|commands|ttl):\s*(.*?)\s*$')
+
+# $PROJECT_ROOT of the declarations, and where cache-inputs-from commands run
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Check name suffix of the warnings emitted when a helper fails
+HELPER_FAILURE_SUFFIX = " Failed"
+
+
+def helper_failed(data: bytes) -> bool:
+    """Return True if NDJSON results contain a helper failure warning."""
+    for line in data.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if (isinstance(record, dict) and record.get('result') == "WARN"
+                and str(record.get('check_name', '')).endswith(HELPER_FAILURE_SUFFIX)):
+            return True
+    return False
+
+
+def cache_enabled() -> bool:
+    """Return False when HARDENING_CACHE disables the module cache."""
+    return os.environ.get('HARDENING_CACHE', '1').strip().lower() not in ('0', 'no', 'off', 'false')
+
+
+class _DefaultEnv(dict):
+    """Template mapping: environment variables, unset ones as ''."""
+
+    def __missing__(self, key):
+        return os.environ.get(key, '')
+
+
+class ModuleInputs:
+    """Inputs declared in the header of a module script."""
+
+    def __init__(self, script: str):
+        self.script = script
+        self.paths = []
+        self.path_commands = []
+        self.commands = []
+        self.ttl = DEFAULT_TTL
+        self._read_header()
+
+    def _read_header(self):
+        try:
+            with open(self.script, 'r') as f:
+                for line in f:
+                    if line.strip() and not line.startswith('#'):
+                        break
+                    match = DECLARATION.match(line)
+                    if match is None:
+                        continue
+                    kind, value = match.groups()
+                    if kind == 'inputs':
+                        self.paths.extend(value.split())
+                    elif kind == 'inputs-from':
+                        self.path_commands.append(value)
+                    elif kind == 'commands':
+                        self.commands.append(value)
+                    elif value:
+                        self.ttl = float(value)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not read cache declarations of {self.script}: {e}")
+            self.paths = []
+            self.path_commands = []
+            self.commands = []
+
+    @property
+    def declared(self) -> bool:
+        return bool(self.paths or self.path_commands or self.commands)
+
+    def _expand(self, path: str) -> str:
+        mapping = _DefaultEnv(PROJECT_ROOT=PROJECT_ROOT,
+                              HARDENING_ROOT=os.environ.get('HARDENING_ROOT', '').rstrip('/'))
+        return Template(path).substitute(mapping)
+
+    @staticmethod
+    def _stat_line(path: str) -> str:
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            return f"{path} missing {e.errno}"
+        return f"{path} {st.st_ino} {st.st_size} {st.st_mtime_ns} {st.st_ctime_ns} {st.st_mode}"
+
+    def _fingerprint_path(self, digest, path: str):
+        digest.update(self._stat_line(path).encode('utf-8', 'surrogateescape'))
+        if not os.path.isdir(path):
+            return
+        count = 0
+        for directory, subdirs, files in os.walk(path):
+            subdirs.sort()
+            for name in sorted(subdirs + files):
+                count += 1
+                if count > DIRECTORY_LIMIT:
+                    digest.update(b"truncated")
+                    return
+                digest.update(self._stat_line(os.path.join(directory, name)).encode(
+                    'utf-8', 'surrogateescape'))
+
+    def fingerprint(self) -> str:
+        """Return a hash of the current state of every declared input."""
+        digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+        common = os.path.join(os.path.dirname(self.script), "common.sh")
+        for path in [self.script, common] + [self._expand(p) for p in self.paths]:
+            self._fingerprint_path(digest, path)
+            digest.update(b"\0")
+        for command in self.path_commands:
+            digest.update(command.encode() + b"\0")
+            try:
+                completed = subprocess.run(
+                    ["bash", "-c", command], stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL, cwd=PROJECT_ROOT, timeout=COMMAND_TIMEOUT
+                )
+            except subprocess.TimeoutExpired:
+                digest.update(b"timeout\0")
+                continue
+            digest.update(f"exit {completed.returncode}\0".encode())
+            for path in completed.stdout.decode('utf-8', 'surrogateescape').splitlines():
+                if path:
+                    self._fingerprint_path(digest, path)
+                    digest.update(b"\0")
+        for command in self.commands:
+            try:
+                output = subprocess.run(
+                    ["bash", "-c", command], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                    timeout=COMMAND_TIMEOUT
+                ).stdout
+            except subprocess.TimeoutExpired:
+                output = b"timeout"
+            digest.update(command.encode() + b"\0" + output + b"\0")
+        return digest.hexdigest()
+
+
+class ModuleCache:
+    """Stored results of the modules, keyed on their input fingerprints."""
+
+    def __init__(self, directory: str = None):
+        if directory is None:
+            directory = os.path.join(state_dir(), "module-cache")
+        self.directory = directory
+
+    def _paths(self, module: str):
+        base = os.path.join(self.directory, module)
+        return base + ".meta.json", base + ".ndjson"
+
+    def lookup(self, module: str, fingerprint: str, ttl: float) -> Optional[str]:
+        """
+        Return the cached records file of a module if it is still valid.
+
+        Args:
+            module: Module name
+            fingerprint: Current fingerprint of its inputs
+            ttl: Maximum age of the cached results in seconds
+        """
+        meta_path, records_path = self._paths(module)
+        try:
+            with open_private(meta_path) as f:
+                meta = json.load(f)
+            # Only the owner may have written the records either
+            open_private(records_path).close()
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(meta, dict) or meta.get('version') != CACHE_VERSION
+                or meta.get('fingerprint') != fingerprint
+                or time.time() - meta.get('created', 0) > ttl):
+            return None
+        return records_path
+
+    def store(self, module: str, fingerprint: str, results_file: str):
+        """
+        Keep the results a module just wrote, under its input fingerprint.
+
+        Results reporting a helper failure are not kept.
+        """
+        meta_path, records_path = self._paths(module)
+        try:
+            with open(results_file, 'rb') as src:
+                data = src.read()
+        except OSError as e:
+            print(f"Warning: could not cache {module} results: {e}")
+            return
+        if helper_failed(data):
+            print(f"{module} reported a helper failure; results not cached")
+            return
+        if not private_dir(self.directory):
+            return
+        try:
+            with open(records_path + ".tmp", 'wb') as dst:
+                dst.write(data)
+            os.replace(records_path + ".tmp", records_path)
+            with open(meta_path + ".tmp", 'w') as f:
+                json.dump({'version': CACHE_VERSION, 'fingerprint': fingerprint,
+                           'created': time.time()}, f)
+            os.replace(meta_path + ".tmp", meta_path)
+        except OSError as e:
+            print(f"Warning: could not cache {module} results: {e}")
+
+    @staticmethod
+    def restore(records_path: str, results_file: str) -> int:
+        """
+        Publish cached records as the module's results, marked as cached.
+
+        Returns:
+            Number of records written
+        """
+        count = 0
+        partial = results_file + ".partial"
+        with open_private(records_path) as src, open(partial, 'w') as dst:
+            for line in src:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                record['cached'] = True
+                dst.write(json.dumps(record, separators=(',', ':')) + "\n")
+                count += 1
+        os.replace(partial, results_file)
+        return count
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Indexed package inventory for security.sh.
+
+security.sh looked for each security tool with ``command -v``, then
+``dpkg -l | grep`` and ``rpm -qa | grep``, dumping the whole package list
+once per tool (``rpm -qa`` alone takes seconds). This module builds a
+name -> version index once: by parsing /var/lib/dpkg/status directly, or
+with a single ``rpm -qa --qf`` query. The index is cached in the scan state
+directory and rebuilt only when the package database file changes (inode,
+size or mtime), so package checks become dictionary lookups.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+from .emit import Record, write_records
+from .state import open_private, private_dir, state_dir
+
+
+CACHE_VERSION = 1
+
+DPKG_STATUS = "/var/lib/dpkg/status"
+
+# rpm databases: sqlite (rpm >= 4.16), Berkeley DB, and the /usr/lib/sysimage location
+RPM_DATABASES = (
+    "/var/lib/rpm/rpmdb.sqlite",
+    "/var/lib/rpm/Packages",
+    "/usr/lib/sysimage/rpm/rpmdb.sqlite",
+    "/usr/lib/sysimage/rpm/Packages",
+)
+
+RPM_QUERYFORMAT = "%{NAME}\\t%|EPOCH?{%{EPOCH}:}:{}|%{VERSION}-%{RELEASE}\\n"
+
+# Seconds the rpm query may take
+RPM_TIMEOUT = 120
+
+
+def parse_dpkg_status(path: str) -> Dict[str, str]:
+    """
+    Parse the dpkg status database.
+
+    Only packages whose status is ``installed`` are kept (not removed
+    packages with leftover configuration). For multi-arch packages
+    installed for several architectures the first entry wins.
+
+    Returns:
+        Mapping of package name to version
+    """
+    packages = {}
+    name = version = status = None
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if line == '\n':
+                if name and version and status and status.split()[-1] == 'installed':
+                    packages.setdefault(name, version)
+                name = version = status = None
+            elif line.startswith('Package: '):
+                name = line[9:].strip()
+            elif line.startswith('Version: '):
+                version = line[9:].strip()
+            elif line.startswith('Status: '):
+                status = line[8:].strip()
+    if name and version and status and status.split()[-1] == 'installed':
+        packages.setdefault(name, version)
+    return packages
+
+
+def query_rpm(root: str = '') -> Optional[Dict[str, str]]:
+    """
+    List the installed rpm packages with one query.
+
+    Returns:
+        Mapping of package name to [epoch:]version-release, or None if rpm
+        cannot be run
+    """
+    command = ["rpm", "-qa", "--qf", RPM_QUERYFORMAT]
+    if root:
+        command[1:1] = ["--root", root]
+    try:
+        completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                   timeout=RPM_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if completed.returncode != 0:
+        return None
+    packages = {}
+    for line in completed.stdout.decode('utf-8', 'replace').splitlines():
+        name, _, version = line.partition('\t')
+        if name and name != 'gpg-pubkey':
+            packages.setdefault(name, version)
+    return packages
+
+
+class PackageInventory:
+    """Installed packages by name, from dpkg or rpm."""
+
+    def __init__(self, packages: Dict[str, str] = None, source: str = None,
+                 database: str = None):
+        self.packages = packages or {}
+        self.source = source
+        self.database = database
+
+    def version(self, name: str) -> Optional[str]:
+        """Return the installed version of a package, or None."""
+        return self.packages.get(name)
+
+    def installed(self, name: str) -> bool:
+        return name in self.packages
+
+    def __len__(self) -> int:
+        return len(self.packages)
+
+
+class InventoryLoader:
+    """Finds the package database and caches its index on the database's stat."""
+
+    def __init__(self, root: str = '', cache_file: str = None):
+        """
+        Initialize the loader.
+
+        Args:
+            root: Offline root to read the package database from
+            cache_file: Index cache (default: packages.json in the state
+                directory; '' = no cache)
+        """
+        self.root = root.rstrip('/')
+        if cache_file is None:
+            cache_file = os.path.join(state_dir(), "packages.json")
+        self.cache_file = cache_file
+
+    def _database(self):
+        """Return (source, database path, stat) of the package database, or None."""
+        candidates = [('dpkg', DPKG_STATUS)] + [('rpm', path) for path in RPM_DATABASES]
+        for source, path in candidates:
+            try:
+                return source, path, os.stat(self.root + path)
+            except OSError:
+                continue
+        return None
+
+    def _read_cache(self, key: Dict) -> Optional[Dict[str, str]]:
+        if not self.cache_file:
+            return None
+        try:
+            with open_private(self.cache_file) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cached, dict) or cached.get('key') != key:
+            return None
+        return cached.get('packages')
+
+    def _write_cache(self, key: Dict, packages: Dict[str, str]):
+        if not self.cache_file:
+            return
+        if not private_dir(os.path.dirname(os.path.abspath(self.cache_file))):
+            return
+        try:
+            with open(self.cache_file + ".tmp", 'w') as f:
+                json.dump({'key': key, 'packages': packages}, f, separators=(',', ':'))
+            os.replace(self.cache_file + ".tmp", self.cache_file)
+        except OSError as e:
+            print(f"Warning: could not cache the package inventory: {e}", file=sys.stderr)
+
+    def load(self, refresh: bool = False) -> PackageInventory:
+        """
+        Return the package inventory, from the cache while the database is unchanged.
+
+        Args:
+            refresh: Ignore the cache and read the database again
+        """
+        found = self._database()
+        if found is None:
+            return PackageInventory()
+        source, database, st = found
+        key = {'version': CACHE_VERSION, 'root': self.root, 'source': source,
+               'database': database, 'stat': [st.st_ino, st.st_size, st.st_mtime_ns]}
+        packages = None if refresh else self._read_cache(key)
+        if packages is None:
+            if source == 'dpkg':
+                try:
+                    packages = parse_dpkg_status(self.root + database)
+                except OSError as e:
+                    print(f"Cannot read {database}: {e.strerror}", file=sys.stderr)
+                    return PackageInventory(source=source, database=database)
+            else:
+                packages = query_rpm(self.root)
+                if packages is None:
+                    return PackageInventory(source=source, database=database)
+            self._write_cache(key, packages)
+        return PackageInventory(packages, source, database)
+
+
+def tool_records(inventory: PackageInventory, tools: List[str],
+                 search_path: bool = True) -> List[Record]:
+    """
+    Report the security tools that are installed.
+
+    A tool counts as installed if its package is, or (for tools installed
+    outside the package manager) if it is on the PATH.
+
+    Args:
+        inventory: Installed packages
+        tools: Tool (package) names
+        search_path: Also look the tools up on the PATH; off for offline
+            roots, whose PATH is not this host's
+
+    Returns:
+        ('tools', check_name, result, status, details) records
+    """
+    records = []
+    for tool in tools:
+        version = inventory.version(tool)
+        if version is not None:
+            records.append(('tools', f"Security Tool: {tool}", "INFO", "LOW",
+                            f"{tool} is installed (version {version})"))
+        elif search_path and shutil.which(tool):
+            records.append(('tools', f"Security Tool: {tool}", "INFO", "LOW",
+                            f"{tool} is installed"))
+    return records
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point used by security.sh."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('names', nargs='*',
+                            help="Packages to look up (default: list every package)")
+    arg_parser.add_argument('--root', default='', help="Offline root to read the package database from")
+    arg_parser.add_argument('--tools', action='store_true',
+                            help="Print 'Security Tool' records for the names instead of versions")
+    arg_parser.add_argument('--refresh', action='store_true', help="Ignore the cached index")
+    args = arg_parser.parse_args(argv)
+
+    inventory = InventoryLoader(args.root).load(args.refresh)
+    if args.tools:
+        write_records(tool_records(inventory, args.names, search_path=not args.root))
+        return 0
+
+    if inventory.source is None:
+        print("No package database found", file=sys.stderr)
+        return 1
+    # "name version" for every installed package asked for; exit 1 if any is missing
+    missing = 0
+    for name in args.names or sorted(inventory.packages):
+        version = inventory.version(name)
+        if version is None:
+            missing += 1
+        else:
+            print(f"{name} {version}")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
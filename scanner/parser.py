@@ -5,20 +5,38 @@ Parser module for reading and processing hardening scan results.
 
 import json
 import os
-import re
-import yaml
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .rules import RuleIndex, load_rules, rule_files
+
+
+# Results that count as failing (summary, baseline, history, exit codes)
+FAILING = ('FAIL', 'WARN')
+
+
+class LiveFile:
+    """Read position in one module's result file while a scan runs."""
+    
+    def __init__(self, inode: int, ignored: bool = False):
+        self.inode = inode
+        self.offset = 0
+        self.pending = b''
+        self.ignored = ignored
 
 
 class ScanParser:
     """Parses JSON scan results and applies YAML rules."""
     
-    def __init__(self, rules_file: str = None):
+    def __init__(self, rules_file: Union[str, List[str]] = None, cache: bool = True):
         """
         Initialize the parser with rules file.
         
         Args:
-            rules_file: Path to YAML rules file
+            rules_file: Path to YAML rules file, or a list of rule files to
+                merge (later files take precedence)
+            cache: Keep the parsed results of each module until its result
+                file changes. Streaming callers that read a scan once (reports,
+                fleet aggregation) pass False so memory use stays constant.
         """
         if rules_file is None:
             # Default to rules/rules.yaml relative to project root
@@ -28,43 +46,32 @@ class ScanParser:
         
         self.rules_file = rules_file
         self.rules = self._load_rules()
+        self.rule_index = RuleIndex(self.rules)
         self.scan_dir = "/tmp/hardening-scan"
+        self.cache = cache
+        # Parsed results and summary per result file, keyed on its stat
+        self._module_cache = {}
+        # Read positions while following a running scan (start_live)
+        self._live = {}
     
-    def _load_rules(self) -> Dict:
-        """Load rules from YAML file."""
-        try:
-            with open(self.rules_file, 'r') as f:
-                rules_data = yaml.safe_load(f)
-                return rules_data.get('rules', [])
-        except FileNotFoundError:
-            print(f"Warning: Rules file not found: {self.rules_file}")
-            return []
-        except yaml.YAMLError as e:
-            print(f"Error parsing YAML rules: {e}")
-            return []
+    def set_scan_dir(self, scan_dir: str):
+        """
+        Read results from another scan directory.
+        
+        Drops the parse cache and live positions of the previous directory,
+        so one parser (and its compiled rules) can serve many scans.
+        """
+        self.scan_dir = scan_dir
+        self._module_cache = {}
+        self._live = {}
+    
+    def _load_rules(self) -> List[Dict]:
+        """Load and merge the rules (cached, see scanner/rules.py)."""
+        return load_rules(rule_files(self.rules_file))
     
     def _find_rule(self, check_name: str) -> Optional[Dict]:
         """Find matching rule for a check name."""
-        # Try exact match first
-        for rule in self.rules:
-            if rule.get('check_name') == check_name:
-                return rule
-        
-        # Try regex match
-        for rule in self.rules:
-            pattern = rule.get('check_name', '')
-            if pattern.startswith('.*') or '*' in pattern:
-                # Convert to regex
-                regex_pattern = pattern.replace('*', '.*')
-                if re.match(regex_pattern, check_name):
-                    return rule
-        
-        # Return default rule if exists
-        for rule in self.rules:
-            if rule.get('check_name') == '.*':
-                return rule
-        
-        return None
+        return self.rule_index.lookup(check_name)
     
     def _determine_severity(self, check_name: str, status: str, result: str) -> str:
         """
@@ -78,8 +85,12 @@ class ScanParser:
         Returns:
             Severity level (HIGH, MEDIUM, LOW)
         """
+        return self._rule_severity(self._find_rule(check_name), status, result)
+    
+    @staticmethod
+    def _rule_severity(rule: Optional[Dict], status: str, result: str) -> str:
+        """Determine severity from an already looked-up rule."""
         # First check if rule exists and has severity
-        rule = self._find_rule(check_name)
         if rule and 'severity' in rule:
             return rule['severity']
         
@@ -99,11 +110,125 @@ class ScanParser:
     
     def _get_remediation(self, check_name: str) -> str:
         """Get remediation text for a check."""
-        rule = self._find_rule(check_name)
+        return self._rule_remediation(self._find_rule(check_name))
+    
+    @staticmethod
+    def _rule_remediation(rule: Optional[Dict]) -> str:
+        """Get remediation text from an already looked-up rule."""
         if rule and 'remediation' in rule:
             return rule['remediation']
         return "Review and address the issue based on security best practices."
     
+    @staticmethod
+    def _decode_records(content: str) -> List[Dict]:
+        """
+        Decode the records of one result file.
+        
+        Accepts the NDJSON stream written by bash_checks/common.sh (one
+        object per line) as well as the older single JSON array or object.
+        
+        Args:
+            content: File content, stripped of surrounding whitespace
+        
+        Returns:
+            List of raw check results
+        """
+        if content.startswith('['):
+            data = json.loads(content)
+            return [record for record in data if isinstance(record, dict)]
+        
+        records = []
+        decoder = json.JSONDecoder()
+        pos = 0
+        end = len(content)
+        while pos < end:
+            record, pos = decoder.raw_decode(content, pos)
+            if isinstance(record, dict):
+                records.append(record)
+            while pos < end and content[pos].isspace():
+                pos += 1
+        return records
+    
+    # Result files in module order
+    RESULT_FILES = [
+        'services.json',
+        'network.json',
+        'ssh.json',
+        'users.json',
+        'permissions.json',
+        'kernel.json',
+        'security.json'
+    ]
+    
+    def _iter_file_records(self, json_file: str) -> Iterator[Dict]:
+        """
+        Stream the raw records of one module.
+        
+        NDJSON files are decoded one line at a time, so memory use does not
+        grow with the file. A malformed line (e.g. the last record of a
+        module that was killed mid-write) is reported and skipped; the
+        records around it are kept. Files holding the older single JSON
+        array are decoded as a whole.
+        
+        Args:
+            json_file: Result file name inside the scan directory
+        
+        Yields:
+            Raw check results
+        
+        Raises:
+            OSError: The file cannot be read
+            ValueError: A legacy JSON array cannot be decoded
+        """
+        file_path = os.path.join(self.scan_dir, json_file)
+        with open(file_path, 'r') as f:
+            first = True
+            for line_number, line in enumerate(f, 1):
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                if first and stripped.startswith('['):
+                    content = (stripped + f.read()).strip()
+                    if content != '[]':
+                        yield from self._decode_records(content)
+                    return
+                first = False
+                try:
+                    record = json.loads(stripped)
+                except json.JSONDecodeError as e:
+                    print(f"Skipping malformed record in {json_file} line {line_number}: {e}")
+                    continue
+                if isinstance(record, dict):
+                    yield record
+    
+    def _report_read_error(self, json_file: str, error: Exception):
+        """Print why a result file could not be loaded."""
+        if isinstance(error, json.JSONDecodeError):
+            print(f"Error parsing {json_file}: {error}")
+        else:
+            print(f"Error reading {json_file}: {error}")
+    
+    def iter_raw_results(self) -> Iterator[Dict]:
+        """
+        Stream the raw scan results, module by module.
+        
+        Malformed lines are reported and skipped; a file that cannot be
+        read at all is reported and skipped.
+        
+        Yields:
+            Raw check results
+        """
+        if not os.path.exists(self.scan_dir):
+            return
+        
+        for json_file in self.RESULT_FILES:
+            if not os.path.exists(os.path.join(self.scan_dir, json_file)):
+                continue
+            try:
+                yield from self._iter_file_records(json_file)
+            except Exception as e:
+                self._report_read_error(json_file, e)
+    
     def load_scan_results(self) -> List[Dict]:
         """
         Load all JSON scan results from scan directory.
@@ -111,41 +236,145 @@ class ScanParser:
         Returns:
             List of parsed check results
         """
-        if not os.path.exists(self.scan_dir):
-            return []
-        
-        all_results = []
-        json_files = [
-            'services.json',
-            'network.json',
-            'ssh.json',
-            'users.json',
-            'permissions.json',
-            'kernel.json',
-            'security.json'
-        ]
-        
-        for json_file in json_files:
-            file_path = os.path.join(self.scan_dir, json_file)
-            if os.path.exists(file_path):
+        return list(self.iter_raw_results())
+    
+    def _enrich(self, result: Dict) -> Dict:
+        """Apply the rules to one raw check result."""
+        check_name = result.get('check_name', 'Unknown Check')
+        result_status = result.get('result', 'UNKNOWN')
+        status = result.get('status', 'LOW')
+        details = result.get('details', '')
+        
+        # One rule lookup serves severity and remediation
+        rule = self._find_rule(check_name)
+        
+        # Determine severity
+        severity = self._rule_severity(rule, status, result_status)
+        
+        # Get remediation
+        remediation = self._rule_remediation(rule)
+        
+        parsed = {
+            'check_name': check_name,
+            'result': result_status,
+            'severity': severity,
+            'remediation': remediation,
+            'details': details
+        }
+        if result.get('cached'):
+            # Reused from the module cache (scanner/modcache.py)
+            parsed['cached'] = True
+        return parsed
+    
+    @staticmethod
+    def _empty_summary() -> Dict:
+        return {
+            'total': 0,
+            'high': 0,
+            'medium': 0,
+            'low': 0,
+            'passed': 0,
+            'failed': 0,
+            'warnings': 0
+        }
+    
+    @staticmethod
+    def _count(summary: Dict, result: Dict):
+        """Add one parsed result to the summary counters."""
+        severity = result['severity']
+        outcome = result['result']
+        summary['total'] += 1
+        if outcome in FAILING:
+            if severity == 'HIGH':
+                summary['high'] += 1
+            elif severity == 'MEDIUM':
+                summary['medium'] += 1
+        if severity == 'LOW' or outcome == 'PASS':
+            summary['low'] += 1
+        if outcome == 'PASS':
+            summary['passed'] += 1
+        elif outcome == 'FAIL':
+            summary['failed'] += 1
+        elif outcome == 'WARN':
+            summary['warnings'] += 1
+    
+    def scan_time(self) -> Optional[float]:
+        """Return when the current results were written (newest result file)."""
+        mtimes = []
+        for json_file in self.RESULT_FILES:
+            try:
+                mtimes.append(os.stat(os.path.join(self.scan_dir, json_file)).st_mtime)
+            except OSError:
+                continue
+        return max(mtimes) if mtimes else None
+    
+    @staticmethod
+    def _stat_key(st: os.stat_result) -> tuple:
+        """Cache key of a result file; the modules replace it on each run."""
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    
+    def _refresh(self) -> List[tuple]:
+        """
+        Bring the per-module cache up to date.
+        
+        A module is re-read and re-enriched only when its result file
+        changed (inode, size or mtime); the summary counters are computed
+        in the same pass.
+        
+        Returns:
+            (results, summary) for each module with results, in module order
+        """
+        modules = []
+        for json_file in self.RESULT_FILES:
+            try:
+                st = os.stat(os.path.join(self.scan_dir, json_file))
+            except OSError:
+                self._module_cache.pop(json_file, None)
+                continue
+            key = self._stat_key(st)
+            cached = self._module_cache.get(json_file)
+            if cached is None or cached[0] != key:
+                results = []
+                summary = self._empty_summary()
                 try:
-                    with open(file_path, 'r') as f:
-                        content = f.read().strip()
-                        if not content or content == '[]':
-                            continue
-                        data = json.loads(content)
-                        if isinstance(data, list):
-                            all_results.extend(data)
-                        elif isinstance(data, dict):
-                            all_results.append(data)
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing {json_file}: {e}")
-                    continue
+                    for raw in self._iter_file_records(json_file):
+                        parsed = self._enrich(raw)
+                        self._count(summary, parsed)
+                        results.append(parsed)
                 except Exception as e:
-                    print(f"Error reading {json_file}: {e}")
+                    self._report_read_error(json_file, e)
+                    self._module_cache.pop(json_file, None)
                     continue
+                cached = (key, results, summary)
+                self._module_cache[json_file] = cached
+            modules.append(cached[1:])
+        return modules
+    
+    def iter_results(self) -> Iterator[Dict]:
+        """
+        Stream scan results enriched with rules.
+        
+        Results are enriched lazily as they are read, one module at a time,
+        so consumers run in constant memory. Modules already parsed by
+        parse_results() and unchanged since are served from the cache.
         
-        return all_results
+        Yields:
+            Parsed results with severity and remediation
+        """
+        for json_file in self.RESULT_FILES:
+            try:
+                st = os.stat(os.path.join(self.scan_dir, json_file))
+            except OSError:
+                continue
+            cached = self._module_cache.get(json_file)
+            if cached is not None and cached[0] == self._stat_key(st):
+                yield from cached[1]
+                continue
+            try:
+                for raw in self._iter_file_records(json_file):
+                    yield self._enrich(raw)
+            except Exception as e:
+                self._report_read_error(json_file, e)
     
     def parse_results(self) -> List[Dict]:
         """
@@ -154,32 +383,28 @@ class ScanParser:
         Returns:
             List of parsed results with severity and remediation
         """
-        raw_results = self.load_scan_results()
+        if not self.cache:
+            return list(self.iter_results())
         parsed_results = []
+        for results, _summary in self._refresh():
+            parsed_results.extend(results)
+        return parsed_results
+    
+    @classmethod
+    def summarize(cls, results: Iterable[Dict]) -> Dict:
+        """
+        Compute summary statistics over any stream of parsed results.
         
-        for result in raw_results:
-            check_name = result.get('check_name', 'Unknown Check')
-            result_status = result.get('result', 'UNKNOWN')
-            status = result.get('status', 'LOW')
-            details = result.get('details', '')
-            
-            # Determine severity
-            severity = self._determine_severity(check_name, status, result_status)
-            
-            # Get remediation
-            remediation = self._get_remediation(check_name)
-            
-            parsed_result = {
-                'check_name': check_name,
-                'result': result_status,
-                'severity': severity,
-                'remediation': remediation,
-                'details': details
-            }
-            
-            parsed_results.append(parsed_result)
+        Args:
+            results: Parsed results, e.g. from iter_results()
         
-        return parsed_results
+        Returns:
+            Dictionary with summary statistics
+        """
+        summary = cls._empty_summary()
+        for result in results:
+            cls._count(summary, result)
+        return summary
     
     def get_summary(self) -> Dict:
         """
@@ -188,23 +413,111 @@ class ScanParser:
         Returns:
             Dictionary with summary statistics
         """
-        results = self.parse_results()
+        if not self.cache:
+            return self.summarize(self.iter_results())
+        summary = self._empty_summary()
+        for _results, module_summary in self._refresh():
+            for key, value in module_summary.items():
+                summary[key] += value
+        return summary
+    
+    def start_live(self):
+        """
+        Start following a scan as it writes its results.
         
-        total = len(results)
-        high = sum(1 for r in results if r['severity'] == 'HIGH' and r['result'] in ['FAIL', 'WARN'])
-        medium = sum(1 for r in results if r['severity'] == 'MEDIUM' and r['result'] in ['FAIL', 'WARN'])
-        low = sum(1 for r in results if r['severity'] == 'LOW' or r['result'] == 'PASS')
-        passed = sum(1 for r in results if r['result'] == 'PASS')
-        failed = sum(1 for r in results if r['result'] == 'FAIL')
-        warnings = sum(1 for r in results if r['result'] == 'WARN')
+        Result files present now belong to the previous scan and are
+        ignored until a module replaces them.
+        """
+        self._live = {}
+        for json_file in self.RESULT_FILES:
+            try:
+                st = os.stat(os.path.join(self.scan_dir, json_file))
+            except OSError:
+                continue
+            self._live[json_file] = LiveFile(st.st_ino, ignored=True)
+    
+    def poll_live(self) -> Dict[str, Tuple[bool, List[Dict]]]:
+        """
+        Read what the running scan wrote since the last poll.
         
-        return {
-            'total': total,
-            'high': high,
-            'medium': medium,
-            'low': low,
-            'passed': passed,
-            'failed': failed,
-            'warnings': warnings
-        }
-
+        Modules write ``<module>.json.partial`` and rename it to
+        ``<module>.json`` when done; the inode stays the same, so each file
+        is followed by inode and read from the last offset. Only complete
+        lines are parsed.
+        
+        Returns:
+            Mapping of result file name to (replaced, new parsed results)
+            for every module with news; replaced means results reported
+            earlier for that module are void (the file was rewritten)
+        """
+        updates = {}
+        for json_file in self.RESULT_FILES:
+            path = os.path.join(self.scan_dir, json_file)
+            st = None
+            for candidate in (path + ".partial", path):
+                try:
+                    st = os.stat(candidate)
+                    path = candidate
+                    break
+                except OSError:
+                    continue
+            if st is None:
+                continue
+            
+            state = self._live.get(json_file)
+            replaced = False
+            if state is None or state.inode != st.st_ino:
+                replaced = state is not None and not state.ignored
+                state = LiveFile(st.st_ino)
+                self._live[json_file] = state
+            elif state.ignored:
+                continue
+            elif st.st_size < state.offset:
+                replaced = True
+                state.offset = 0
+                state.pending = b''
+            if st.st_size == state.offset and not replaced:
+                continue
+            
+            try:
+                new_results = self._read_live(path, state)
+            except Exception as e:
+                self._report_read_error(json_file, e)
+                continue
+            if new_results or replaced:
+                updates[json_file] = (replaced, new_results)
+        return updates
+    
+    def _read_live(self, path: str, state: LiveFile) -> List[Dict]:
+        """Parse the complete records appended to a file since the last read."""
+        with open(path, 'rb') as f:
+            if state.offset == 0 and f.read(1) == b'[':
+                # Older single-array format: only complete once written
+                f.seek(0)
+                data = f.read()
+                try:
+                    records = self._decode_records(data.decode('utf-8', errors='replace').strip())
+                except ValueError:
+                    return []
+                state.offset = len(data)
+                state.ignored = True
+                return [self._enrich(raw) for raw in records]
+            f.seek(state.offset)
+            data = f.read()
+        state.offset += len(data)
+        data = state.pending + data
+        
+        lines = data.split(b'\n')
+        state.pending = lines.pop()
+        results = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                raw = json.loads(line.decode('utf-8', errors='replace'))
+            except json.JSONDecodeError:
+                continue
+            if isinstance(raw, dict):
+                results.append(self._enrich(raw))
+        return results
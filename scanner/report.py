@@ -3,21 +3,70 @@
 Report generator module for creating HTML reports.
 """
 
+import io
 import os
+import pickle
+import tempfile
 from datetime import datetime
-from typing import List, Dict
+from html import escape
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, TextIO
 from .parser import ScanParser
 
 
+# Severity sections in report order; the first two start expanded
+SECTION_ORDER = ['HIGH', 'MEDIUM', 'LOW']
+SEVERITY_RANK = {severity: rank for rank, severity in enumerate(SECTION_ORDER)}
+OPEN_SECTIONS = {'HIGH', 'MEDIUM'}
+
+# Rows per table before a section is split into collapsed pages
+DEFAULT_PAGE_SIZE = 500
+
+# Buffer size for streaming the report to disk
+WRITE_BUFFER = 1 << 16
+
+TABLE_HEAD = """
+        <table>
+            <thead>
+                <tr>
+                    <th>Check Name</th>
+                    <th>Result</th>
+                    <th>Severity</th>
+                    <th>Remediation</th>
+                </tr>
+            </thead>
+            <tbody>
+"""
+
+FLEET_TABLE_HEAD = """
+        <table>
+            <thead>
+                <tr>
+                    <th>Check Name</th>
+                    <th>Failing Hosts</th>
+                    <th>Severity</th>
+                    <th>Remediation</th>
+                </tr>
+            </thead>
+            <tbody>
+"""
+
+TABLE_TAIL = """
+            </tbody>
+        </table>
+"""
+
+
 class ReportGenerator:
     """Generates HTML reports from scan results."""
     
-    def __init__(self, output_dir: str = None):
+    def __init__(self, output_dir: str = None, page_size: int = DEFAULT_PAGE_SIZE):
         """
         Initialize report generator.
         
         Args:
             output_dir: Directory to save reports
+            page_size: Rows per table before a severity section is paginated
         """
         if output_dir is None:
             # Default to reports/ relative to project root
@@ -26,6 +75,7 @@ class ReportGenerator:
             output_dir = os.path.join(project_root, "reports")
         
         self.output_dir = output_dir
+        self.page_size = max(1, page_size)
         os.makedirs(self.output_dir, exist_ok=True)
     
     def _get_severity_color(self, severity: str) -> str:
@@ -45,27 +95,16 @@ class ReportGenerator:
             'WARN': '<span class="badge badge-warning">WARN</span>',
             'INFO': '<span class="badge badge-info">INFO</span>'
         }
-        return badges.get(result, f'<span class="badge badge-secondary">{result}</span>')
+        return badges.get(result, f'<span class="badge badge-secondary">{escape(str(result))}</span>')
     
-    def generate_html(self, results: List[Dict], summary: Dict) -> str:
-        """
-        Generate HTML report from results.
-        
-        Args:
-            results: List of parsed scan results
-            summary: Summary statistics dictionary
-        
-        Returns:
-            HTML content as string
-        """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        html = f"""<!DOCTYPE html>
+    def _write_head(self, out: TextIO, timestamp: str, title: str = "Host Hardening Check Report"):
+        """Write the document head, up to the generation time."""
+        out.write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Host Hardening Check Report</title>
+    <title>{escape(title)}</title>
     <style>
         * {{
             margin: 0;
@@ -219,107 +258,433 @@ class ReportGenerator:
         .filter-btn.active {{
             background-color: #2c3e50;
         }}
+        details.section {{
+            margin-top: 20px;
+        }}
+        details.section > summary {{
+            cursor: pointer;
+            font-size: 1.2em;
+            font-weight: bold;
+            padding: 10px;
+            background-color: #ecf0f1;
+            border-radius: 4px;
+        }}
+        details.page > summary {{
+            cursor: pointer;
+            padding: 6px 10px;
+            color: #2c3e50;
+        }}
     </style>
 </head>
 <body>
     <div class="container">
-        <h1>Host Hardening Check Report</h1>
+        <h1>{escape(title)}</h1>
         <p class="timestamp">Generated on: {timestamp}</p>
-        
-        <div class="summary">
-            <div class="summary-card high">
-                <h3>{summary.get('high', 0)}</h3>
-                <p>High Severity Issues</p>
-            </div>
-            <div class="summary-card medium">
-                <h3>{summary.get('medium', 0)}</h3>
-                <p>Medium Severity Issues</p>
-            </div>
-            <div class="summary-card low">
-                <h3>{summary.get('low', 0)}</h3>
-                <p>Low Severity / Passed</p>
-            </div>
-            <div class="summary-card passed">
-                <h3>{summary.get('passed', 0)}</h3>
-                <p>Passed Checks</p>
-            </div>
-            <div class="summary-card">
-                <h3>{summary.get('total', 0)}</h3>
-                <p>Total Checks</p>
-            </div>
+""")
+    
+    def _write_cards(self, out: TextIO, cards: List[tuple]):
+        """Write summary cards from (css class, value, label) tuples."""
+        out.write("""
+        <div class="summary">""")
+        for css_class, value, label in cards:
+            css = f"summary-card {css_class}" if css_class else "summary-card"
+            out.write(f"""
+            <div class="{css}">
+                <h3>{value}</h3>
+                <p>{escape(label)}</p>
+            </div>""")
+        out.write("""
         </div>
-        
-        <h2>Detailed Results</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>Check Name</th>
-                    <th>Result</th>
-                    <th>Severity</th>
-                    <th>Remediation</th>
-                </tr>
-            </thead>
-            <tbody>
-"""
-        
-        # Sort results by severity (HIGH first)
-        severity_order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
-        sorted_results = sorted(results, key=lambda x: (
-            severity_order.get(x['severity'], 3),
-            x['check_name']
-        ))
-        
-        for result in sorted_results:
-            severity = result['severity']
-            result_status = result['result']
-            severity_class = f"severity-{severity.lower()}"
-            
-            html += f"""
+""")
+    
+    @staticmethod
+    def _summary_cards(summary: Dict) -> List[tuple]:
+        return [
+            ('high', summary.get('high', 0), "High Severity Issues"),
+            ('medium', summary.get('medium', 0), "Medium Severity Issues"),
+            ('low', summary.get('low', 0), "Low Severity / Passed"),
+            ('passed', summary.get('passed', 0), "Passed Checks"),
+            ('', summary.get('total', 0), "Total Checks"),
+        ]
+    
+    def _write_row(self, out: TextIO, result: Dict):
+        """Write one result row (all fields HTML-escaped)."""
+        severity = str(result['severity'])
+        severity_class = f"severity-{escape(severity.lower())}"
+        details = result.get('details')
+        details_html = f'<div class="details">{escape(str(details))}</div>' if details else ''
+        if result.get('cached'):
+            details_html += '<div class="details">Reused from the previous scan (inputs unchanged)</div>'
+        out.write(f"""
                 <tr class="{severity_class}">
                     <td>
-                        <strong>{result['check_name']}</strong>
-                        {f'<div class="details">{result.get("details", "")}</div>' if result.get('details') else ''}
+                        <strong>{escape(str(result['check_name']))}</strong>
+                        {details_html}
                     </td>
-                    <td>{self._get_result_badge(result_status)}</td>
+                    <td>{self._get_result_badge(result['result'])}</td>
                     <td>
                         <span style="color: {self._get_severity_color(severity)}; font-weight: bold;">
-                            {severity}
+                            {escape(severity)}
                         </span>
                     </td>
-                    <td class="remediation">{result['remediation']}</td>
+                    <td class="remediation">{escape(str(result['remediation']))}</td>
                 </tr>
-"""
+""")
+    
+    def _write_table(self, out: TextIO, rows: List[Dict]):
+        """Write a results table."""
+        out.write(TABLE_HEAD)
+        for row in rows:
+            self._write_row(out, row)
+        out.write(TABLE_TAIL)
+    
+    def _write_fleet_row(self, out: TextIO, check: Dict):
+        """Write the fleet statistics of one check."""
+        severity = str(check['severity'])
+        results = check['results']
+        failing = results.get('FAIL', 0) + results.get('WARN', 0)
+        share = 100.0 * failing / check['hosts'] if check['hosts'] else 0.0
+        counts = ", ".join(f"{escape(str(result))} {count}" for result, count in sorted(results.items()))
+        affected = ""
+        if check['affected']:
+            more = " ..." if failing > len(check['affected']) else ""
+            affected = (f'<div class="details">Hosts: '
+                        f'{escape(", ".join(check["affected"]))}{more}</div>')
+        out.write(f"""
+                <tr class="severity-{escape(severity.lower())}">
+                    <td>
+                        <strong>{escape(str(check['check_name']))}</strong>
+                        <div class="details">{counts}</div>
+                        {affected}
+                    </td>
+                    <td><strong>{failing}</strong> / {check['hosts']} ({share:.0f}%)</td>
+                    <td>
+                        <span style="color: {self._get_severity_color(severity)}; font-weight: bold;">
+                            {escape(severity)}
+                        </span>
+                    </td>
+                    <td class="remediation">{escape(str(check['remediation']))}</td>
+                </tr>
+""")
+    
+    def _write_fleet_table(self, out: TextIO, rows: List[Dict]):
+        """Write a table of per-check fleet statistics."""
+        out.write(FLEET_TABLE_HEAD)
+        for row in rows:
+            self._write_fleet_row(out, row)
+        out.write(TABLE_TAIL)
+    
+    def _write_section(self, out: TextIO, label: str, rows: Iterable[Dict], expanded: bool,
+                       write_table=None, count: int = None):
+        """
+        Write a group of results as a collapsible section.
         
-        html += """
-            </tbody>
-        </table>
+        Sections larger than page_size are split into collapsed pages so
+        the browser only lays out the rows that are opened.
+        
+        Args:
+            rows: Rows of the section (a list, or an iterator with count given)
+            count: Number of rows (default: len(rows))
+        """
+        write_table = write_table or self._write_table
+        if count is None:
+            count = len(rows)
+        is_open = ' open' if expanded else ''
+        out.write(f"""
+        <details class="section"{is_open}>
+            <summary>{escape(label)} ({count})</summary>
+""")
+        if count <= self.page_size:
+            write_table(out, rows)
+        else:
+            rows = iter(rows)
+            for start in range(0, count, self.page_size):
+                page = list(islice(rows, self.page_size))
+                page_open = ' open' if start == 0 and is_open else ''
+                out.write(f"""
+            <details class="page"{page_open}>
+                <summary>Results {start + 1} - {start + len(page)} of {count}</summary>
+""")
+                write_table(out, page)
+                out.write("""
+            </details>
+""")
+        out.write("""
+        </details>
+""")
+    
+    def _write_slowest(self, out: TextIO, slowest: List[Dict]):
+        """Write the slowest checks (scanner/timings.py) as a collapsed section."""
+        out.write(f"""
+        <details class="section">
+            <summary>Slowest Checks ({len(slowest)})</summary>
+        <table>
+            <thead>
+                <tr><th>Check Name</th><th>Module</th><th>Wall Time</th><th>CPU Time</th><th>Processes</th></tr>
+            </thead>
+            <tbody>
+""")
+        for check in slowest:
+            out.write(f"""                <tr><td>{escape(str(check['check_name']))}</td>"""
+                      f"""<td>{escape(str(check['module']))}</td>"""
+                      f"""<td>{check['wall_ms']:.0f} ms</td><td>{check['cpu_ms']:.0f} ms</td>"""
+                      f"""<td>{check['processes']}</td></tr>
+""")
+        out.write(TABLE_TAIL + """        </details>
+""")
+    
+    def write_html(self, results: Iterable[Dict], summary: Optional[Dict], out: TextIO,
+                   slowest: List[Dict] = None):
+        """
+        Stream an HTML report to a file.
+        
+        Results are grouped by severity (HIGH first, in scan order within
+        a severity) into collapsible sections. The results are read once
+        and spilled page by page to one temporary file per severity, so
+        neither the document nor the results are held in memory, only up to
+        a page of rows per severity.
+        
+        Args:
+            results: Parsed scan results (list or iterator)
+            summary: Summary statistics dictionary (None = computed here)
+            out: Text stream to write to
+            slowest: Slowest checks from timings.slowest_checks() (optional)
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Severity -> [spill file, number of rows, rows not spilled yet]
+        sections = {}
+        
+        def spill(rows: Iterable[Dict]) -> Iterable[Dict]:
+            for result in rows:
+                section = sections.get(result['severity'])
+                if section is None:
+                    section = sections[result['severity']] = [None, 0, []]
+                section[1] += 1
+                section[2].append(result)
+                if len(section[2]) >= self.page_size:
+                    if section[0] is None:
+                        section[0] = tempfile.TemporaryFile()
+                    pickle.dump(section[2], section[0], pickle.HIGHEST_PROTOCOL)
+                    section[2] = []
+                yield result
+        
+        def read_back(section: List) -> Iterable[Dict]:
+            spilled, count, pending = section
+            if spilled is not None:
+                spilled.seek(0)
+                for _ in range((count - len(pending)) // self.page_size):
+                    yield from pickle.load(spilled)
+            yield from pending
+        
+        try:
+            counted = ScanParser.summarize(spill(results))
+            if summary is None:
+                summary = counted
+            
+            self._write_head(out, timestamp)
+            self._write_cards(out, self._summary_cards(summary))
+            out.write("""        
+        <h2>Detailed Results</h2>
+""")
+            ordered = [severity for severity in SECTION_ORDER if severity in sections]
+            ordered += sorted((severity for severity in sections if severity not in SECTION_ORDER), key=str)
+            for severity in ordered:
+                section = sections[severity]
+                label = severity.title() if severity in SECTION_ORDER else str(severity)
+                self._write_section(out, f"{label} Severity", read_back(section),
+                                    severity in OPEN_SECTIONS, count=section[1])
+        finally:
+            for spilled, _count, _pending in sections.values():
+                if spilled is not None:
+                    spilled.close()
+        
+        if slowest:
+            self._write_slowest(out, slowest)
+        
+        out.write("""
     </div>
 </body>
 </html>
-"""
+""")
+    
+    def write_diff_html(self, delta: List[Dict], out: TextIO, baseline: Dict = None):
+        """
+        Stream a report of the changes since a baseline.
+        
+        Args:
+            delta: Changed results from baseline.diff_results()
+            out: Text stream to write to
+            baseline: Baseline the results were compared to
+        """
+        from .baseline import CHANGES, CHANGE_LABELS
+        
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        groups = {kind: [] for kind in CHANGES}
+        for entry in delta:
+            row = dict(entry)
+            if entry.get('previous'):
+                details = entry.get('details') or ''
+                row['details'] = f"Previously {entry['previous']}. {details}".strip()
+            groups.setdefault(entry['change'], []).append(row)
+        
+        self._write_head(out, timestamp, "Host Hardening Changes Since Baseline")
+        if baseline and baseline.get('created_at'):
+            accepted = datetime.fromtimestamp(baseline['created_at']).strftime("%Y-%m-%d %H:%M:%S")
+            out.write(f"""        <p class="timestamp">Baseline accepted on: {accepted}
+            ({escape(str(baseline.get('host', '')))})</p>
+""")
+        self._write_cards(out, [
+            ('high', len(groups['new']), CHANGE_LABELS['new']),
+            ('passed', len(groups['resolved']), CHANGE_LABELS['resolved']),
+            ('medium', len(groups['changed']), CHANGE_LABELS['changed']),
+        ])
+        if not delta:
+            out.write("""
+        <h2>No changes since the baseline</h2>
+""")
+        for kind in CHANGES:
+            rows = groups.get(kind)
+            if rows:
+                rows.sort(key=lambda x: (SEVERITY_RANK.get(x['severity'], 3), str(x['check_name'])))
+                self._write_section(out, CHANGE_LABELS[kind], rows, kind != 'resolved')
         
-        return html
+        out.write("""
+    </div>
+</body>
+</html>
+""")
     
-    def save_report(self, results: List[Dict], summary: Dict) -> str:
+    def save_diff_report(self, delta: List[Dict], baseline: Dict = None) -> str:
         """
-        Generate and save HTML report to file.
+        Save a report of the changes since a baseline.
+        
+        Returns:
+            Path to saved report file
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = os.path.join(self.output_dir, f"hardening_changes_{timestamp}.html")
+        return self._save(filepath, lambda f: self.write_diff_html(delta, f, baseline))
+    
+    def write_fleet_html(self, fleet, out: TextIO):
+        """
+        Stream a report of fleet statistics.
         
         Args:
-            results: List of parsed scan results
-            summary: Summary statistics dictionary
+            fleet: Aggregated statistics (scanner.fleet.FleetStats)
+            out: Text stream to write to
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        checks = fleet.ranked_checks()
+        failing = [check for check in checks if fleet.failing(check)]
+        clean = [check for check in checks if not fleet.failing(check)]
+        
+        self._write_head(out, timestamp, "Host Hardening Fleet Report")
+        self._write_cards(out, [
+            ('', fleet.hosts, "Hosts"),
+            ('high', sum(1 for check in failing if check['severity'] == 'HIGH'),
+             "High Severity Checks Failing"),
+            ('medium', len(failing), "Checks Failing on Some Hosts"),
+            ('passed', len(clean), "Checks Passing Everywhere"),
+            ('low', fleet.unreadable, "Unreadable Hosts"),
+        ])
+        
+        worst = fleet.worst_hosts_list()
+        if worst:
+            out.write("""
+        <details class="section" open>
+            <summary>Hosts With Most Failing Checks</summary>
+        <table>
+            <thead>
+                <tr><th>Host</th><th>Failing Checks</th><th>High Severity</th></tr>
+            </thead>
+            <tbody>
+""")
+            for host in worst:
+                out.write(f"""                <tr><td>{escape(host['host'])}</td><td>{host['failing']}</td>"""
+                          f"""<td>{host['high']}</td></tr>
+""")
+            out.write(TABLE_TAIL + """        </details>
+""")
+        
+        self._write_section(out, "Failing on Some Hosts", failing, True, self._write_fleet_table)
+        self._write_section(out, "Passing on All Hosts", clean, False, self._write_fleet_table)
+        
+        if fleet.errors:
+            out.write("""
+        <details class="section">
+            <summary>Unreadable Hosts</summary>
+""")
+            for host, error in fleet.errors:
+                out.write(f"""            <div class="details">{escape(host)}: {escape(error)}</div>
+""")
+            if fleet.unreadable > len(fleet.errors):
+                out.write(f"""            <div class="details">... and {fleet.unreadable - len(fleet.errors)} more</div>
+""")
+            out.write("""        </details>
+""")
+        
+        out.write("""
+    </div>
+</body>
+</html>
+""")
+    
+    def save_fleet_report(self, fleet) -> str:
+        """
+        Save a fleet report.
         
         Returns:
             Path to saved report file
         """
-        html_content = self.generate_html(results, summary)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = os.path.join(self.output_dir, f"hardening_fleet_{timestamp}.html")
+        return self._save(filepath, lambda f: self.write_fleet_html(fleet, f))
+    
+    def _save(self, filepath: str, write) -> str:
+        """Stream a report to a temporary file, then move it into place."""
+        tmp_path = filepath + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+                write(f)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return filepath
+    
+    def generate_html(self, results: Iterable[Dict], summary: Dict) -> str:
+        """
+        Generate HTML report from results.
+        
+        Args:
+            results: Parsed scan results (list or iterator)
+            summary: Summary statistics dictionary
         
+        Returns:
+            HTML content as string
+        """
+        out = io.StringIO()
+        self.write_html(results, summary, out)
+        return out.getvalue()
+    
+    def save_report(self, results: Iterable[Dict], summary: Dict = None,
+                    slowest: List[Dict] = None) -> str:
+        """
+        Generate and save HTML report to file.
+        
+        Args:
+            results: Parsed scan results (list or iterator)
+            summary: Summary statistics dictionary (None = computed from results)
+            slowest: Slowest checks to list (optional)
+        
+        Returns:
+            Path to saved report file
+        """
         # Generate filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"hardening_report_{timestamp}.html"
         filepath = os.path.join(self.output_dir, filename)
         
-        with open(filepath, 'w') as f:
-            f.write(html_content)
-        
-        return filepath
-
+        return self._save(filepath, lambda f: self.write_html(results, summary, f, slowest))
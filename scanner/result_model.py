@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Qt item models for the results table.
+
+The table used to create four QTableWidgetItems per result on the UI thread.
+ResultTableModel serves text, colours and tooltips on demand from the parsed
+result list instead, so the view only touches the rows it draws, and
+ResultFilterProxyModel filters and sorts on top of it without rebuilding
+anything.
+"""
+
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtGui import QBrush, QColor
+
+
+# Role holding the value used for sorting (severity and result by rank)
+SORT_ROLE = Qt.UserRole
+
+SEVERITY_RANK = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+RESULT_RANK = {'FAIL': 0, 'WARN': 1, 'INFO': 2, 'PASS': 3}
+CHANGE_RANK = {'new': 0, 'changed': 1, 'resolved': 2}
+
+RESULT_COLORS = {
+    'PASS': QBrush(QColor(40, 167, 69)),
+    'FAIL': QBrush(QColor(220, 53, 69)),
+    'WARN': QBrush(QColor(255, 193, 7)),
+}
+
+# Severity (foreground, background); anything else is shown as LOW
+SEVERITY_COLORS = {
+    'HIGH': (QBrush(QColor(220, 53, 69)), QBrush(QColor(255, 230, 230))),
+    'MEDIUM': (QBrush(QColor(255, 193, 7)), QBrush(QColor(255, 248, 220))),
+    'LOW': (QBrush(QColor(40, 167, 69)), QBrush(QColor(230, 255, 230))),
+}
+
+
+class ResultTableModel(QAbstractTableModel):
+    """Table model over a list of parsed results."""
+
+    COLUMNS = ["Check Name", "Result", "Severity", "Remediation", "Change"]
+    KEYS = ['check_name', 'result', 'severity', 'remediation', 'change']
+
+    # Column shown only for results compared against a baseline
+    CHANGE_COLUMN = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._results = []
+        self._show_changes = False
+
+    def set_show_changes(self, show: bool):
+        """Show or hide the Change column (results from baseline.diff_results())."""
+        if show != self._show_changes:
+            self.beginResetModel()
+            self._show_changes = show
+            self.endResetModel()
+
+    def set_results(self, results: List[Dict]):
+        """Replace the displayed results."""
+        self.beginResetModel()
+        self._results = list(results)
+        self.endResetModel()
+
+    def append_results(self, results: List[Dict]):
+        """Add results below the current rows."""
+        if not results:
+            return
+        first = len(self._results)
+        self.beginInsertRows(QModelIndex(), first, first + len(results) - 1)
+        self._results.extend(results)
+        self.endInsertRows()
+
+    def result_at(self, row: int) -> Dict:
+        """Return the parsed result shown in a source row."""
+        return self._results[row]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._results)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS) if self._show_changes else self.CHANGE_COLUMN
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        result = self._results[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == self.CHANGE_COLUMN:
+                return self._change_text(result)
+            return result[self.KEYS[column]]
+        if role == Qt.ToolTipRole:
+            if column == 0:
+                return result.get('details') or None
+            if column == 1 and result.get('cached'):
+                return "Reused from the previous scan (inputs unchanged)"
+            if column == 3:
+                return result['remediation']
+            return None
+        if role == Qt.ForegroundRole:
+            if column == 1:
+                return RESULT_COLORS.get(result['result'])
+            if column == 2:
+                return SEVERITY_COLORS.get(result['severity'], SEVERITY_COLORS['LOW'])[0]
+            return None
+        if role == Qt.BackgroundRole:
+            if column == 2:
+                return SEVERITY_COLORS.get(result['severity'], SEVERITY_COLORS['LOW'])[1]
+            return None
+        if role == Qt.TextAlignmentRole:
+            if column in (1, 2, self.CHANGE_COLUMN):
+                return Qt.AlignCenter
+            return None
+        if role == SORT_ROLE:
+            if column == self.CHANGE_COLUMN:
+                return CHANGE_RANK.get(result.get('change'), len(CHANGE_RANK))
+            if column == 1:
+                return RESULT_RANK.get(result['result'], len(RESULT_RANK))
+            if column == 2:
+                return SEVERITY_RANK.get(result['severity'], len(SEVERITY_RANK))
+            return str(result[self.KEYS[column]]).lower()
+        return None
+
+    @staticmethod
+    def _change_text(result: Dict) -> str:
+        change = result.get('change')
+        if not change:
+            return ""
+        previous = result.get('previous')
+        if previous:
+            return f"{change} (was {previous})"
+        return change
+
+
+class ResultFilterProxyModel(QSortFilterProxyModel):
+    """Filters results by severity, result and free text."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._severity = None
+        self._result = None
+        self._text = ''
+        self.setSortRole(SORT_ROLE)
+
+    def set_filters(self, severity: Optional[str], result: Optional[str], text: str):
+        """
+        Set the filters (refilters a single time).
+
+        Args:
+            severity: Only this severity (None = all)
+            result: Only this result (None = all)
+            text: Only results whose name, details or remediation contain it
+        """
+        self._severity = severity or None
+        self._result = result or None
+        self._text = text.strip().lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent) -> bool:
+        result = self.sourceModel().result_at(source_row)
+        if self._severity is not None and result['severity'] != self._severity:
+            return False
+        if self._result is not None and result['result'] != self._result:
+            return False
+        if self._text:
+            text = self._text
+            return (text in str(result['check_name']).lower()
+                    or text in str(result.get('details', '')).lower()
+                    or text in str(result['remediation']).lower())
+        return True
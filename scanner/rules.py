@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Compiled rule lookup for ScanParser.
+
+Rules are matched by check name with the same precedence as the original
+linear search: the first rule whose name matches exactly, then the first
+wildcard rule (a name starting with ``.*`` or containing ``*``) in file
+order, then the catch-all ``.*`` rule. The index is built once when the
+rules are loaded; lookups cost a dict access plus, for unknown names, one
+match against a single combined pattern.
+
+Parsing YAML in pure Python is slow for large rule sets, so every rules
+file is also cached as JSON in the state directory, keyed on its path,
+size, mtime and SHA-256. A stale or missing cache entry is regenerated
+from the YAML source, using the C loader when PyYAML provides it.
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+from .state import open_private, private_dir, state_dir
+
+
+# Distinct check names remembered by RuleIndex.lookup
+MEMO_LIMIT = 65536
+
+# Bump when the cached form changes
+CACHE_VERSION = 1
+
+# Extra rule files, separated by os.pathsep (e.g. site rules)
+RULES_ENV = 'HARDENING_RULES'
+
+
+def is_wildcard(pattern: str) -> bool:
+    """Return True if a rule's check_name is matched as a pattern."""
+    return pattern.startswith('.*') or '*' in pattern
+
+
+class RuleIndex:
+    """Check name to rule lookup, compiled from a rules list."""
+
+    def __init__(self, rules: List[Dict]):
+        """
+        Build the index.
+
+        Args:
+            rules: Rules in file order, as loaded from rules.yaml
+        """
+        self.exact = {}
+        self.default = None
+        self._wildcards = []
+        self._memo = {}
+
+        for rule in rules:
+            if not isinstance(rule, dict):
+                continue
+            name = rule.get('check_name')
+            if not isinstance(name, str):
+                continue
+            self.exact.setdefault(name, rule)
+            if name == '.*' and self.default is None:
+                self.default = rule
+            if is_wildcard(name):
+                # Same conversion as the original lookup: '*' -> '.*'
+                try:
+                    regex = re.compile(name.replace('*', '.*'))
+                except re.error as e:
+                    print(f"Warning: Ignoring rule with invalid pattern {name!r}: {e}")
+                    continue
+                self._wildcards.append((regex, rule))
+
+        self._combined = self._combine()
+
+    def _combine(self) -> Optional["re.Pattern"]:
+        """
+        Join the wildcard patterns into one alternation.
+
+        Alternatives are tried left to right, so the first pattern in file
+        order that matches wins, as in the linear search. Patterns using
+        their own groups or backreferences cannot be renumbered safely;
+        the per-pattern list is used for those.
+        """
+        if not self._wildcards:
+            return None
+        if any(regex.groups for regex, _rule in self._wildcards):
+            return None
+        try:
+            return re.compile('|'.join(f"(?P<r{i}>{regex.pattern})"
+                                       for i, (regex, _rule) in enumerate(self._wildcards)))
+        except re.error:
+            return None
+
+    def _match_wildcard(self, check_name: str) -> Optional[Dict]:
+        if self._combined is not None:
+            match = self._combined.match(check_name)
+            if match is None:
+                return None
+            return self._wildcards[int(match.lastgroup[1:])][1]
+        for regex, rule in self._wildcards:
+            if regex.match(check_name):
+                return rule
+        return None
+
+    def lookup(self, check_name: str) -> Optional[Dict]:
+        """
+        Find the rule for a check name.
+
+        Args:
+            check_name: Name of the check
+
+        Returns:
+            Matching rule, or None
+        """
+        try:
+            return self._memo[check_name]
+        except KeyError:
+            pass
+
+        rule = self.exact.get(check_name)
+        if rule is None:
+            rule = self._match_wildcard(check_name)
+        if rule is None:
+            rule = self.default
+
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[check_name] = rule
+        return rule
+
+
+def _yaml_load(stream):
+    """Parse YAML with the C loader when available (imported on demand)."""
+    import yaml
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    return yaml.load(stream, Loader=loader)
+
+
+def _cache_path(path: str) -> Optional[str]:
+    directory = state_dir()
+    if not directory:
+        return None
+    key = hashlib.sha1(path.encode('utf-8', 'surrogateescape')).hexdigest()
+    return os.path.join(directory, "rules-cache", f"{key}.json")
+
+
+def _read_cache(cache_path: str, source: Dict) -> Optional[List[Dict]]:
+    # Only trust caches no other user could have written
+    try:
+        with open_private(cache_path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get('version') != CACHE_VERSION:
+        return None
+    for field in ('path', 'size', 'mtime_ns', 'sha256'):
+        if cached.get(field) != source[field]:
+            return None
+    rules = cached.get('rules')
+    return rules if isinstance(rules, list) else None
+
+
+def _write_cache(cache_path: str, source: Dict, rules: List[Dict]):
+    cached = dict(source, version=CACHE_VERSION, rules=rules)
+    if not private_dir(os.path.dirname(cache_path)):
+        return
+    try:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(cached, f, separators=(',', ':'))
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        # Not cacheable (e.g. YAML dates); the YAML source still works
+        pass
+
+
+def load_rule_file(path: str) -> List[Dict]:
+    """
+    Load the rules of one YAML file, through the compiled cache.
+
+    Args:
+        path: Path to a YAML rules file
+
+    Returns:
+        Rules in file order (empty if the file is missing or invalid)
+    """
+    path = os.path.abspath(path)
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+            st = os.fstat(f.fileno())
+    except FileNotFoundError:
+        print(f"Warning: Rules file not found: {path}")
+        return []
+    except OSError as e:
+        print(f"Warning: Cannot read rules file {path}: {e}")
+        return []
+
+    source = {
+        'path': path,
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'sha256': hashlib.sha256(content).hexdigest(),
+    }
+    cache_path = _cache_path(path)
+    if cache_path is not None:
+        rules = _read_cache(cache_path, source)
+        if rules is not None:
+            return rules
+
+    try:
+        rules_data = _yaml_load(content)
+    except Exception as e:
+        # yaml.YAMLError, without importing yaml up front
+        print(f"Error parsing YAML rules: {e}")
+        return []
+    rules = rules_data.get('rules', []) if isinstance(rules_data, dict) else []
+    if not isinstance(rules, list):
+        rules = []
+
+    if cache_path is not None:
+        _write_cache(cache_path, source, rules)
+    return rules
+
+
+def rule_files(rules_file=None) -> List[str]:
+    """
+    Return the rule files to merge, in increasing order of precedence.
+
+    Args:
+        rules_file: Path or list of paths; extra files listed in the
+            HARDENING_RULES environment variable are added after them
+
+    Returns:
+        List of paths
+    """
+    if rules_file is None:
+        paths = []
+    elif isinstance(rules_file, str):
+        paths = [rules_file]
+    else:
+        paths = list(rules_file)
+    extra = os.environ.get(RULES_ENV, '')
+    paths.extend(path for path in extra.split(os.pathsep) if path)
+    return paths
+
+
+def load_rules(paths: List[str]) -> List[Dict]:
+    """
+    Load and merge several rule files.
+
+    Rules from later files take precedence: they are placed first, so they
+    win both the exact and the wildcard lookup (e.g. site rules listed in
+    HARDENING_RULES override rules/rules.yaml).
+
+    Args:
+        paths: Rule files in increasing order of precedence
+
+    Returns:
+        Merged rules list in lookup order
+    """
+    merged = []
+    for path in reversed(paths):
+        merged.extend(load_rule_file(path))
+    return merged
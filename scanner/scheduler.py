@@ -0,0 +1,647 @@
+#!/usr/bin/env python3
+"""
+Concurrent scheduler for the bash check modules.
+
+run_all.sh used to run the seven modules one after another. The scheduler
+runs them concurrently with a bounded number of jobs, starts the modules
+that took longest on previous runs first, and kills any module that exceeds
+its timeout so that a hung ``systemctl`` or ``sshd -T`` cannot stall the
+whole scan.
+
+Progress is reported as structured events (``scan_started``,
+``module_started``, ``module_output``, ``module_finished``,
+``scan_finished``); ScanProgress turns them into a completed fraction and
+an ETA based on the recorded module durations.
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .modcache import ModuleCache, ModuleInputs, cache_enabled
+from .state import open_private, private_dir, state_dir
+from .timings import TIMING_SUFFIX, module_timings
+
+
+# Check modules in their historical run order, with the progress label
+MODULES = [
+    ('services', "Running services checks..."),
+    ('network', "Running network checks..."),
+    ('ssh', "Running SSH checks..."),
+    ('users', "Running user security checks..."),
+    ('permissions', "Running permissions checks..."),
+    ('kernel', "Running kernel hardening checks..."),
+    ('security', "Running security framework checks..."),
+]
+
+# Expected durations (seconds) used until a module has recorded timings
+DEFAULT_ESTIMATES = {
+    'permissions': 60.0,
+    'users': 10.0,
+    'security': 5.0,
+}
+
+# Built-in timeouts, used when no timeout is given for all modules
+DEFAULT_TIMEOUT = 300.0
+DEFAULT_TIMEOUTS = {
+    'permissions': 3600.0,
+}
+
+DEFAULT_JOBS = 4
+
+# Timings of the last runs kept per module
+HISTORY_LENGTH = 10
+
+
+def env_jobs() -> int:
+    """Return the concurrency set by HARDENING_JOBS (0 = all modules)."""
+    try:
+        jobs = int(os.environ.get('HARDENING_JOBS', DEFAULT_JOBS))
+    except ValueError:
+        jobs = DEFAULT_JOBS
+    return jobs if jobs > 0 else len(MODULES)
+
+
+def env_timeout() -> Optional[float]:
+    """Return the timeout for every module set by HARDENING_MODULE_TIMEOUT, or None."""
+    try:
+        return float(os.environ['HARDENING_MODULE_TIMEOUT'])
+    except (KeyError, ValueError):
+        return None
+
+
+class ModuleRun:
+    """Outcome of one module run."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = None
+        self.end = None
+        self.returncode = None
+        self.timed_out = False
+        self.cached = False
+        self.output = ""
+        # Why the module could not be run (e.g. bash is missing), or None
+        self.error = None
+        # From the module's timing file (scanner/timings.py)
+        self.cpu_ms = None
+        self.processes = None
+
+    @property
+    def duration(self) -> float:
+        if self.start is None or self.end is None:
+            return 0.0
+        return self.end - self.start
+
+    def to_dict(self) -> Dict:
+        return {
+            'module': self.name,
+            'start': datetime.fromtimestamp(self.start).isoformat() if self.start else None,
+            'end': datetime.fromtimestamp(self.end).isoformat() if self.end else None,
+            'duration': round(self.duration, 3),
+            'returncode': self.returncode,
+            'timed_out': self.timed_out,
+            'cached': self.cached,
+            'error': self.error,
+            'cpu_ms': self.cpu_ms,
+            'processes': self.processes,
+        }
+
+
+class TimingHistory:
+    """Per-module durations recorded across runs."""
+
+    def __init__(self, path: str = None):
+        """
+        Initialize the history.
+
+        Args:
+            path: JSON file holding the recorded durations
+        """
+        if path is None:
+            path = os.path.join(state_dir(), "timings.json")
+        self.path = path
+        self.durations = self._load()
+
+    def _load(self) -> Dict[str, List[float]]:
+        try:
+            with open_private(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {name: [float(d) for d in values] for name, values in data.items()
+                if isinstance(values, list)}
+
+    def estimate(self, name: str) -> float:
+        """Return the expected duration of a module (median of past runs)."""
+        values = sorted(self.durations.get(name, []))
+        if not values:
+            return DEFAULT_ESTIMATES.get(name, 1.0)
+        return values[len(values) // 2]
+
+    def record(self, name: str, duration: float):
+        """Add a completed run to the history."""
+        values = self.durations.setdefault(name, [])
+        values.append(round(duration, 3))
+        del values[:-HISTORY_LENGTH]
+
+    def save(self):
+        """Write the history back to disk."""
+        directory = os.path.dirname(self.path)
+        if directory and not private_dir(directory):
+            return
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.durations, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: could not save module timings: {e}")
+
+
+class ScanProgress:
+    """
+    Scan progress computed from scheduler events.
+
+    Each module counts with its expected duration, so the fraction grows
+    steadily even when the modules take very different times. A running
+    module counts as done in proportion to its elapsed time, capped below
+    complete until it finishes.
+    """
+
+    # Share of its estimate a running module can reach before it finishes
+    RUNNING_CAP = 0.95
+
+    def __init__(self):
+        self.jobs = 1
+        self.order = []
+        self.estimates = {}
+        self.started = {}
+        self.finished = {}
+        self.start = None
+        self.end = None
+
+    def update(self, event: Dict):
+        """Apply one scheduler event."""
+        kind = event.get('event')
+        if kind == 'scan_started':
+            self.__init__()
+            self.jobs = max(1, event.get('jobs', 1))
+            self.order = list(event.get('modules', []))
+            self.estimates = dict(event.get('estimates', {}))
+            self.start = event.get('time')
+        elif kind == 'module_started':
+            self.started[event['module']] = event['time']
+        elif kind == 'module_finished':
+            self.finished[event['module']] = event
+        elif kind == 'scan_finished':
+            self.end = event.get('time')
+
+    def state(self, name: str) -> str:
+        """Return pending, running, done, timed out or failed for a module."""
+        if name in self.finished:
+            if self.finished[name].get('error'):
+                return "failed"
+            return "timed out" if self.finished[name].get('timed_out') else "done"
+        if name in self.started:
+            return "running"
+        return "pending"
+
+    def elapsed(self, name: str, now: float = None) -> float:
+        """Return the seconds a module has been running (or ran)."""
+        if name in self.finished:
+            return self.finished[name].get('duration', 0.0)
+        if name in self.started:
+            return max(0.0, (now or time.time()) - self.started[name])
+        return 0.0
+
+    def fraction(self, now: float = None) -> float:
+        """Return the completed share of the scan (0.0 - 1.0)."""
+        if self.end is not None:
+            return 1.0
+        total = sum(self.estimates.get(name, 1.0) for name in self.order)
+        if total <= 0:
+            return 0.0
+        done = 0.0
+        for name in self.order:
+            estimate = self.estimates.get(name, 1.0)
+            if name in self.finished:
+                done += estimate
+            elif name in self.started:
+                done += min(self.elapsed(name, now), estimate * self.RUNNING_CAP)
+        return min(1.0, done / total)
+
+    def eta(self, now: float = None) -> float:
+        """
+        Return the expected seconds until the scan completes.
+
+        Replays the scheduler: running modules keep their slot for the rest
+        of their estimate, then pending modules take the first free slot
+        in start order.
+        """
+        if self.end is not None:
+            return 0.0
+        slots = []
+        for name in self.order:
+            if name in self.started and name not in self.finished:
+                estimate = self.estimates.get(name, 1.0)
+                slots.append(max(0.0, estimate - self.elapsed(name, now)))
+        slots.sort()
+        while len(slots) < self.jobs:
+            slots.insert(0, 0.0)
+        for name in self.order:
+            if name not in self.started:
+                slot = slots.pop(0)
+                slots.append(slot + self.estimates.get(name, 1.0))
+                slots.sort()
+        return max(slots) if slots else 0.0
+
+
+class ModuleScheduler:
+    """Runs the check modules concurrently with per-module timeouts."""
+
+    def __init__(self, script_dir: str = None, output_dir: str = "/tmp/hardening-scan",
+                 jobs: int = DEFAULT_JOBS, default_timeout: Optional[float] = None,
+                 timeouts: Dict[str, float] = None, modules: List[str] = None,
+                 history: TimingHistory = None, events: Callable[[Dict], None] = None,
+                 echo: bool = True, use_cache: bool = True):
+        """
+        Initialize the scheduler.
+
+        Args:
+            script_dir: Directory holding the module scripts (bash_checks/)
+            output_dir: Directory the modules write their results to
+            jobs: Maximum number of modules running at the same time
+            default_timeout: Seconds before any module is killed (default:
+                DEFAULT_TIMEOUT, and DEFAULT_TIMEOUTS for the modules listed there)
+            timeouts: Per-module timeout overrides
+            modules: Modules to run (default: all)
+            history: Recorded module durations
+            events: Called with each progress event (from worker threads)
+            echo: Print progress lines and module output to stdout
+            use_cache: Reuse the results of modules whose declared inputs
+                are unchanged (see scanner/modcache.py)
+        """
+        if script_dir is None:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            script_dir = os.path.join(project_root, "bash_checks")
+        self.script_dir = script_dir
+        self.output_dir = output_dir
+        self.jobs = max(1, jobs)
+        if default_timeout is None:
+            self.default_timeout = DEFAULT_TIMEOUT
+            self.timeouts = dict(DEFAULT_TIMEOUTS)
+        else:
+            # An explicit timeout applies to every module, permissions included
+            self.default_timeout = default_timeout
+            self.timeouts = {}
+        self.timeouts.update(timeouts or {})
+        self.modules = modules or [name for name, _label in MODULES]
+        self.history = history if history is not None else TimingHistory()
+        self.labels = dict(MODULES)
+        self.events = events
+        self.echo = echo
+        self.cache = ModuleCache() if use_cache and cache_enabled() else None
+        self._lock = threading.Lock()
+
+    def _say(self, message: str):
+        """Print a progress line."""
+        if not self.echo:
+            return
+        with self._lock:
+            print(message, flush=True)
+
+    def _emit(self, kind: str, **fields):
+        """Send a progress event to the events callback."""
+        if self.events is None:
+            return
+        event = {'event': kind, 'time': time.time()}
+        event.update(fields)
+        with self._lock:
+            self.events(event)
+
+    def order(self) -> List[str]:
+        """Return the modules to run, longest expected duration first."""
+        available = [name for name in self.modules
+                     if os.path.isfile(os.path.join(self.script_dir, f"{name}.sh"))]
+        return sorted(available, key=lambda name: -self.history.estimate(name))
+
+    def _terminate(self, process: subprocess.Popen):
+        """Kill a module and every process it started."""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                return
+            try:
+                process.wait(timeout=5)
+                return
+            except subprocess.TimeoutExpired:
+                continue
+
+    def _output_files(self, name: str) -> List[str]:
+        """Return the timing and results files of a module."""
+        return [os.path.join(self.output_dir, f"{name}{TIMING_SUFFIX}"),
+                os.path.join(self.output_dir, f"{name}.json")]
+
+    @staticmethod
+    def _identity(path: str) -> Optional[Tuple]:
+        """Return what tells a file apart from its replacement, or None if missing."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _record_timeout(self, run: ModuleRun, timeout: float,
+                        previous: Dict[str, Optional[Tuple]]):
+        """
+        Publish whatever the module wrote and flag it as incomplete.
+
+        The module's EXIT trap usually publishes its partial files when it
+        is terminated; otherwise they are published here. A file left from
+        the previous scan (same identity as before the run, the module was
+        killed before writing anything) is replaced, not appended to.
+
+        Args:
+            run: The timed out run
+            timeout: Seconds the module was allowed
+            previous: Identity of the output files before the run (_identity)
+        """
+        timing_file, results_file = self._output_files(run.name)
+        for path in (timing_file, results_file):
+            if os.path.exists(path + ".partial"):
+                os.replace(path + ".partial", path)
+            elif previous.get(path) is not None and self._identity(path) == previous[path]:
+                os.remove(path)
+        record = {
+            'check_name': f"Module Timeout: {run.name}",
+            'result': "WARN",
+            'status': "MEDIUM",
+            'details': f"{run.name}.sh did not finish within {timeout:g}s; results are incomplete",
+        }
+        with open(results_file, 'a+b') as f:
+            # The module may have been killed in the middle of a line
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            f.write(json.dumps(record, separators=(',', ':')).encode() + b"\n")
+
+    def run_module(self, name: str) -> ModuleRun:
+        """Run a single module, enforcing its timeout."""
+        run = ModuleRun(name)
+        timeout = self.timeouts.get(name, self.default_timeout)
+        script = os.path.join(self.script_dir, f"{name}.sh")
+
+        self._say(self.labels.get(name, f"Running {name} checks..."))
+        run.start = time.time()
+        self._emit('module_started', module=name, label=self.labels.get(name, ""),
+                   estimate=self.history.estimate(name), timeout=timeout)
+
+        # Inputs are fingerprinted before the run, so a change made while
+        # the module runs is picked up next time
+        fingerprint = self._cached_run(run)
+        if run.cached:
+            return run
+
+        previous = {path: self._identity(path) for path in self._output_files(name)}
+        process = subprocess.Popen(
+            ["bash", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            start_new_session=True
+        )
+        try:
+            run.output, _ = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            run.timed_out = True
+            self._terminate(process)
+            try:
+                run.output, _ = process.communicate(timeout=5)
+            except subprocess.TimeoutExpired:
+                # A detached grandchild still holds the pipe open
+                run.output = ""
+        run.end = time.time()
+        run.returncode = process.returncode
+
+        for line in run.output.splitlines():
+            if line.strip():
+                self._say(line)
+                self._emit('module_output', module=name, line=line)
+        if run.timed_out:
+            self._record_timeout(run, timeout, previous)
+            self._say(f"{name} checks timed out after {timeout:g}s")
+        elif run.returncode == 0 and fingerprint is not None:
+            results_file = os.path.join(self.output_dir, f"{name}.json")
+            if os.path.isfile(results_file):
+                self.cache.store(name, fingerprint, results_file)
+        timing = module_timings(os.path.join(self.output_dir, f"{name}{TIMING_SUFFIX}"), name)
+        if timing is not None:
+            run.cpu_ms = round(timing['cpu_ms'], 1)
+            run.processes = timing['processes']
+        self._emit('module_finished', module=name, duration=run.duration,
+                   returncode=run.returncode, timed_out=run.timed_out, cached=False,
+                   cpu_ms=run.cpu_ms, processes=run.processes)
+        return run
+
+    def _cached_run(self, run: ModuleRun) -> Optional[str]:
+        """
+        Publish the cached results of a module if its inputs are unchanged.
+
+        Sets run.cached when the cached results were used.
+
+        Returns:
+            Fingerprint of the module's inputs, or None if it is not cached
+        """
+        if self.cache is None:
+            return None
+        inputs = ModuleInputs(os.path.join(self.script_dir, f"{run.name}.sh"))
+        if not inputs.declared:
+            return None
+        fingerprint = inputs.fingerprint()
+        records = self.cache.lookup(run.name, fingerprint, inputs.ttl)
+        if records is None:
+            return fingerprint
+        try:
+            count = ModuleCache.restore(records, os.path.join(self.output_dir, f"{run.name}.json"))
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not reuse cached {run.name} results: {e}")
+            return fingerprint
+        # The module did not run this time, so it has no timings
+        try:
+            os.remove(os.path.join(self.output_dir, f"{run.name}{TIMING_SUFFIX}"))
+        except OSError:
+            pass
+        run.end = time.time()
+        run.returncode = 0
+        run.cached = True
+        self._say(f"{run.name} inputs unchanged; reused {count} cached results")
+        self._emit('module_finished', module=run.name, duration=run.duration,
+                   returncode=0, timed_out=False, cached=True)
+        return fingerprint
+
+    def run(self) -> List[ModuleRun]:
+        """
+        Run all modules.
+
+        Returns:
+            Module runs in start order
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        pending = self.order()
+        runs = []
+        scan_start = time.time()
+        self._emit('scan_started', modules=pending, jobs=self.jobs,
+                   estimates={name: self.history.estimate(name) for name in pending})
+        slots = threading.Semaphore(self.jobs)
+        threads = []
+
+        def worker(module_name: str):
+            start = time.time()
+            try:
+                run = self.run_module(module_name)
+            except Exception as e:
+                # Recorded as a failed run, so callers do not report success
+                run = self._failed_run(module_name, start, e)
+            finally:
+                slots.release()
+            with self._lock:
+                runs.append(run)
+
+        for name in pending:
+            slots.acquire()
+            thread = threading.Thread(target=worker, args=(name,), daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+        runs.sort(key=lambda r: r.start)
+        for run in runs:
+            if not run.timed_out and not run.cached and run.returncode == 0:
+                self.history.record(run.name, run.duration)
+        self.history.save()
+        self._write_schedule(runs)
+        self._emit('scan_finished', duration=time.time() - scan_start,
+                   timed_out=[run.name for run in runs if run.timed_out],
+                   failed=[run.name for run in runs if run.error])
+        return runs
+
+    def _failed_run(self, name: str, start: float, error: Exception) -> ModuleRun:
+        """Record a module that could not be run and report it as finished."""
+        run = ModuleRun(name)
+        run.start = start
+        run.end = time.time()
+        if isinstance(error, FileNotFoundError) and error.filename == "bash":
+            run.error = "bash command not found. Please ensure bash is installed."
+        else:
+            run.error = str(error) or type(error).__name__
+        self._say(f"{name} checks failed: {run.error}")
+        self._emit('module_finished', module=name, duration=run.duration,
+                   returncode=None, timed_out=False, cached=False, error=run.error)
+        return run
+
+    def _write_schedule(self, runs: List[ModuleRun]):
+        """Save per-module start/end times next to the results."""
+        schedule = {
+            'jobs': self.jobs,
+            'modules': [run.to_dict() for run in runs],
+        }
+        path = os.path.join(self.output_dir, "schedule.json")
+        try:
+            with open(path, 'w') as f:
+                json.dump(schedule, f, indent=2)
+        except OSError as e:
+            print(f"Warning: could not write {path}: {e}")
+
+
+def _parse_timeouts(values: List[str]) -> Dict[str, float]:
+    """Parse MODULE=SECONDS timeout overrides."""
+    timeouts = {}
+    for value in values:
+        name, sep, seconds = value.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected MODULE=SECONDS, got {value!r}")
+        timeouts[name] = float(seconds)
+    return timeouts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point used by run_all.sh."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS,
+                            help="Modules running at the same time (0 = all)")
+    arg_parser.add_argument('--timeout', type=float, default=None,
+                            help="Timeout in seconds for every module (default: "
+                                 f"{DEFAULT_TIMEOUT:g}, {DEFAULT_TIMEOUTS['permissions']:g} for permissions)")
+    arg_parser.add_argument('--module-timeout', action='append', default=[],
+                            metavar='MODULE=SECONDS', help="Per-module timeout override")
+    arg_parser.add_argument('--output-dir', default="/tmp/hardening-scan",
+                            help="Directory the modules write their results to")
+    arg_parser.add_argument('--events', metavar='FILE',
+                            help="Write progress events as JSON lines to FILE ('-' = stdout only)")
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help="Run every module, even if its inputs are unchanged")
+    arg_parser.add_argument('modules', nargs='*', help="Modules to run (default: all)")
+    args = arg_parser.parse_args(argv)
+
+    jobs = args.jobs if args.jobs > 0 else len(MODULES)
+    events_out = None
+    if args.events == '-':
+        events_out = sys.stdout
+    elif args.events:
+        events_out = open(args.events, 'w')
+
+    def write_event(event: Dict):
+        events_out.write(json.dumps(event, separators=(',', ':')) + "\n")
+        events_out.flush()
+
+    scheduler = ModuleScheduler(
+        output_dir=args.output_dir,
+        jobs=jobs,
+        default_timeout=args.timeout if args.timeout is not None else env_timeout(),
+        timeouts=_parse_timeouts(args.module_timeout),
+        modules=args.modules or None,
+        events=write_event if events_out is not None else None,
+        echo=args.events != '-',
+        use_cache=not args.no_cache
+    )
+    try:
+        runs = scheduler.run()
+    finally:
+        if events_out is not None and events_out is not sys.stdout:
+            events_out.close()
+    failed = any(run.error for run in runs)
+    if args.events == '-':
+        return 1 if failed else 0
+
+    print("")
+    print("Module timings:")
+    for run in runs:
+        status = "timed out" if run.timed_out else f"exit {run.returncode}"
+        if run.cached:
+            status = "cached"
+        if run.error:
+            status = f"failed: {run.error}"
+        usage = ""
+        if run.cpu_ms is not None:
+            usage = f"  cpu {run.cpu_ms / 1000:6.2f}s  {run.processes:>5} processes"
+        print(f"  {run.name:<12} {datetime.fromtimestamp(run.start):%H:%M:%S} -> "
+              f"{datetime.fromtimestamp(run.end):%H:%M:%S}  {run.duration:7.2f}s{usage}  {status}")
+    # Timed-out modules are reported in their results, not as a failed scan
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Native sshd_config parser for ssh.sh.
+
+ssh.sh reads the effective SSH server configuration from ``sshd -T``. When
+sshd is not installed, ``sshd -T`` fails (it needs to read the host keys),
+or the scan runs against an offline root, this parser provides the same
+``keyword value`` snapshot. It follows ``Include`` directives, applies
+sshd's first-value-wins rule and fills in the compiled-in defaults.
+
+It also reports ``Match`` blocks, which ``sshd -T`` hides: a block that
+re-enables password or root logins for some users is easy to miss.
+"""
+
+import argparse
+import glob
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from .emit import Record, write_records
+
+
+DEFAULT_CONFIG = "/etc/ssh/sshd_config"
+
+# Nesting limit for Include, as in sshd
+MAX_INCLUDE_DEPTH = 16
+
+# OpenSSH defaults for the settings the SSH checks read
+DEFAULTS = {
+    'permitrootlogin': 'prohibit-password',
+    'passwordauthentication': 'yes',
+    'pubkeyauthentication': 'yes',
+    'x11forwarding': 'no',
+    'maxauthtries': '6',
+    'permitemptypasswords': 'no',
+    # Only protocol 2 exists since OpenSSH 7.4; sshd -T no longer prints it
+    'protocol': '2',
+}
+
+# Keywords that may be given several times, every value applies
+MULTI_VALUE = {
+    'acceptenv', 'allowgroups', 'allowusers', 'denygroups', 'denyusers',
+    'hostcertificate', 'hostkey', 'listenaddress', 'port', 'setenv', 'subsystem',
+}
+
+# Choice values are case-insensitive; sshd -T prints them in lower case
+CHOICES = {
+    'yes', 'no', 'prohibit-password', 'without-password', 'forced-commands-only',
+    'all', 'any', 'local', 'remote', 'none', 'sandbox', 'delayed',
+}
+
+# Match block settings that weaken what the global checks verified
+RISKY_OVERRIDES = {
+    'permitrootlogin': {'yes'},
+    'passwordauthentication': {'yes'},
+    'permitemptypasswords': {'yes'},
+    'pubkeyauthentication': {'no'},
+    'x11forwarding': {'yes'},
+}
+
+
+class MatchBlock:
+    """Settings that apply only to connections matching some criteria."""
+
+    def __init__(self, criteria: str, path: str, line: int):
+        self.criteria = criteria
+        self.path = path
+        self.line = line
+        self.options = {}
+
+
+class SshdConfig:
+    """Parsed sshd configuration."""
+
+    def __init__(self):
+        self.options = {}
+        self.match_blocks = []
+        self.files = []
+        # Directories searched by Include patterns (a new file there is read)
+        self.include_dirs = []
+        self.errors = []
+
+    def effective(self) -> Dict[str, List[str]]:
+        """Return the global configuration with the defaults filled in."""
+        options = {key: [value] for key, value in DEFAULTS.items()}
+        options.update(self.options)
+        return options
+
+
+def _split(line: str) -> Tuple[str, List[str]]:
+    """Split a configuration line into keyword and arguments."""
+    line = line.strip()
+    keyword, _sep, rest = line.partition(' ')
+    if '=' in keyword:
+        keyword, _sep, first = keyword.partition('=')
+        rest = f"{first} {rest}"
+    elif '\t' in keyword:
+        keyword, _sep, first = keyword.partition('\t')
+        rest = f"{first} {rest}"
+    rest = rest.strip()
+    if rest.startswith('='):
+        rest = rest[1:].strip()
+
+    args = []
+    while rest:
+        if rest.startswith('"'):
+            end = rest.find('"', 1)
+            if end == -1:
+                end = len(rest)
+            args.append(rest[1:end])
+            rest = rest[end + 1:].strip()
+        else:
+            word, _sep, rest = rest.partition(' ')
+            args.append(word)
+            rest = rest.strip()
+    return keyword.lower(), args
+
+
+def _normalize(value: str) -> str:
+    return value.lower() if value.lower() in CHOICES else value
+
+
+class SshdConfigParser:
+    """Reads sshd_config and its includes, optionally below an offline root."""
+
+    def __init__(self, root: str = ''):
+        """
+        Initialize the parser.
+
+        Args:
+            root: Offline root the configuration lives under ('' = live host)
+        """
+        self.root = root.rstrip('/')
+
+    def _host_path(self, path: str) -> str:
+        """Map a path from the configuration onto the scanned root."""
+        if not os.path.isabs(path):
+            path = os.path.join("/etc/ssh", path)
+        return self.root + path
+
+    def parse(self, path: str = DEFAULT_CONFIG) -> SshdConfig:
+        """
+        Parse sshd_config.
+
+        Args:
+            path: Configuration file, as seen from the scanned host
+
+        Returns:
+            SshdConfig with the global options and the Match blocks
+        """
+        config = SshdConfig()
+        self._parse_file(self._host_path(path), config, None, 0)
+        return config
+
+    def _parse_file(self, path: str, config: SshdConfig, block: Optional[MatchBlock],
+                    depth: int):
+        """
+        Read one file into config.
+
+        An included file starts in the Match block of its Include line, and
+        a Match block it opens ends with the file, as in sshd.
+        """
+        if depth > MAX_INCLUDE_DEPTH:
+            config.errors.append(f"Include nested too deeply at {path}")
+            return
+        try:
+            with open(path, 'r', errors='replace') as f:
+                lines = f.readlines()
+        except OSError as e:
+            config.errors.append(f"Cannot read {path}: {e.strerror}")
+            return
+        config.files.append(path)
+
+        for number, line in enumerate(lines, 1):
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            keyword, args = _split(stripped)
+            if not args:
+                continue
+
+            if keyword == 'include':
+                for pattern in args:
+                    directory = os.path.dirname(self._host_path(pattern))
+                    if directory not in config.include_dirs:
+                        config.include_dirs.append(directory)
+                    matches = sorted(glob.glob(self._host_path(pattern)))
+                    for included in matches:
+                        self._parse_file(included, config, block, depth + 1)
+                continue
+
+            if keyword == 'match':
+                criteria = ' '.join(args)
+                if criteria.lower() == 'all':
+                    block = None
+                else:
+                    block = MatchBlock(criteria, path[len(self.root):], number)
+                    config.match_blocks.append(block)
+                continue
+
+            options = block.options if block is not None else config.options
+            value = _normalize(' '.join(args))
+            if keyword in MULTI_VALUE:
+                options.setdefault(keyword, []).append(value)
+            elif keyword not in options:
+                options[keyword] = [value]
+
+
+def match_records(config: SshdConfig) -> List[Record]:
+    """
+    Report every Match block.
+
+    Blocks that weaken a setting checked by ssh.sh are reported as warnings.
+
+    Returns:
+        (section, check_name, result, status, details) records
+    """
+    records = []
+    for block in config.match_blocks:
+        overrides = ', '.join(f"{key} {' '.join(values)}" for key, values in block.options.items())
+        location = f"{block.path}:{block.line}"
+        risky = [key for key, values in block.options.items()
+                 if key in RISKY_OVERRIDES and values[0] in RISKY_OVERRIDES[key]]
+        check_name = f"SSH Match Block: {block.criteria}"
+        if risky:
+            records.append(('match', check_name, "WARN", "MEDIUM",
+                            f"{location} weakens {', '.join(risky)} ({overrides})"))
+        else:
+            records.append(('match', check_name, "INFO", "LOW",
+                            f"{location} overrides: {overrides or 'nothing'}"))
+    return records
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point used by ssh.sh."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--root', default='', help="Offline root to read the configuration from")
+    arg_parser.add_argument('--config', default=DEFAULT_CONFIG, help="sshd_config path on the host")
+    arg_parser.add_argument('--matches', action='store_true',
+                            help="Print records for the Match blocks instead of the snapshot")
+    arg_parser.add_argument('--files', action='store_true',
+                            help="Print the files and Include directories read instead of "
+                                 "the snapshot (inputs of the ssh.sh result cache)")
+    args = arg_parser.parse_args(argv)
+
+    config = SshdConfigParser(args.root).parse(args.config)
+    for error in config.errors:
+        print(error, file=sys.stderr)
+
+    if args.matches:
+        write_records(match_records(config))
+        return 0
+
+    if args.files:
+        for path in config.files + config.include_dirs:
+            print(path)
+        return 0
+
+    # Same format as sshd -T: one "keyword value" line per value
+    for key, values in sorted(config.effective().items()):
+        for value in values:
+            print(f"{key} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
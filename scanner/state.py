@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Scan state directory shared by the caches and checkpoints.
+
+Module results, compiled rules, the auth log checkpoints, the package
+inventory, the module timings and the scan history are kept here between
+scans. Later scans trust what they read back, so the directory and
+every file in it must be owned by the scanning user and writable by nobody
+else; files that are not are ignored.
+"""
+
+import errno
+import os
+import stat
+import sys
+
+
+# State of root scans; other users keep theirs in their cache directory
+DEFAULT_STATE_DIR = "/var/lib/host-hardening-checker"
+
+
+def state_dir() -> str:
+    """
+    Return the directory for scan state kept between runs.
+
+    Caches in this directory are trusted by later scans, so it must not be
+    writable by other users: root scans use /var/lib/host-hardening-checker,
+    other users $XDG_CACHE_HOME/host-hardening-checker. HARDENING_STATE_DIR
+    overrides both.
+    """
+    path = os.environ.get('HARDENING_STATE_DIR')
+    if path:
+        return path
+    if os.geteuid() == 0:
+        return DEFAULT_STATE_DIR
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), ".cache")
+    return os.path.join(cache, "host-hardening-checker")
+
+
+def is_private(st: os.stat_result) -> bool:
+    """Return True if a file is owned by this user and not writable by group or others."""
+    return st.st_uid == os.geteuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def private_dir(path: str) -> bool:
+    """
+    Create a state directory (mode 0700) and check that nobody else controls it.
+
+    Returns:
+        True if the directory exists, is not a symlink, is owned by this
+        user and is writable by nobody else; False (with a warning) otherwise
+    """
+    try:
+        # makedirs() applies the mode to the leaf only; the state directory
+        # above a cache subdirectory must not be left world-readable either
+        parent = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(parent):
+            os.makedirs(parent, mode=0o700, exist_ok=True)
+            os.chmod(parent, 0o700)
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        st = os.lstat(path)
+    except OSError as e:
+        print(f"Warning: cannot use state directory {path}: {e}", file=sys.stderr)
+        return False
+    if not stat.S_ISDIR(st.st_mode) or not is_private(st):
+        print(f"Warning: ignoring state directory {path}: it must be a directory owned by "
+              f"UID {os.geteuid()} and writable only by it", file=sys.stderr)
+        return False
+    return True
+
+
+def open_private(path: str, mode: str = 'r'):
+    """
+    Open a state file for reading, refusing anything another user could have written.
+
+    The file and its directory must be owned by this user and not writable
+    by group or others; symlinks are not followed.
+
+    Raises:
+        OSError: (PermissionError) if the file is not trusted, or it cannot be opened
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if not is_private(os.lstat(directory)):
+        raise PermissionError(errno.EPERM, "state directory is writable by other users", directory)
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+    try:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode) or not is_private(st):
+            raise PermissionError(errno.EPERM, "state file is not owned by this user "
+                                  "or writable by others", path)
+        return os.fdopen(fd, mode)
+    except BaseException:
+        os.close(fd)
+        raise
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Batched sysctl checks for kernel.sh and network.sh.
+
+kernel.sh forked ``sysctl`` and ``awk`` once per parameter. This engine reads
+every requested key straight from /proc/sys in one batch and evaluates it
+against a declarative table of expected values and severities, producing the
+same check names and details as the original shell checks.
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, Iterable, List, Optional
+
+from .emit import Record, write_records
+
+
+DEFAULT_PROC_SYS = "/proc/sys"
+
+
+class Param:
+    """
+    A parameter that must have an expected value.
+
+    The default details mirror kernel.sh (``<key> is set to <value>``);
+    ``pass_details`` and ``fail_details`` override them (``{value}`` and
+    ``{expected}`` are substituted).
+    """
+
+    def __init__(self, key: str, expected: str, check_name: str, severity: str = "MEDIUM",
+                 pass_details: str = None, fail_details: str = None, fail_result: str = "FAIL",
+                 section: str = "params"):
+        self.key = key
+        self.expected = expected
+        self.check_name = check_name
+        self.severity = severity
+        self.pass_details = pass_details or "{key} is set to {expected}"
+        self.fail_details = fail_details or "{key} is set to {value} (should be {expected})"
+        self.fail_result = fail_result
+        self.section = section
+
+    def keys(self) -> List[str]:
+        return [self.key]
+
+    def evaluate(self, values: Dict[str, Optional[str]]) -> List[Record]:
+        value = values.get(self.key) or ""
+        fields = {'key': self.key, 'value': value, 'expected': self.expected}
+        if value == self.expected:
+            return [(self.section, self.check_name, "PASS", "LOW", self.pass_details.format(**fields))]
+        return [(self.section, self.check_name, self.fail_result, self.severity,
+                 self.fail_details.format(**fields))]
+
+
+class Levels:
+    """A parameter mapped value by value to (result, status, details)."""
+
+    def __init__(self, key: str, check_name: str, outcomes: Dict[str, tuple],
+                 default: tuple, if_present: bool = False, section: str = "params"):
+        self.key = key
+        self.check_name = check_name
+        self.outcomes = outcomes
+        self.default = default
+        self.if_present = if_present
+        self.section = section
+
+    def keys(self) -> List[str]:
+        return [self.key]
+
+    def evaluate(self, values: Dict[str, Optional[str]]) -> List[Record]:
+        value = values.get(self.key)
+        if value is None and self.if_present:
+            return []
+        value = value or ""
+        result, status, details = self.outcomes.get(value, self.default)
+        return [(self.section, self.check_name, result, status, details.format(value=value))]
+
+
+class Switch:
+    """
+    Evaluate nested checks unless a guard parameter has a given value.
+
+    Used for the IPv6 checks, which only apply when IPv6 is enabled.
+    """
+
+    def __init__(self, key: str, value: str, record: tuple, otherwise: List,
+                 section: str = "params"):
+        self.key = key
+        self.value = value
+        self.record = record
+        self.otherwise = otherwise
+        self.section = section
+
+    def keys(self) -> List[str]:
+        keys = [self.key]
+        for check in self.otherwise:
+            keys.extend(check.keys())
+        return keys
+
+    def evaluate(self, values: Dict[str, Optional[str]]) -> List[Record]:
+        value = values.get(self.key)
+        if value is None:
+            return []
+        if value == self.value:
+            return [(self.section,) + self.record]
+        records = []
+        for check in self.otherwise:
+            records.extend(check.evaluate(values))
+        return records
+
+
+KERNEL_CHECKS = [
+    # Network security parameters
+    Param("net.ipv4.ip_forward", "0", "IP Forwarding", "MEDIUM"),
+    Param("net.ipv4.conf.all.send_redirects", "0", "Send Redirects", "MEDIUM"),
+    Param("net.ipv4.conf.default.send_redirects", "0", "Default Send Redirects", "MEDIUM"),
+    Param("net.ipv4.conf.all.accept_redirects", "0", "Accept Redirects", "MEDIUM"),
+    Param("net.ipv4.conf.default.accept_redirects", "0", "Default Accept Redirects", "MEDIUM"),
+    Param("net.ipv4.conf.all.accept_source_route", "0", "Accept Source Route", "MEDIUM"),
+    Param("net.ipv4.conf.default.accept_source_route", "0", "Default Accept Source Route", "MEDIUM"),
+    Param("net.ipv4.icmp_echo_ignore_broadcasts", "1", "Ignore ICMP Broadcasts", "LOW"),
+    Param("net.ipv4.icmp_ignore_bogus_error_responses", "1", "Ignore Bogus ICMP Errors", "LOW"),
+    Param("net.ipv4.tcp_syncookies", "1", "TCP SYN Cookies", "MEDIUM"),
+    Param("net.ipv4.conf.all.log_martians", "1", "Log Martian Packets", "LOW"),
+    Param("net.ipv4.conf.default.log_martians", "1", "Default Log Martian Packets", "LOW"),
+
+    # IPv6 security (if IPv6 is enabled)
+    Switch("net.ipv6.conf.all.disable_ipv6", "1",
+           ("IPv6 Disabled", "INFO", "LOW", "IPv6 is disabled"), [
+               Param("net.ipv6.conf.all.accept_redirects", "0", "IPv6 Accept Redirects", "MEDIUM"),
+               Param("net.ipv6.conf.default.accept_redirects", "0",
+                     "IPv6 Default Accept Redirects", "MEDIUM"),
+               Param("net.ipv6.conf.all.accept_source_route", "0",
+                     "IPv6 Accept Source Route", "MEDIUM"),
+           ]),
+
+    # Kernel security parameters
+    Param("kernel.dmesg_restrict", "1", "Dmesg Restrict", "MEDIUM"),
+    Param("kernel.kptr_restrict", "2", "Kptr Restrict", "MEDIUM"),
+    Param("kernel.yama.ptrace_scope", "1", "Ptrace Scope", "MEDIUM"),
+
+    Levels("kernel.randomize_va_space", "ASLR (Address Space Layout Randomization)", {
+        "2": ("PASS", "LOW", "ASLR is fully enabled (2)"),
+        "1": ("WARN", "MEDIUM", "ASLR is partially enabled (1)"),
+    }, default=("FAIL", "HIGH", "ASLR is disabled (0)"), if_present=True),
+
+    # Core dumps
+    Param("fs.suid_dumpable", "0", "SUID Core Dumps", "MEDIUM",
+          pass_details="SUID core dumps are disabled",
+          fail_details="SUID core dumps are enabled ({value})",
+          fail_result="WARN", section="core_dumps"),
+]
+
+NETWORK_CHECKS = [
+    Param("net.ipv4.ip_forward", "0", "IP Forwarding", "MEDIUM",
+          pass_details="IP forwarding is disabled",
+          fail_details="IP forwarding is enabled"),
+    Param("net.ipv4.conf.all.accept_redirects", "0", "ICMP Redirects", "MEDIUM",
+          pass_details="ICMP redirects are disabled",
+          fail_details="ICMP redirects are enabled"),
+    Param("net.ipv4.conf.all.accept_source_route", "0", "Source Routing", "MEDIUM",
+          pass_details="Source routing is disabled",
+          fail_details="Source routing is enabled"),
+    Param("net.ipv4.tcp_syncookies", "1", "SYN Cookies", "MEDIUM",
+          pass_details="SYN cookies are enabled",
+          fail_details="SYN cookies are disabled"),
+]
+
+CHECK_TABLES = {
+    'kernel': KERNEL_CHECKS,
+    'network': NETWORK_CHECKS,
+}
+
+
+def read_params(keys: Iterable[str], proc_sys: str = DEFAULT_PROC_SYS) -> Dict[str, Optional[str]]:
+    """
+    Read sysctl parameters directly from /proc/sys.
+
+    Like ``sysctl <key> | awk '{print $3}'`` only the first word of the value
+    is kept.
+
+    Args:
+        keys: Dotted parameter names (``net.ipv4.ip_forward``)
+        proc_sys: Root of the sysctl tree
+
+    Returns:
+        Mapping of key to value; None if the parameter does not exist and
+        an empty string if it cannot be read
+    """
+    values = {}
+    for key in keys:
+        if key in values:
+            continue
+        path = os.path.join(proc_sys, *key.split('.'))
+        try:
+            with open(path, 'r') as f:
+                words = f.read().split()
+        except FileNotFoundError:
+            values[key] = None
+            continue
+        except OSError:
+            values[key] = ""
+            continue
+        values[key] = words[0] if words else ""
+    return values
+
+
+def evaluate(checks: List, proc_sys: str = DEFAULT_PROC_SYS) -> List[Record]:
+    """
+    Evaluate a check table against the running (or a fixture) kernel.
+
+    Args:
+        checks: Check table such as KERNEL_CHECKS
+        proc_sys: Root of the sysctl tree
+
+    Returns:
+        (section, check_name, result, status, details) records
+    """
+    keys = []
+    for check in checks:
+        keys.extend(check.keys())
+    values = read_params(keys, proc_sys)
+
+    records = []
+    for check in checks:
+        records.extend(check.evaluate(values))
+    return records
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point used by kernel.sh and network.sh."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('module', choices=sorted(CHECK_TABLES),
+                            help="Check table to evaluate")
+    arg_parser.add_argument('--proc-sys',
+                            default=os.environ.get('HARDENING_PROC_SYS', DEFAULT_PROC_SYS),
+                            help="Root of the sysctl tree (default: /proc/sys)")
+    args = arg_parser.parse_args(argv)
+
+    write_records(evaluate(CHECK_TABLES[args.module], args.proc_sys))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Per-check timings recorded by the check modules.
+
+common.sh appends a timing record to ``<module>.timing.json`` next to the
+results: one when the module starts, one after every add_result and one on
+exit. Each record holds counters, not durations:
+
+- ``t``: wall clock in microseconds ($EPOCHREALTIME);
+- ``cpu``: clock ticks used by the module shell and the children it has
+  reaped (/proc/<pid>/stat utime + stime + cutime + cstime);
+- ``procs``: the last PID handed out system-wide (/proc/loadavg), which
+  advances with every process (or thread) created.
+
+A check is charged with what happened since the record before it, so the
+work done for a check is measured between the previous result and its own.
+Process counts are system-wide: exact when modules run one at a time
+(HARDENING_JOBS=1), an upper bound when they overlap. CPU used inside a
+pipeline subshell is charged to the first check the module shell reports
+after the pipeline.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+
+TIMING_SUFFIX = ".timing.json"
+
+# Rows shown in "slowest checks" tables
+DEFAULT_LIMIT = 20
+
+
+def _clock_ticks() -> int:
+    try:
+        return os.sysconf('SC_CLK_TCK')
+    except (AttributeError, ValueError, OSError):
+        return 100
+
+
+def _pid_max() -> int:
+    try:
+        with open('/proc/sys/kernel/pid_max', 'r') as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return 32768
+
+
+def _processes(before: int, after: int, pid_max: int) -> int:
+    """Processes created between two last-PID readings (PIDs wrap at pid_max)."""
+    if after >= before:
+        return after - before
+    return after + pid_max - before
+
+
+def _read_records(path: str) -> List[Dict]:
+    records = []
+    with open(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and 't' in record:
+                records.append(record)
+    records.sort(key=lambda r: r['t'])
+    return records
+
+
+def module_timings(path: str, module: str = None) -> Optional[Dict]:
+    """
+    Read the timing file of one module.
+
+    Args:
+        path: <module>.timing.json
+        module: Module name (default: from the file name)
+
+    Returns:
+        Dict with module, wall_ms, cpu_ms, processes and checks (one dict
+        per check: module, check_name, wall_ms, cpu_ms, processes), or None
+        if the file cannot be read
+    """
+    if module is None:
+        module = os.path.basename(path)[:-len(TIMING_SUFFIX)]
+    try:
+        records = _read_records(path)
+    except OSError:
+        return None
+    if not records:
+        return None
+
+    ms_per_tick = 1000.0 / _clock_ticks()
+    pid_max = _pid_max()
+    checks = []
+    previous = records[0]
+    for record in records[1:]:
+        if 'check_name' in record:
+            checks.append({
+                'module': module,
+                'check_name': record['check_name'],
+                'wall_ms': max(0.0, (record['t'] - previous['t']) / 1000.0),
+                'cpu_ms': max(0.0, (record['cpu'] - previous['cpu']) * ms_per_tick),
+                'processes': _processes(previous['procs'], record['procs'], pid_max),
+            })
+        previous = record
+
+    first, last = records[0], records[-1]
+    return {
+        'module': module,
+        'wall_ms': (last['t'] - first['t']) / 1000.0,
+        'cpu_ms': max(0.0, (last['cpu'] - first['cpu']) * ms_per_tick),
+        'processes': _processes(first['procs'], last['procs'], pid_max),
+        'complete': last.get('event') == 'end',
+        'checks': checks,
+    }
+
+
+def load_timings(scan_dir: str = "/tmp/hardening-scan") -> List[Dict]:
+    """Return the timings of every module in a scan directory, by module name."""
+    timings = []
+    try:
+        names = sorted(os.listdir(scan_dir))
+    except OSError:
+        return timings
+    for name in names:
+        if name.endswith(TIMING_SUFFIX):
+            timing = module_timings(os.path.join(scan_dir, name))
+            if timing is not None:
+                timings.append(timing)
+    return timings
+
+
+def slowest_checks(scan_dir: str = "/tmp/hardening-scan", limit: int = DEFAULT_LIMIT) -> List[Dict]:
+    """Return the checks that took longest (wall time), slowest first."""
+    checks = [check for timing in load_timings(scan_dir) for check in timing['checks']]
+    checks.sort(key=lambda c: c['wall_ms'], reverse=True)
+    return checks[:limit]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: print module totals and the slowest checks."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--scan-dir', default="/tmp/hardening-scan")
+    arg_parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT)
+    args = arg_parser.parse_args(argv)
+
+    timings = load_timings(args.scan_dir)
+    if not timings:
+        print("No timings found")
+        return 1
+    print("Modules:")
+    for timing in sorted(timings, key=lambda t: -t['wall_ms']):
+        print(f"  {timing['module']:<12} wall {timing['wall_ms']:9.1f} ms  cpu {timing['cpu_ms']:9.1f} ms  "
+              f"processes {timing['processes']:>6}")
+    print("Slowest checks:")
+    for check in slowest_checks(args.scan_dir, args.limit):
+        print(f"  {check['wall_ms']:9.1f} ms  cpu {check['cpu_ms']:8.1f} ms  "
+              f"processes {check['processes']:>5}  {check['module']}: {check['check_name']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
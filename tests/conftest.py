@@ -0,0 +1,12 @@
+"""Shared fixtures for the scanner tests."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    """Keep caches and checkpoints out of the user's state directory."""
+    path = tmp_path / "state"
+    monkeypatch.setenv('HARDENING_STATE_DIR', str(path))
+    monkeypatch.delenv('HARDENING_RULES', raising=False)
+    return path
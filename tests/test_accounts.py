@@ -0,0 +1,114 @@
+"""Tests for the single-pass account model."""
+
+import os
+
+import pytest
+
+from scanner.accounts import AccountLoader, home_records, user_records
+
+
+@pytest.fixture
+def root(tmp_path):
+    etc = tmp_path / "etc"
+    (etc / "sudoers.d").mkdir(parents=True)
+    (etc / "passwd").write_text(
+        "root:x:0:0:root:/root:/bin/bash\n"
+        "daemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin\n"
+        "games:x:5:60:games:/usr/games:/bin/sh\n"
+        "toor:x:0:0::/root:/bin/bash\n"
+        "alice:x:1000:1000:Alice:/home/alice:/bin/bash\n"
+        "bob:$6$hash:1001:1001:Bob:/home/bob:/bin/bash\n"
+        "+@netgroup::::::\n"
+    )
+    (etc / "group").write_text(
+        "root:x:0:\n"
+        "sudo:x:27:alice,bob\n"
+        "wheel:x:10:\n"
+        "alice:x:1000:\n"
+    )
+    (etc / "shadow").write_text(
+        "root:!:19000:0:99999:7:::\n"
+        "alice:$6$x:19000:0:90:7:::\n"
+        "bob:$6$y:19000:0::7:::\n"
+    )
+    (etc / "sudoers").write_text(
+        "Defaults env_reset\n"
+        "User_Alias ADMINS = carol\n"
+        "root ALL=(ALL:ALL) ALL\n"
+        "%sudo ALL=(ALL:ALL) ALL\n"
+        "#1002 ALL=(ALL) NOPASSWD: ALL\n"
+        "@includedir /etc/sudoers.d\n"
+    )
+    (etc / "sudoers.d" / "deploy").write_text(
+        "deploy, \\\n"
+        "  ci ALL=(root) NOPASSWD: /usr/bin/systemctl\n"
+    )
+    # Skipped by sudo: the name contains a dot
+    (etc / "sudoers.d" / "backup.dpkg-old").write_text("mallory ALL=(ALL) ALL\n")
+    home = tmp_path / "home"
+    (home / "alice").mkdir(parents=True)
+    (home / "bob").mkdir()
+    os.chmod(home / "alice", 0o750)
+    os.chmod(home / "bob", 0o755)
+    return str(tmp_path)
+
+
+def by_name(records):
+    return {record[1]: record for record in records}
+
+
+def test_offline_root_reads_files(root):
+    db = AccountLoader(root).load()
+
+    assert [u.name for u in db.users] == ["root", "daemon", "games", "toor", "alice", "bob"]
+    assert db.shadow_readable and db.sudoers_readable
+    assert db.groups_of("alice") == ["alice", "sudo"]
+    assert db.by_name["alice"].max_days() == 90
+    assert db.by_name["bob"].max_days() == -1
+    assert db.by_name["daemon"].max_days() is None
+
+
+def test_sudoers_includedir(root):
+    db = AccountLoader(root, source='files').load()
+
+    assert [(rule.principals, rule.path) for rule in db.sudo_rules] == [
+        (["root"], "/etc/sudoers"),
+        (["%sudo"], "/etc/sudoers"),
+        (["#1002"], "/etc/sudoers"),
+        (["deploy", "ci"], "/etc/sudoers.d/deploy"),
+    ]
+
+
+def test_user_records(root):
+    records = by_name(user_records(AccountLoader(root).load()))
+
+    assert records["UID 0 Users"][2:] == ("FAIL", "HIGH", "Users with UID 0 found: toor")
+    assert records["Empty Password Accounts"][2] == "PASS"
+    assert records["User Password Storage"][4] == "User bob may have password in /etc/passwd"
+    assert "Password Expiration: alice" not in records
+    assert records["Password Expiration: bob"][4] == (
+        "User bob has no password expiration: maximum password age is not set (-1)")
+    assert records["System Accounts with Shells"][4] == (
+        "System accounts with shells: root games toor")
+    assert records["Sudo Users"][4] == "Users with sudo access: alice,bob"
+    assert records["Sudoers Grants"][4] == (
+        "Users and groups granted rules in sudoers: %sudo #1002 deploy ci")
+    assert "Admin Group: wheel" not in records
+
+
+def test_unreadable_shadow_skips_expiry(root):
+    os.remove(os.path.join(root, "etc", "shadow"))
+    db = AccountLoader(root).load()
+
+    assert not db.shadow_readable
+    assert db.errors
+    assert not [r for r in user_records(db) if r[0] == 'password_expiry']
+
+
+def test_home_records(root):
+    records = by_name(home_records(AccountLoader(root).load(), root))
+
+    assert records["Home Directory: /home/alice"][2] == "PASS"
+    assert records["Home Directory: /home/bob"][2:] == (
+        "WARN", "MEDIUM", "Home directory permissions: 755 (should be 700 or 750)")
+    assert len(records) == 2
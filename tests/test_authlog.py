@@ -0,0 +1,130 @@
+"""Tests for the incremental auth log analyzer."""
+
+import gzip
+import os
+import time
+
+import pytest
+
+from scanner.authlog import AuthLogAnalyzer
+
+LOG = "/var/log/auth.log"
+
+
+def failures(count, ip="10.0.0.9", user="root", age=3600):
+    stamp = time.strftime("%b %d %H:%M:%S", time.localtime(time.time() - age))
+    line = f"{stamp} host sshd[1]: Failed password for {user} from {ip} port 22 ssh2\n"
+    return line * count
+
+
+def append(path, text):
+    with open(path, 'a') as f:
+        f.write(text)
+
+
+def scan(root, **kwargs):
+    analyzer = AuthLogAnalyzer(logs=[LOG], root=root, **kwargs)
+    analyzer.update()
+    analyzer.save()
+    return analyzer
+
+
+def total(analyzer):
+    return sum(analyzer.counts.window_totals(analyzer.counts.ip, 0).values())
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / "var" / "log").mkdir(parents=True)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def log(root):
+    return root + LOG
+
+
+def test_checkpoint_reads_only_appended_lines(root, log):
+    append(log, failures(3))
+    first = scan(root)
+    assert total(first) == 3
+
+    appended = failures(2, ip="10.0.0.10")
+    append(log, appended)
+    second = scan(root)
+
+    assert second.bytes_read == len(appended)
+    assert total(second) == 5
+    assert scan(root).bytes_read == 0
+
+
+def test_partial_line_is_left_for_the_next_run(root, log):
+    line = failures(1)
+    append(log, line[:30])
+    assert total(scan(root)) == 0
+
+    append(log, line[30:])
+    assert total(scan(root)) == 1
+
+
+def test_rotation_finishes_the_old_file(root, log):
+    append(log, failures(3))
+    scan(root)
+    # Written after the last run, then rotated away
+    append(log, failures(1))
+    os.rename(log, log + ".1")
+    append(log, failures(2))
+
+    analyzer = scan(root)
+
+    assert total(analyzer) == 6
+    assert total(scan(root)) == 6
+
+
+def test_first_run_reads_recent_rotated_logs(root, log):
+    with gzip.open(log + ".2.gz", 'wt') as f:
+        f.write(failures(4))
+    append(log + ".1", failures(2))
+    append(log, failures(1))
+    old = time.time() - 30 * 86400
+    os.utime(log + ".1", (old, old))
+
+    analyzer = scan(root)
+
+    assert total(analyzer) == 5
+    assert total(scan(root)) == 5
+
+
+def test_checkpoints_of_different_roots_do_not_mix(tmp_path):
+    roots = []
+    for name, count in (("a", 3), ("b", 7)):
+        root = tmp_path / name
+        (root / "var" / "log").mkdir(parents=True)
+        append(str(root) + LOG, failures(count))
+        roots.append(str(root))
+
+    assert total(scan(roots[0])) == 3
+    assert total(scan(roots[1])) == 7
+    again = scan(roots[0])
+    assert again.bytes_read == 0
+    assert total(again) == 3
+
+
+def test_records(root, log):
+    append(log, failures(12, ip="10.0.0.9", user="root"))
+    append(log, failures(3, ip="10.0.0.10", user="admin"))
+    append(log, failures(5, age=3 * 86400))
+
+    records = scan(root).records(window_hours=24, threshold=10)
+
+    assert [record[1] for record in records] == [
+        "Recent Login Failures", "Login Failures from: 10.0.0.9", "Login Failures for: root"]
+    assert records[0][4].startswith("15 failed login attempts in the last 24h")
+    assert records[1][4].endswith("users tried: root")
+
+
+def test_no_checkpoint(root, log):
+    append(log, failures(2))
+    scan(root, state_file='')
+
+    assert total(scan(root, state_file='')) == 2
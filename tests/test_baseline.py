@@ -0,0 +1,92 @@
+"""Tests for the baseline delta."""
+
+from scanner.baseline import diff_results, load_baseline, make_baseline, save_baseline
+
+
+def result(name, outcome, details="", severity="MEDIUM"):
+    return {'check_name': name, 'result': outcome, 'severity': severity,
+            'remediation': "", 'details': details}
+
+
+BASELINE_RESULTS = [
+    result("ASLR", "PASS"),
+    result("SSH PermitRootLogin", "FAIL", "Root login is permitted: yes", "HIGH"),
+    result("Dmesg Restrict", "WARN", "kernel.dmesg_restrict is set to 0"),
+    result("SUID Files", "INFO", "Found 12 SUID files"),
+    result("Firewalld", "FAIL"),
+]
+
+
+def changes(delta):
+    return {(r['check_name'], r['change'], r['previous']) for r in delta}
+
+
+def test_unchanged_scan_has_no_changes():
+    baseline = make_baseline(BASELINE_RESULTS, host="h")
+
+    assert diff_results(baseline, BASELINE_RESULTS) == []
+
+
+def test_new_resolved_and_changed():
+    baseline = make_baseline(BASELINE_RESULTS, host="h")
+    current = [
+        result("ASLR", "FAIL"),
+        result("SSH PermitRootLogin", "PASS"),
+        result("Dmesg Restrict", "WARN", "kernel.dmesg_restrict is set to 0", "HIGH"),
+        result("SUID Files", "PASS", "Found 12 SUID files"),
+        result("Kptr Restrict", "WARN"),
+        result("Kernel Version", "INFO"),
+    ]
+
+    delta = diff_results(baseline, current)
+
+    assert changes(delta) == {
+        ("ASLR", 'new', "PASS"),
+        ("Kptr Restrict", 'new', None),
+        ("SSH PermitRootLogin", 'resolved', "FAIL"),
+        ("Firewalld", 'resolved', "FAIL"),
+        ("Dmesg Restrict", 'changed', "WARN"),
+        ("SUID Files", 'changed', "INFO"),
+    }
+    # Ordered by kind of change
+    assert [r['change'] for r in delta] == [
+        'new', 'new', 'resolved', 'resolved', 'changed', 'changed']
+    absent = [r for r in delta if r['check_name'] == "Firewalld"][0]
+    assert absent['result'] == "ABSENT"
+
+
+def test_details_alone_are_not_a_change():
+    baseline = make_baseline([result("Recent Login Failures", "WARN", "12 failed logins")],
+                             host="h")
+
+    assert diff_results(baseline, [result("Recent Login Failures", "WARN", "57 failed logins")]) == []
+
+
+def test_repeated_check_names_keep_their_keys():
+    baseline = make_baseline([result("Home Directory", "WARN", "/home/a")], host="h")
+    current = [result("Home Directory", "WARN", "/home/a"),
+               result("Home Directory", "WARN", "/home/b")]
+
+    # Only the second occurrence is new; the first keeps its key
+    assert changes(diff_results(baseline, current)) == {("Home Directory", 'new', None)}
+    assert changes(diff_results(make_baseline(current, host="h"), current[:1])) == {
+        ("Home Directory", 'resolved', "WARN")}
+
+
+def test_baselines_of_an_older_format_are_ignored(tmp_path, capsys):
+    path = tmp_path / "baseline.json"
+    path.write_text('{"version": 1, "entries": {}}')
+
+    assert load_baseline(str(path)) is None
+    assert "unsupported format" in capsys.readouterr().out
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "baseline.json")
+
+    save_baseline(BASELINE_RESULTS, path, host="h")
+
+    baseline = load_baseline(path)
+    assert baseline['host'] == "h"
+    assert diff_results(baseline, BASELINE_RESULTS) == []
+    assert load_baseline(str(tmp_path / "missing.json")) is None
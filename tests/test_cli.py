@@ -0,0 +1,101 @@
+"""Tests for the headless command line interface."""
+
+import json
+
+import pytest
+
+from scanner.baseline import save_baseline
+from scanner.cli import main
+from scanner.parser import ScanParser
+
+
+@pytest.fixture
+def rules(tmp_path):
+    path = tmp_path / "rules.yaml"
+    path.write_text(
+        "rules:\n"
+        "  - check_name: \"ASLR\"\n"
+        "    severity: \"HIGH\"\n"
+        "  - check_name: \"Dmesg Restrict\"\n"
+        "    severity: \"MEDIUM\"\n"
+        "  - check_name: \".*\"\n"
+        "    severity: \"LOW\"\n"
+    )
+    return str(path)
+
+
+@pytest.fixture
+def scan_dir(tmp_path):
+    path = tmp_path / "scan"
+    path.mkdir()
+    return path
+
+
+def write_results(scan_dir, **results):
+    """Write kernel.json with one record per check name and result."""
+    (scan_dir / "kernel.json").write_text("".join(
+        json.dumps({'check_name': name.replace('_', ' '), 'result': result,
+                    'status': "LOW", 'details': ""}) + "\n"
+        for name, result in results.items()
+    ))
+
+
+def run(scan_dir, rules, *args):
+    return main(['--no-scan', '--quiet', '--output-dir', str(scan_dir), '--rules', rules, *args])
+
+
+@pytest.mark.parametrize("results, expected", [
+    ({'ASLR': "PASS", 'Dmesg_Restrict': "PASS", 'Kptr_Restrict': "INFO"}, 0),
+    ({'ASLR': "PASS", 'Kptr_Restrict': "FAIL"}, 3),
+    ({'Dmesg_Restrict': "WARN", 'Kptr_Restrict': "FAIL"}, 4),
+    ({'ASLR': "FAIL", 'Dmesg_Restrict': "WARN", 'Kptr_Restrict': "FAIL"}, 5),
+])
+def test_exit_code_is_the_highest_failing_severity(scan_dir, rules, results, expected):
+    write_results(scan_dir, **results)
+
+    assert run(scan_dir, rules) == expected
+
+
+def test_ignore_warnings(scan_dir, rules):
+    write_results(scan_dir, ASLR="WARN", Kptr_Restrict="FAIL")
+
+    assert run(scan_dir, rules) == 5
+    assert run(scan_dir, rules, '--ignore-warnings') == 3
+
+
+def test_no_results_is_an_error(scan_dir, rules, capsys):
+    assert run(scan_dir, rules) == 1
+    assert "no scan results" in capsys.readouterr().err
+
+
+def test_invalid_arguments(scan_dir, rules):
+    with pytest.raises(SystemExit) as excinfo:
+        run(scan_dir, rules, '--jobs', 'many')
+
+    assert excinfo.value.code == 2
+
+
+def test_json_output(scan_dir, rules, tmp_path):
+    write_results(scan_dir, ASLR="FAIL", Kptr_Restrict="PASS")
+    output = tmp_path / "results.json"
+
+    assert run(scan_dir, rules, '--json', str(output)) == 5
+    document = json.loads(output.read_text())
+    assert document['summary']['failed'] == 1
+    assert [r['check_name'] for r in document['results']] == ["ASLR", "Kptr Restrict"]
+
+
+def test_changes_use_the_baseline_delta(scan_dir, rules, tmp_path, monkeypatch):
+    monkeypatch.setenv('HARDENING_BASELINE', str(tmp_path / "baseline.json"))
+    write_results(scan_dir, ASLR="FAIL", Kptr_Restrict="PASS")
+
+    assert run(scan_dir, rules, '--changes') == 1
+
+    parser = ScanParser(rules)
+    parser.set_scan_dir(str(scan_dir))
+    save_baseline(parser.parse_results())
+    # Failures already in the baseline do not count
+    assert run(scan_dir, rules, '--changes') == 0
+
+    write_results(scan_dir, ASLR="FAIL", Kptr_Restrict="FAIL")
+    assert run(scan_dir, rules, '--changes') == 3
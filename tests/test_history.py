@@ -0,0 +1,93 @@
+"""Tests for the SQLite scan history."""
+
+import os
+import time
+
+import pytest
+
+from scanner.history import HistoryStore, default_history_path
+
+DAY = 86400
+# Start of a recent day, well inside the default retention
+NOW = (int(time.time()) // DAY - 5) * DAY
+
+
+def result(name, outcome, severity="MEDIUM"):
+    return {'check_name': name, 'result': outcome, 'severity': severity}
+
+
+@pytest.fixture
+def store(state_dir):
+    with HistoryStore() as store:
+        yield store
+
+
+def test_default_location_is_the_state_directory(state_dir):
+    assert default_history_path() == os.path.join(str(state_dir), "history.db")
+
+    with HistoryStore():
+        pass
+    assert os.stat(str(state_dir)).st_mode & 0o777 == 0o700
+
+
+def test_record_is_idempotent(store):
+    results = [result("ASLR", "PASS", "LOW"), result("SSH PermitRootLogin", "FAIL", "HIGH")]
+
+    first = store.record(results, host="h", scanned_at=NOW)
+
+    assert first is not None
+    assert store.record(results, host="h", scanned_at=NOW) is None
+    [scan] = store.scans("h")
+    assert (scan['total'], scan['failed'], scan['high']) == (2, 1, 1)
+
+
+def test_failing_since_counts_warnings(store):
+    for day, outcome in enumerate(["FAIL", "PASS", "WARN", "FAIL"]):
+        store.record([result("Dmesg Restrict", outcome)], host="h", scanned_at=NOW + day * DAY)
+
+    assert store.failing_since("Dmesg Restrict", host="h") == NOW + 2 * DAY
+    assert store.failing_since("Unknown", host="h") is None
+    assert [row[1] for row in store.check_history("Dmesg Restrict", host="h")] == [
+        "FAIL", "WARN", "PASS", "FAIL"]
+
+
+def test_failing_since_is_none_once_passing(store):
+    store.record([result("ASLR", "FAIL")], host="h", scanned_at=NOW)
+    store.record([result("ASLR", "PASS")], host="h", scanned_at=NOW + DAY)
+
+    assert store.failing_since("ASLR", host="h") is None
+
+
+def test_trend_per_period(store):
+    store.record([result("a", "FAIL"), result("b", "WARN")], host="h", scanned_at=NOW)
+    store.record([result("a", "FAIL")], host="h", scanned_at=NOW + 60)
+    store.record([result("a", "PASS")], host="other", scanned_at=NOW + 2 * DAY)
+
+    rows = store.trend('day', since=NOW - DAY)
+
+    assert [(row['scans'], row['failed'], row['warnings']) for row in rows] == [(2, 2, 1), (1, 0, 0)]
+    assert len(store.trend('day', host="other")) == 1
+
+
+def test_recording_applies_the_retention(state_dir):
+    now = int(time.time())
+    with HistoryStore(full_days=7, weekly_days=28) as store:
+        # Hourly scans over six weeks, the last one now
+        for hour in range(42 * 24, -1, -1):
+            store.record([result("ASLR", "PASS")], host="h", scanned_at=now - hour * 3600)
+        times = [scan['scanned_at'] for scan in store.scans("h", limit=10000)]
+
+    # Every scan of the last days, then one per week, nothing past four weeks
+    assert len([t for t in times if t > now - 6 * DAY]) == 6 * 24
+    assert 3 <= len([t for t in times if t < now - 8 * DAY]) <= 4
+    assert min(times) >= now - 28 * DAY
+
+
+def test_foreign_database_is_refused(state_dir):
+    os.makedirs(str(state_dir), mode=0o700, exist_ok=True)
+    path = os.path.join(str(state_dir), "history.db")
+    open(path, 'w').close()
+    os.chmod(path, 0o666)
+
+    with pytest.raises(PermissionError):
+        HistoryStore(path)
@@ -0,0 +1,76 @@
+"""Tests for the package inventory."""
+
+import os
+
+import pytest
+
+from scanner.packages import InventoryLoader, PackageInventory, parse_dpkg_status, tool_records
+
+STATUS = """\
+Package: fail2ban
+Status: install ok installed
+Architecture: all
+Version: 0.11.2-6
+
+Package: aide
+Status: deinstall ok config-files
+Version: 0.17.4-1
+
+Package: libc6
+Status: install ok installed
+Architecture: amd64
+Version: 2.36-9
+
+Package: libc6
+Status: install ok installed
+Architecture: i386
+Version: 2.36-8
+Description: GNU C Library
+ A multi-line description
+ with a Version: line in it
+"""
+
+
+@pytest.fixture
+def root(tmp_path):
+    status = tmp_path / "var" / "lib" / "dpkg" / "status"
+    status.parent.mkdir(parents=True)
+    status.write_text(STATUS)
+    return str(tmp_path)
+
+
+def test_parse_dpkg_status(root):
+    packages = parse_dpkg_status(root + "/var/lib/dpkg/status")
+
+    assert packages == {'fail2ban': "0.11.2-6", 'libc6': "2.36-9"}
+
+
+def test_inventory_cache_follows_the_database(root, state_dir):
+    loader = InventoryLoader(root)
+    inventory = loader.load()
+    assert inventory.source == 'dpkg'
+    assert inventory.installed('fail2ban') and not inventory.installed('aide')
+    assert os.path.exists(loader.cache_file)
+
+    status = root + "/var/lib/dpkg/status"
+    with open(status, 'a') as f:
+        f.write("\nPackage: aide\nStatus: install ok installed\nVersion: 0.18-1\n")
+
+    assert InventoryLoader(root).load().version('aide') == "0.18-1"
+
+
+def test_no_database(tmp_path):
+    inventory = InventoryLoader(str(tmp_path), cache_file='').load()
+
+    assert len(inventory) == 0 and inventory.source is None
+
+
+def test_tool_records_skip_the_path_for_offline_roots():
+    inventory = PackageInventory({'fail2ban': "0.11.2-6"}, 'dpkg')
+
+    records = tool_records(inventory, ['fail2ban', 'sh'], search_path=False)
+    assert records == [('tools', "Security Tool: fail2ban", "INFO", "LOW",
+                        "fail2ban is installed (version 0.11.2-6)")]
+
+    records = tool_records(inventory, ['fail2ban', 'sh'])
+    assert records[1] == ('tools', "Security Tool: sh", "INFO", "LOW", "sh is installed")
@@ -0,0 +1,115 @@
+"""Tests for reading and enriching scan results."""
+
+import json
+import os
+
+import pytest
+
+from scanner.parser import ScanParser
+
+
+@pytest.fixture
+def rules(tmp_path):
+    path = tmp_path / "rules.yaml"
+    path.write_text(
+        "rules:\n"
+        "  - check_name: \"ASLR\"\n"
+        "    severity: \"HIGH\"\n"
+        "    remediation: \"Enable ASLR\"\n"
+        "  - check_name: \".*\"\n"
+        "    severity: \"LOW\"\n"
+        "    remediation: \"No action required\"\n"
+    )
+    return str(path)
+
+
+@pytest.fixture
+def scan_dir(tmp_path):
+    path = tmp_path / "scan"
+    path.mkdir()
+    return path
+
+
+def record(name, result="PASS", status="LOW"):
+    return json.dumps({'check_name': name, 'result': result, 'status': status, 'details': ""})
+
+
+def test_iter_results_skips_bad_lines(rules, scan_dir, capsys):
+    (scan_dir / "kernel.json").write_text("\n".join([
+        record("ASLR", "FAIL", "HIGH"),
+        '{"check_name": "Trunc',
+        "",
+        "[1, 2]",
+        record("Dmesg Restrict", "WARN", "MEDIUM"),
+    ]) + "\n")
+    parser = ScanParser(rules)
+    parser.set_scan_dir(str(scan_dir))
+
+    results = list(parser.iter_results())
+
+    assert [r['check_name'] for r in results] == ["ASLR", "Dmesg Restrict"]
+    assert results[0]['severity'] == "HIGH"
+    assert results[0]['remediation'] == "Enable ASLR"
+    assert "kernel.json line 2" in capsys.readouterr().out
+
+
+def test_iter_results_reads_modules_in_order(rules, scan_dir):
+    (scan_dir / "security.json").write_text(record("SELinux Status") + "\n")
+    (scan_dir / "services.json").write_text(record("Service: telnet") + "\n")
+    parser = ScanParser(rules)
+    parser.set_scan_dir(str(scan_dir))
+
+    names = [r['check_name'] for r in parser.iter_results()]
+
+    assert names == ["Service: telnet", "SELinux Status"]
+
+
+def test_legacy_json_array(rules, scan_dir):
+    (scan_dir / "ssh.json").write_text(json.dumps([
+        json.loads(record("SSH Protocol")), json.loads(record("SSH MaxAuthTries", "WARN"))
+    ]))
+    parser = ScanParser(rules)
+    parser.set_scan_dir(str(scan_dir))
+
+    assert len(list(parser.iter_raw_results())) == 2
+
+
+def test_parse_cache_follows_file_changes(rules, scan_dir):
+    path = scan_dir / "users.json"
+    path.write_text(record("UID 0 Users") + "\n")
+    parser = ScanParser(rules)
+    parser.set_scan_dir(str(scan_dir))
+    assert len(parser.parse_results()) == 1
+
+    tmp = scan_dir / "users.json.partial"
+    tmp.write_text(record("UID 0 Users") + "\n" + record("Sudo Users", "INFO") + "\n")
+    os.replace(str(tmp), str(path))
+
+    assert len(parser.parse_results()) == 2
+    assert parser.get_summary()['total'] == 2
+
+
+def test_uncached_parser_keeps_no_results(rules, scan_dir):
+    (scan_dir / "users.json").write_text(record("UID 0 Users", "FAIL") + "\n")
+    parser = ScanParser(rules, cache=False)
+    parser.set_scan_dir(str(scan_dir))
+
+    assert len(parser.parse_results()) == 1
+    assert parser.get_summary()['failed'] == 1
+    assert parser._module_cache == {}
+
+
+def test_summarize_counts_warnings_as_failing():
+    results = [
+        {'check_name': "a", 'result': "FAIL", 'severity': "HIGH"},
+        {'check_name': "b", 'result': "WARN", 'severity': "MEDIUM"},
+        {'check_name': "c", 'result': "PASS", 'severity': "HIGH"},
+    ]
+
+    summary = ScanParser.summarize(results)
+
+    assert summary['high'] == 1
+    assert summary['medium'] == 1
+    assert summary['failed'] == 1
+    assert summary['warnings'] == 1
+    assert summary['passed'] == 1
@@ -0,0 +1,56 @@
+"""Tests for the streaming HTML report writer."""
+
+import io
+import re
+
+from scanner.report import ReportGenerator
+
+
+def result(name, severity, outcome="FAIL"):
+    return {'check_name': name, 'result': outcome, 'severity': severity,
+            'remediation': "Fix <it>", 'details': ""}
+
+
+def sections(html):
+    return re.findall(r'<summary>(\w+) Severity \((\d+)\)</summary>', html)
+
+
+def test_sections_are_written_from_a_single_pass(tmp_path):
+    results = [result("a", "LOW", "PASS"), result("b", "HIGH"), result("c", "MEDIUM", "WARN"),
+               result("d", "HIGH"), result("e", "CUSTOM")]
+    out = io.StringIO()
+
+    ReportGenerator(str(tmp_path)).write_html(iter(results), None, out)
+    html = out.getvalue()
+
+    assert sections(html) == [("High", "2"), ("Medium", "1"), ("Low", "1"), ("CUSTOM", "1")]
+    # Scan order within a severity
+    assert html.index("<strong>b</strong>") < html.index("<strong>d</strong>")
+    assert "Fix &lt;it&gt;" in html
+    assert re.search(r'<h3>2</h3>\s*<p>High Severity Issues</p>', html)
+    assert re.search(r'<h3>5</h3>\s*<p>Total Checks</p>', html)
+
+
+def test_large_sections_are_paginated(tmp_path):
+    results = (result(f"check {i}", "HIGH") for i in range(5))
+    out = io.StringIO()
+
+    ReportGenerator(str(tmp_path), page_size=2).write_html(results, None, out)
+    html = out.getvalue()
+
+    assert re.findall(r'Results (\d+) - (\d+) of 5', html) == [("1", "2"), ("3", "4"), ("5", "5")]
+    assert html.count("<tr class=") == 5
+
+
+def test_save_report_replaces_nothing_on_error(tmp_path):
+    def broken():
+        yield result("a", "HIGH")
+        raise RuntimeError("scan went away")
+
+    generator = ReportGenerator(str(tmp_path))
+    try:
+        generator.save_report(broken())
+    except RuntimeError:
+        pass
+
+    assert list(tmp_path.iterdir()) == []
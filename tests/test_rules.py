@@ -0,0 +1,93 @@
+"""Tests for the compiled rule index and the rules cache."""
+
+import os
+
+from scanner.rules import RuleIndex, load_rule_file, load_rules, rule_files
+
+
+RULES = [
+    {'check_name': "SSH PermitRootLogin", 'severity': "HIGH"},
+    {'check_name': "Login Failures from*", 'severity': "MEDIUM"},
+    {'check_name': "Login*", 'severity': "LOW", 'remediation': "second wildcard"},
+    {'check_name': ".* Failed$", 'severity': "MEDIUM"},
+    {'check_name': ".*", 'severity': "LOW", 'remediation': "default"},
+]
+
+
+def write_rules(path, rules):
+    with open(path, 'w') as f:
+        f.write("rules:\n")
+        for rule in rules:
+            f.write(f"  - check_name: \"{rule['check_name']}\"\n")
+            f.write(f"    severity: \"{rule['severity']}\"\n")
+
+
+def test_exact_match_wins():
+    index = RuleIndex(RULES)
+
+    assert index.lookup("SSH PermitRootLogin") is RULES[0]
+
+
+def test_first_wildcard_in_file_order_wins():
+    index = RuleIndex(RULES)
+
+    assert index.lookup("Login Failures from: 10.0.0.9") is RULES[1]
+    assert index.lookup("Login Failures for: root") is RULES[2]
+    assert index.lookup("Filesystem Walk Failed") is RULES[3]
+
+
+def test_unknown_names_fall_back_to_default():
+    index = RuleIndex(RULES)
+
+    assert index.lookup("Failed Services") is RULES[4]
+    assert index.lookup("Something Else") is RULES[4]
+
+
+def test_invalid_pattern_is_skipped():
+    rules = [{'check_name': "Bad [pattern*", 'severity': "HIGH"}] + RULES
+
+    index = RuleIndex(rules)
+
+    assert index.lookup("Bad [pattern x") is RULES[4]
+
+
+def test_later_files_take_precedence(tmp_path):
+    base = str(tmp_path / "base.yaml")
+    site = str(tmp_path / "site.yaml")
+    write_rules(base, [{'check_name': "ASLR", 'severity': "HIGH"},
+                       {'check_name': ".*", 'severity': "LOW"}])
+    write_rules(site, [{'check_name': "ASLR", 'severity': "MEDIUM"}])
+
+    index = RuleIndex(load_rules([base, site]))
+
+    assert index.lookup("ASLR")['severity'] == "MEDIUM"
+    assert index.lookup("Other")['severity'] == "LOW"
+
+
+def test_rule_files_adds_environment(monkeypatch):
+    monkeypatch.setenv('HARDENING_RULES', os.pathsep.join(["a.yaml", "b.yaml"]))
+
+    assert rule_files("rules.yaml") == ["rules.yaml", "a.yaml", "b.yaml"]
+
+
+def test_cache_is_used_and_invalidated(tmp_path, state_dir):
+    path = str(tmp_path / "rules.yaml")
+    write_rules(path, [{'check_name': "ASLR", 'severity': "HIGH"}])
+
+    assert load_rule_file(path)[0]['severity'] == "HIGH"
+    cached = list((state_dir / "rules-cache").iterdir())
+    assert len(cached) == 1
+
+    write_rules(path, [{'check_name': "ASLR", 'severity': "LOW"}])
+    assert load_rule_file(path)[0]['severity'] == "LOW"
+
+
+def test_foreign_cache_is_ignored(tmp_path, state_dir):
+    path = str(tmp_path / "rules.yaml")
+    write_rules(path, [{'check_name': "ASLR", 'severity': "HIGH"}])
+    load_rule_file(path)
+    cache = next((state_dir / "rules-cache").iterdir())
+    os.chmod(str(cache), 0o666)
+    cache.write_text(cache.read_text().replace('"HIGH"', '"LOW"'))
+
+    assert load_rule_file(path)[0]['severity'] == "HIGH"
@@ -0,0 +1,156 @@
+"""Tests for the module scheduler: timeouts, failed runs and the module cache."""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from scanner.scheduler import ModuleScheduler, TimingHistory
+
+COMMON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      "bash_checks", "common.sh")
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    script_dir = tmp_path / "bash_checks"
+    script_dir.mkdir()
+    shutil.copy(COMMON, str(script_dir))
+    return str(script_dir), str(tmp_path / "out")
+
+
+def write_module(script_dir, output_dir, name, body, header=""):
+    with open(os.path.join(script_dir, f"{name}.sh"), 'w') as f:
+        f.write(f"#!/bin/bash\n{header}\n"
+                f'RESULTS_FILE="{output_dir}/{name}.json"\n'
+                'source "$(dirname "${BASH_SOURCE[0]}")/common.sh"\n'
+                f"{body}\n")
+
+
+def scheduler(dirs, **kwargs):
+    script_dir, output_dir = dirs
+    kwargs.setdefault('use_cache', False)
+    return ModuleScheduler(script_dir=script_dir, output_dir=output_dir,
+                           history=TimingHistory(os.path.join(output_dir, "timings.json")),
+                           echo=False, **kwargs)
+
+
+def records(output_dir, module):
+    with open(os.path.join(output_dir, f"{module}.json")) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def names(output_dir, module):
+    return [record['check_name'] for record in records(output_dir, module)]
+
+
+def test_timeout_keeps_the_records_written_before(dirs):
+    script_dir, output_dir = dirs
+    write_module(script_dir, output_dir, 'slow',
+                 'init_results "$RESULTS_FILE"\n'
+                 'add_result "First" "PASS" "LOW" "one"\n'
+                 'add_result "Second" "PASS" "LOW" "two"\n'
+                 'sleep 30')
+
+    [run] = scheduler(dirs, modules=['slow'], default_timeout=1).run()
+
+    assert run.timed_out
+    assert names(output_dir, 'slow') == ["First", "Second", "Module Timeout: slow"]
+    assert os.path.exists(os.path.join(output_dir, "slow.timing.json"))
+
+
+def test_timeout_before_any_output_replaces_the_previous_results(dirs):
+    script_dir, output_dir = dirs
+    os.makedirs(output_dir)
+    with open(os.path.join(output_dir, "slow.json"), 'w') as f:
+        f.write('{"check_name":"Stale","result":"PASS","status":"LOW","details":""}\n')
+    write_module(script_dir, output_dir, 'slow', 'sleep 30\ninit_results "$RESULTS_FILE"')
+
+    scheduler(dirs, modules=['slow'], default_timeout=1).run()
+
+    assert names(output_dir, 'slow') == ["Module Timeout: slow"]
+
+
+def test_missing_bash_is_a_failed_run(dirs, monkeypatch):
+    script_dir, output_dir = dirs
+    write_module(script_dir, output_dir, 'quick', 'init_results "$RESULTS_FILE"')
+    monkeypatch.setenv('PATH', output_dir)
+    events = []
+
+    [run] = scheduler(dirs, modules=['quick'], events=events.append).run()
+
+    assert run.error == "bash command not found. Please ensure bash is installed."
+    assert events[-1]['event'] == 'scan_finished' and events[-1]['failed'] == ['quick']
+
+
+def test_unchanged_inputs_reuse_the_cached_results(dirs, tmp_path):
+    script_dir, output_dir = dirs
+    counter = tmp_path / "runs"
+    config = tmp_path / "config"
+    config.write_text("a\n")
+    write_module(script_dir, output_dir, 'cached',
+                 f'echo run >> "{counter}"\n'
+                 'init_results "$RESULTS_FILE"\n'
+                 f'add_result "Config" "PASS" "LOW" "$(cat "{config}")"',
+                 header=f"# cache-inputs: {config}")
+
+    first = scheduler(dirs, modules=['cached'], use_cache=True).run()
+    second = scheduler(dirs, modules=['cached'], use_cache=True).run()
+
+    assert [run.cached for run in first + second] == [False, True]
+    assert counter.read_text().count("run") == 1
+    [record] = records(output_dir, 'cached')
+    assert record['details'] == "a" and record.get('cached')
+
+    config.write_text("b\n")
+    [third] = scheduler(dirs, modules=['cached'], use_cache=True).run()
+    assert not third.cached
+    [record] = records(output_dir, 'cached')
+    assert record['details'] == "b"
+
+
+def test_helper_failures_are_not_cached(dirs, tmp_path):
+    script_dir, output_dir = dirs
+    write_module(script_dir, output_dir, 'broken',
+                 'init_results "$RESULTS_FILE"\n'
+                 'add_result "Broken Checks Failed" "WARN" "MEDIUM" "helper failed"',
+                 header=f"# cache-inputs: {tmp_path}")
+
+    scheduler(dirs, modules=['broken'], use_cache=True).run()
+    [run] = scheduler(dirs, modules=['broken'], use_cache=True).run()
+
+    assert not run.cached
+
+
+def test_inputs_listed_by_a_command_are_fingerprinted(dirs, tmp_path):
+    script_dir, output_dir = dirs
+    included = tmp_path / "included.conf"
+    included.write_text("a\n")
+    listing = tmp_path / "inputs"
+    listing.write_text(f"{included}\n")
+    write_module(script_dir, output_dir, 'listed',
+                 'init_results "$RESULTS_FILE"\n'
+                 f'add_result "Included" "PASS" "LOW" "$(cat "{included}")"',
+                 header=f'# cache-inputs-from: cat "{listing}"')
+
+    scheduler(dirs, modules=['listed'], use_cache=True).run()
+    [run] = scheduler(dirs, modules=['listed'], use_cache=True).run()
+    assert run.cached
+
+    included.write_text("b\n")
+    [run] = scheduler(dirs, modules=['listed'], use_cache=True).run()
+    assert not run.cached
+    assert records(output_dir, 'listed')[0]['details'] == "b"
+
+
+def test_schedule_records_the_runs(dirs):
+    script_dir, output_dir = dirs
+    write_module(script_dir, output_dir, 'quick', 'init_results "$RESULTS_FILE"\nexit 3')
+
+    [run] = scheduler(dirs, modules=['quick']).run()
+
+    assert run.returncode == 3 and not run.timed_out and run.error is None
+    with open(os.path.join(output_dir, "schedule.json")) as f:
+        schedule = json.load(f)
+    assert [entry['module'] for entry in schedule['modules']] == ['quick']
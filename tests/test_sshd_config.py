@@ -0,0 +1,125 @@
+"""Tests for the native sshd_config parser."""
+
+import pytest
+
+from scanner.sshd_config import SshdConfigParser, main, match_records
+
+
+@pytest.fixture
+def root(tmp_path):
+    ssh = tmp_path / "etc" / "ssh"
+    (ssh / "sshd_config.d").mkdir(parents=True)
+    (ssh / "sshd_config").write_text(
+        "# Global settings\n"
+        "Include sshd_config.d/*.conf\n"
+        "PermitRootLogin yes\n"
+        "PasswordAuthentication=no\n"
+        "X11Forwarding\tYES\n"
+        "Port 22\n"
+        "Port 2222\n"
+        "\n"
+        "Match Group admins\n"
+        "    PermitRootLogin yes\n"
+        "Match User backup\n"
+        "    PasswordAuthentication yes\n"
+        "Match Address 10.0.0.0/8\n"
+        "    MaxAuthTries 2\n"
+    )
+    # Included first, so its values win
+    (ssh / "sshd_config.d" / "10-hardening.conf").write_text(
+        "permitrootlogin no\n"
+    )
+    (ssh / "sshd_config.d" / "20-ignored.txt").write_text("PermitRootLogin without-password\n")
+    return str(tmp_path)
+
+
+def test_first_value_wins_across_includes(root):
+    config = SshdConfigParser(root).parse()
+    options = config.effective()
+
+    assert options['permitrootlogin'] == ["no"]
+    assert options['passwordauthentication'] == ["no"]
+    assert options['x11forwarding'] == ["yes"]
+    assert options['port'] == ["22", "2222"]
+    # Compiled-in defaults fill the gaps
+    assert options['maxauthtries'] == ["6"]
+    assert len(config.files) == 2
+    assert not config.errors
+
+
+def test_match_blocks_do_not_leak_into_global_options(root):
+    config = SshdConfigParser(root).parse()
+
+    assert [block.criteria for block in config.match_blocks] == [
+        "Group admins", "User backup", "Address 10.0.0.0/8"]
+    assert config.match_blocks[0].options == {'permitrootlogin': ["yes"]}
+    assert (config.match_blocks[0].path, config.match_blocks[0].line) == ("/etc/ssh/sshd_config", 9)
+    assert 'maxauthtries' not in config.options
+
+
+def test_match_records_flag_weakening_blocks(root):
+    records = match_records(SshdConfigParser(root).parse())
+
+    results = {record[1]: record[2:4] for record in records}
+    assert results == {
+        "SSH Match Block: Group admins": ("WARN", "MEDIUM"),
+        "SSH Match Block: User backup": ("WARN", "MEDIUM"),
+        "SSH Match Block: Address 10.0.0.0/8": ("INFO", "LOW"),
+    }
+
+
+def test_missing_config_is_reported(tmp_path):
+    config = SshdConfigParser(str(tmp_path)).parse()
+
+    assert config.errors
+    assert config.effective()['permitrootlogin'] == ["prohibit-password"]
+
+
+def test_match_block_ends_with_the_included_file(tmp_path):
+    ssh = tmp_path / "etc" / "ssh"
+    (ssh / "sshd_config.d").mkdir(parents=True)
+    (ssh / "sshd_config").write_text(
+        "Include /etc/ssh/sshd_config.d/*.conf\n"
+        "PermitRootLogin yes\n"
+        "PasswordAuthentication no\n"
+    )
+    (ssh / "sshd_config.d" / "50-backup.conf").write_text(
+        "Match User backup\n"
+        "    PasswordAuthentication yes\n"
+    )
+
+    config = SshdConfigParser(str(tmp_path)).parse()
+
+    assert config.effective()['permitrootlogin'] == ["yes"]
+    assert config.effective()['passwordauthentication'] == ["no"]
+    assert config.match_blocks[0].options == {'passwordauthentication': ["yes"]}
+
+
+def test_include_inside_a_match_block_applies_to_the_block(tmp_path):
+    ssh = tmp_path / "etc" / "ssh"
+    ssh.mkdir(parents=True)
+    (ssh / "sshd_config").write_text(
+        "Match Group sftp\n"
+        "    Include sftp.conf\n"
+        "    X11Forwarding yes\n"
+    )
+    (ssh / "sftp.conf").write_text("ForceCommand internal-sftp\n")
+
+    config = SshdConfigParser(str(tmp_path)).parse()
+
+    assert config.match_blocks[0].options == {
+        'forcecommand': ["internal-sftp"], 'x11forwarding': ["yes"]}
+    assert 'forcecommand' not in config.options
+
+
+def test_files_lists_include_targets_outside_etc_ssh(tmp_path, capsys):
+    (tmp_path / "etc" / "ssh").mkdir(parents=True)
+    (tmp_path / "opt" / "ssh").mkdir(parents=True)
+    (tmp_path / "etc" / "ssh" / "sshd_config").write_text("Include /opt/ssh/*.conf\n")
+    (tmp_path / "opt" / "ssh" / "site.conf").write_text("PermitRootLogin no\n")
+
+    assert main(['--root', str(tmp_path), '--files']) == 0
+
+    assert capsys.readouterr().out.splitlines() == [
+        f"{tmp_path}/etc/ssh/sshd_config", f"{tmp_path}/opt/ssh/site.conf",
+        f"{tmp_path}/opt/ssh"]
@@ -0,0 +1,82 @@
+"""Tests for the batched sysctl checks."""
+
+import os
+
+import pytest
+
+from scanner.sysctl import KERNEL_CHECKS, NETWORK_CHECKS, evaluate, read_params
+
+
+def write_params(proc_sys, values):
+    for key, value in values.items():
+        path = os.path.join(str(proc_sys), *key.split('.'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(f"{value}\n")
+
+
+@pytest.fixture
+def proc_sys(tmp_path):
+    path = tmp_path / "proc" / "sys"
+    write_params(path, {
+        'net.ipv4.ip_forward': "1",
+        'net.ipv4.conf.all.accept_redirects': "0",
+        'net.ipv4.conf.all.accept_source_route': "0",
+        'net.ipv4.tcp_syncookies': "1",
+        'net.ipv6.conf.all.disable_ipv6': "1",
+        'kernel.randomize_va_space': "1",
+        'kernel.kptr_restrict': "2",
+        'fs.suid_dumpable': "2",
+        # Only the first word is kept, as with sysctl | awk
+        'kernel.printk': "4\t4\t1\t7",
+    })
+    return str(path)
+
+
+def by_name(records):
+    return {record[1]: record for record in records}
+
+
+def test_read_params(proc_sys):
+    values = read_params(['net.ipv4.ip_forward', 'kernel.printk', 'kernel.missing'], proc_sys)
+
+    assert values == {'net.ipv4.ip_forward': "1", 'kernel.printk': "4", 'kernel.missing': None}
+
+
+def test_network_checks(proc_sys):
+    records = by_name(evaluate(NETWORK_CHECKS, proc_sys))
+
+    assert records["IP Forwarding"] == (
+        'params', "IP Forwarding", "FAIL", "MEDIUM", "IP forwarding is enabled")
+    assert records["ICMP Redirects"][2] == "PASS"
+    assert records["SYN Cookies"][2] == "PASS"
+
+
+def test_kernel_checks(proc_sys):
+    records = by_name(evaluate(KERNEL_CHECKS, proc_sys))
+
+    assert records["ASLR (Address Space Layout Randomization)"][2:4] == ("WARN", "MEDIUM")
+    assert records["Kptr Restrict"][2] == "PASS"
+    # Missing parameters fail like an empty sysctl value
+    assert records["Dmesg Restrict"][2:] == (
+        "FAIL", "MEDIUM", "kernel.dmesg_restrict is set to  (should be 1)")
+    assert records["SUID Core Dumps"] == (
+        'core_dumps', "SUID Core Dumps", "WARN", "MEDIUM", "SUID core dumps are enabled (2)")
+
+
+def test_ipv6_checks_depend_on_ipv6(proc_sys):
+    records = by_name(evaluate(KERNEL_CHECKS, proc_sys))
+    assert records["IPv6 Disabled"][2] == "INFO"
+    assert "IPv6 Accept Redirects" not in records
+
+    write_params(proc_sys, {'net.ipv6.conf.all.disable_ipv6': "0",
+                            'net.ipv6.conf.all.accept_redirects': "1"})
+    records = by_name(evaluate(KERNEL_CHECKS, proc_sys))
+    assert "IPv6 Disabled" not in records
+    assert records["IPv6 Accept Redirects"][2] == "FAIL"
+
+
+def test_aslr_is_skipped_without_the_parameter(tmp_path):
+    records = by_name(evaluate(KERNEL_CHECKS, str(tmp_path)))
+
+    assert "ASLR (Address Space Layout Randomization)" not in records
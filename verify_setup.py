@@ -49,7 +49,7 @@ def main():
     print("\nChecking bash scripts...")
     bash_scripts = [
         "services.sh", "network.sh", "ssh.sh", "users.sh",
-        "permissions.sh", "kernel.sh", "security.sh", "run_all.sh"
+        "permissions.sh", "kernel.sh", "security.sh", "run_all.sh", "common.sh"
     ]
     for script in bash_scripts:
         script_path = os.path.join(project_root, "bash_checks", script)